@@ -0,0 +1,67 @@
+"""
+Бенчмарк профілів з'єднання SQLite: затримка вставки рекордів і запитів таблиці лідерів
+
+Запуск: python benchmarks/db_profile_benchmark.py [--records N]
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sudoku.database import ConnectionProfile, DatabaseManager, GameRecord, SQLiteGameRecordRepository  # noqa: E402
+from sudoku.models import Difficulty  # noqa: E402
+
+
+def _percentiles(samples):
+    """Повертає p50 та p95 у мікросекундах"""
+    samples = sorted(samples)
+    return samples[len(samples) // 2] * 1e6, samples[int(len(samples) * 0.95) - 1] * 1e6
+
+
+def run_profile(name: str, profile: ConnectionProfile, records: int, queries: int) -> None:
+    """Вимірює вставки (кожна зі своїм комітом, як у грі) та запити для одного профілю"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_manager = DatabaseManager(os.path.join(tmp_dir, 'bench.db'), profile)
+        db_manager.initialize_database()
+        repository = SQLiteGameRecordRepository(db_manager)
+        difficulties = list(Difficulty)
+
+        insert_samples = []
+        for i in range(records):
+            record = GameRecord(None, difficulties[i % 3], 60 + i % 900, i % 5, 100 + i % 200, datetime.now())
+            start = time.perf_counter()
+            repository.save(record)
+            insert_samples.append(time.perf_counter() - start)
+
+        query_samples = []
+        for i in range(queries):
+            start = time.perf_counter()
+            repository.get_top_scores(50)
+            query_samples.append(time.perf_counter() - start)
+
+        db_manager.disconnect()
+
+    insert_p50, insert_p95 = _percentiles(insert_samples)
+    query_p50, query_p95 = _percentiles(query_samples)
+    print(f"{name:<12} insert p50 {insert_p50:9.1f} us  p95 {insert_p95:9.1f} us  "
+          f"({statistics.fmean(insert_samples) * records:7.3f} s total)   "
+          f"top-50 query p50 {query_p50:8.1f} us  p95 {query_p95:8.1f} us")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare SQLite connection profiles")
+    parser.add_argument('--records', type=int, default=2000)
+    parser.add_argument('--queries', type=int, default=500)
+    args = parser.parse_args()
+
+    run_profile('legacy', ConnectionProfile.legacy(), args.records, args.queries)
+    run_profile('performance', ConnectionProfile.performance(), args.records, args.queries)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,15 @@
 """
 Пакет гри судоку
 """
-from .game import Game
-
 __version__ = "1.0.0"
 __author__ = "Sudoku Game Developer"
 
-__all__ = ['Game']
\ No newline at end of file
+__all__ = ['Game']
+
+
+def __getattr__(name):
+    """Лінивий імпорт Game, щоб sudoku.core, models і database працювали без pygame"""
+    if name == 'Game':
+        from .game import Game
+        return Game
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
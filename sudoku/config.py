@@ -24,4 +24,41 @@ LIGHT_BLUE = (173, 216, 230)
 LIGHT_BLUE_ALT = (230, 240, 250)
 
 # Налаштування підказок
-MAX_HINTS = 5
\ No newline at end of file
+MAX_HINTS = 5
+
+# Налаштування головного циклу
+FPS = 30
+EVENT_DRIVEN_LOOP = True  # Блокуватися на pygame.event.wait замість постійного перемальовування
+IDLE_WAIT_TIMEOUT_MS = 1000  # Максимальний час очікування події в режимі простою
+
+# Налаштування профайлера продуктивності
+PROFILER_HISTORY_SIZE = 300  # Кількість замірів, що зберігаються для кожної секції
+PROFILER_EXPORT_FILE = 'perf_profile.jsonl'
+
+# Автозбереження через журнал ходів
+AUTOSAVE_ENABLED = True
+AUTOSAVE_COMPACT_INTERVAL = 50  # Кількість ходів, після якої журнал згортається у знімок дошки
+
+# Резервні копії бази даних
+BACKUP_ENABLED = True
+BACKUP_INTERVAL_MINUTES = 30
+BACKUP_KEEP = 5  # Кількість копій, що зберігаються
+BACKUP_COMPRESS = True
+
+# Кеш таблиці лідерів
+LEADERBOARD_CACHE_SIZE = 50  # Кількість перших записів кожної складності, що тримаються в пам'яті
+
+# Обслуговування сховища
+MAINTENANCE_ENABLED = True
+SAVES_KEEP_PER_DIFFICULTY = 5  # Кількість найновіших збережень кожної складності
+RECORDS_ARCHIVE_AFTER_DAYS = None  # Через скільки днів рекорди переносяться в архів (None - не архівувати)
+MAINTENANCE_VACUUM_PAGES = 256  # Кількість сторінок, що звільняються за один фоновий крок
+
+# Інструментування запитів до бази
+QUERY_STATS_ENABLED = False
+SLOW_QUERY_THRESHOLD_MS = 20  # Виклики репозиторію, довші за поріг, потрапляють у журнал з планом запиту
+QUERY_STATS_FILE = 'query_stats.json'  # Агрегати зберігаються поруч з базою при закритті гри
+
+# Архів головоломок
+PUZZLE_ARCHIVE_ENABLED = True  # Нова гра береться з архіву, а згенеровані головоломки зберігаються в нього
+PUZZLE_ARCHIVE_MIN_UNPLAYED = 10  # Нижче цього запасу незіграних головоломок архів поповнюється у фоні
@@ -4,9 +4,11 @@
 from .generator import ISudokuGenerator, SudokuGenerator
 from .validator import SudokuValidator
 from .board import ISudokuBoard, SudokuBoard
+from .rating import canonical_hash, rate_puzzle
 
 __all__ = [
     'ISudokuGenerator', 'SudokuGenerator',
     'SudokuValidator',
-    'ISudokuBoard', 'SudokuBoard'
+    'ISudokuBoard', 'SudokuBoard',
+    'canonical_hash', 'rate_puzzle'
 ]
\ No newline at end of file
@@ -3,10 +3,10 @@
 """
 from abc import ABC, abstractmethod
 import random
-from typing import List, Optional, Tuple
+from typing import Callable, List, Optional, Tuple
 
 from ..config import GRID_SIZE, MAX_HINTS
-from ..models import Cell, Difficulty
+from ..models import Cell, Difficulty, Move, MoveKind
 from .generator import ISudokuGenerator
 from .validator import SudokuValidator
 
@@ -43,11 +43,30 @@ class SudokuBoard(ISudokuBoard):
         self.validator = SudokuValidator()
         self.hints_used = 0
         self.max_hints = MAX_HINTS
+        self.move_listeners: List[Callable[[Move], None]] = []
+
+    def add_move_listener(self, listener: Callable[[Move], None]) -> None:
+        """Підписує слухача на ходи, що змінюють дошку (наприклад, журнал автозбереження)"""
+        self.move_listeners.append(listener)
+
+    def remove_move_listener(self, listener: Callable[[Move], None]) -> None:
+        """Відписує слухача ходів"""
+        if listener in self.move_listeners:
+            self.move_listeners.remove(listener)
+
+    def _notify_move(self, move: Move) -> None:
+        """Повідомляє слухачів про хід"""
+        for listener in self.move_listeners:
+            listener(move)
 
     def initialize(self, difficulty: Difficulty) -> None:
         """Ініціалізує нову дошку судоку"""
-        puzzle, self.solution = self.generator.generate(difficulty)
+        puzzle, solution = self.generator.generate(difficulty)
+        self.load_puzzle(puzzle, solution)
 
+    def load_puzzle(self, puzzle: List[List[int]], solution: List[List[int]]) -> None:
+        """Заповнює дошку готовою головоломкою (наприклад, згенерованою у фоновому потоці)"""
+        self.solution = solution
         self.grid = [[Cell(row, col) for col in range(GRID_SIZE)] for row in range(GRID_SIZE)]
         for row in range(GRID_SIZE):
             for col in range(GRID_SIZE):
@@ -60,6 +79,20 @@ class SudokuBoard(ISudokuBoard):
 
     def set_value(self, row: int, col: int, value: int) -> bool:
         """Встановлює значення у вказаній клітинці і перевіряє його правильність"""
+        if self._set_value(row, col, value):
+            self._notify_move(Move(MoveKind.SET_VALUE, row, col, value))
+            return True
+        return False
+
+    def apply_hint(self, row: int, col: int, value: int) -> bool:
+        """Встановлює значення, отримане з підказки"""
+        if self._set_value(row, col, value):
+            self._notify_move(Move(MoveKind.HINT, row, col, value))
+            return True
+        return False
+
+    def _set_value(self, row: int, col: int, value: int) -> bool:
+        """Змінює значення клітинки без повідомлення слухачів"""
         cell = self.grid[row][col]
 
         if cell.is_fixed:
@@ -74,7 +107,11 @@ class SudokuBoard(ISudokuBoard):
 
     def toggle_note(self, row: int, col: int, value: int) -> None:
         """Додає або видаляє замітку"""
-        self.grid[row][col].toggle_note(value)
+        cell = self.grid[row][col]
+        if cell.is_fixed or cell.value != 0:
+            return
+        cell.toggle_note(value)
+        self._notify_move(Move(MoveKind.TOGGLE_NOTE, row, col, value))
 
     def clear_cell(self, row: int, col: int) -> bool:
         """Очищає вибрану клітинку"""
@@ -116,4 +153,22 @@ class SudokuBoard(ISudokuBoard):
                     cell.notes.clear()
                     for num in range(1, GRID_SIZE + 1):
                         if self.validator.is_valid_move(self.grid, row, col, num):
-                            cell.notes.add(num)
\ No newline at end of file
+                            cell.notes.add(num)
+        self._notify_move(Move(MoveKind.AUTO_NOTES))
+
+    def apply_move(self, move: Move) -> None:
+        """Повторює хід з журналу, не повідомляючи слухачів"""
+        listeners = self.move_listeners
+        self.move_listeners = []
+        try:
+            if move.kind == MoveKind.SET_VALUE:
+                self.set_value(move.row, move.col, move.value)
+            elif move.kind == MoveKind.TOGGLE_NOTE:
+                self.toggle_note(move.row, move.col, move.value)
+            elif move.kind == MoveKind.HINT:
+                self.hints_used += 1
+                self.apply_hint(move.row, move.col, move.value)
+            elif move.kind == MoveKind.AUTO_NOTES:
+                self.auto_notes()
+        finally:
+            self.move_listeners = listeners
\ No newline at end of file
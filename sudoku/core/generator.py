@@ -20,6 +20,9 @@ class ISudokuGenerator(ABC):
 
 class SudokuGenerator(ISudokuGenerator):
     """Клас для генерації судоку"""
+    # Версія алгоритму, що зберігається з головоломками в архіві; збільшується при зміні генерації
+    version = 1
+
     def __init__(self):
         self.grid = [[0 for _ in range(GRID_SIZE)] for _ in range(GRID_SIZE)]
 
@@ -0,0 +1,150 @@
+"""
+Модуль для оцінки складності головоломки та її канонічного відбитка
+"""
+import hashlib
+from typing import List, Optional, Tuple
+
+from ..config import GRID_SIZE, SUB_GRID_SIZE
+
+CELL_COUNT = GRID_SIZE * GRID_SIZE
+_FULL_MASK = (1 << GRID_SIZE) - 1
+
+# Вартість кроків розв'язувача, з яких складається рейтинг
+NAKED_SINGLE_COST = 1
+HIDDEN_SINGLE_COST = 4
+GUESS_COST = 50
+
+# Для кожної клітинки - номери її рядка, колонки та блоку
+_ROW = [index // GRID_SIZE for index in range(CELL_COUNT)]
+_COL = [index % GRID_SIZE for index in range(CELL_COUNT)]
+_BOX = [_ROW[index] // SUB_GRID_SIZE * SUB_GRID_SIZE + _COL[index] // SUB_GRID_SIZE for index in range(CELL_COUNT)]
+# Клітинки кожного рядка, колонки та блоку
+_UNITS = ([[index for index in range(CELL_COUNT) if _ROW[index] == unit] for unit in range(GRID_SIZE)] +
+          [[index for index in range(CELL_COUNT) if _COL[index] == unit] for unit in range(GRID_SIZE)] +
+          [[index for index in range(CELL_COUNT) if _BOX[index] == unit] for unit in range(GRID_SIZE)])
+
+
+class _SolverState:
+    """Значення клітинок і зайняті цифри рядків, колонок і блоків у вигляді бітових масок"""
+
+    def __init__(self, values: List[int]):
+        self.values = list(values)
+        self.rows = [0] * GRID_SIZE
+        self.cols = [0] * GRID_SIZE
+        self.boxes = [0] * GRID_SIZE
+        for index, value in enumerate(self.values):
+            if value:
+                self._mark(index, value)
+
+    def _mark(self, index: int, value: int):
+        bit = 1 << (value - 1)
+        self.rows[_ROW[index]] |= bit
+        self.cols[_COL[index]] |= bit
+        self.boxes[_BOX[index]] |= bit
+
+    def place(self, index: int, value: int):
+        """Ставить цифру в клітинку"""
+        self.values[index] = value
+        self._mark(index, value)
+
+    def candidates(self, index: int) -> int:
+        """Маска цифр, які ще можна поставити в клітинку"""
+        return _FULL_MASK & ~(self.rows[_ROW[index]] | self.cols[_COL[index]] | self.boxes[_BOX[index]])
+
+    def copy(self) -> '_SolverState':
+        state = _SolverState.__new__(_SolverState)
+        state.values = list(self.values)
+        state.rows = list(self.rows)
+        state.cols = list(self.cols)
+        state.boxes = list(self.boxes)
+        return state
+
+
+def _find_single(state: _SolverState) -> Tuple[Optional[int], int, int]:
+    """
+    Шукає наступний логічний крок: (клітинка, цифра, вартість). Якщо кроку немає - (None, 0, 0),
+    якщо якась клітинка не має кандидатів - (None, 0, -1).
+    """
+    masks = {}
+    for index, value in enumerate(state.values):
+        if not value:
+            mask = state.candidates(index)
+            if not mask:
+                return None, 0, -1
+            if mask & (mask - 1) == 0:
+                return index, mask.bit_length(), NAKED_SINGLE_COST
+            masks[index] = mask
+
+    for unit in _UNITS:
+        for digit in range(GRID_SIZE):
+            bit = 1 << digit
+            places = [index for index in unit if masks.get(index, 0) & bit]
+            if len(places) == 1:
+                return places[0], digit + 1, HIDDEN_SINGLE_COST
+    return None, 0, 0
+
+
+def _solve(state: _SolverState, cost: int) -> Tuple[bool, int]:
+    """Розв'язує логічними кроками, а без них - перебором з клітинки з найменшою кількістю кандидатів"""
+    while True:
+        index, value, step_cost = _find_single(state)
+        if step_cost < 0:
+            return False, cost
+        if index is None:
+            break
+        state.place(index, value)
+        cost += step_cost
+
+    empty = [index for index, value in enumerate(state.values) if not value]
+    if not empty:
+        return True, cost
+
+    index = min(empty, key=lambda cell: bin(state.candidates(cell)).count('1'))
+    mask = state.candidates(index)
+    for digit in range(GRID_SIZE):
+        if mask >> digit & 1:
+            cost += GUESS_COST
+            branch = state.copy()
+            branch.place(index, digit + 1)
+            solved, cost = _solve(branch, cost)
+            if solved:
+                return True, cost
+    return False, cost
+
+
+def rate_puzzle(puzzle: List[List[int]]) -> int:
+    """
+    Оцінює складність головоломки сумою вартостей кроків розв'язувача: прості одиночки дешеві,
+    приховані дорожчі, кожне припущення - найдорожче. Чим більше число, тим складніша головоломка.
+    """
+    _, cost = _solve(_SolverState([value for row in puzzle for value in row]), 0)
+    return cost
+
+
+def _transforms(puzzle: List[List[int]]) -> List[List[int]]:
+    """Повертає всі повороти і віддзеркалення сітки у вигляді плоских списків"""
+    grids = []
+    grid = [list(row) for row in puzzle]
+    for _ in range(4):
+        grid = [list(row) for row in zip(*grid[::-1])]
+        grids.append([value for row in grid for value in row])
+        grids.append([value for row in grid for value in reversed(row)])
+    return grids
+
+
+def _relabel(values: List[int]) -> str:
+    """Перейменовує цифри в порядку першої появи, щоб головоломки з переставленими цифрами збігалися"""
+    labels = {0: 0}
+    for value in values:
+        if value not in labels:
+            labels[value] = len(labels)
+    return ''.join(str(labels[value]) for value in values)
+
+
+def canonical_hash(puzzle: List[List[int]]) -> str:
+    """
+    Відбиток заданих клітинок, однаковий для головоломки, її поворотів, віддзеркалень
+    і перейменувань цифр
+    """
+    canonical = min(_relabel(values) for values in _transforms(puzzle))
+    return hashlib.sha1(canonical.encode('ascii')).hexdigest()
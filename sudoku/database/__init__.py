@@ -2,24 +2,66 @@
 """
 Пакет для роботи з базою даних
 """
-from .models import GameRecord, SavedGame, UserSetting
-from .repositories import IGameRecordRepository, ISavedGameRepository, IUserSettingsRepository
-from .sqlite_repositories import SQLiteGameRecordRepository, SQLiteSavedGameRepository, SQLiteUserSettingsRepository
-from .database_manager import DatabaseManager
-from .services import GameRecordService, SavedGameService, UserSettingsService
+from .models import (
+    DEFAULT_PROFILE_ID, ArchivedPuzzle, GameRecord, LeaderboardCursor, Profile, PuzzleResult, SavedGame,
+    SavedGameSummary, TimeRank, UserSetting
+)
+from .repositories import (
+    IGameRecordRepository, IProfileRepository, IPuzzleRepository, ISavedGameRepository, IUserSettingsRepository
+)
+from .sqlite_repositories import (
+    SQLiteGameRecordRepository, SQLiteProfileRepository, SQLitePuzzleRepository, SQLiteSavedGameRepository,
+    SQLiteUserSettingsRepository
+)
+from .memory_repositories import (
+    InMemoryGameRecordRepository, InMemoryProfileRepository, InMemoryPuzzleRepository, InMemorySavedGameRepository,
+    InMemoryStore, InMemoryUserSettingsRepository
+)
+from .database_manager import DatabaseManager, ConnectionProfile
+from .services import (
+    GameRecordService, ProfileService, PuzzleArchiveService, SavedGameService, UserSettingsService
+)
+from .leaderboard_cache import LeaderboardCache
 from .database_factory import DatabaseFactory
+from .unit_of_work import UnitOfWork
+from .write_behind import WriteBehindQueue, WriterContext
+from .bulk_io import BulkTransfer, ImportResult
+from .backup import BackupManager, online_backup, restore_backup
+from .maintenance import MaintenanceReport, StorageMaintenance
+from .query_stats import InstrumentedRepository, MethodStats, QueryMetrics, instrument
+from .puzzle_archive import generate_puzzles
 
 __all__ = [
     # Models
-    'GameRecord', 'SavedGame', 'UserSetting',
+    'DEFAULT_PROFILE_ID', 'ArchivedPuzzle', 'GameRecord', 'LeaderboardCursor', 'Profile', 'PuzzleResult',
+    'SavedGame', 'SavedGameSummary', 'TimeRank', 'UserSetting',
     # Repository interfaces
-    'IGameRecordRepository', 'ISavedGameRepository', 'IUserSettingsRepository',
+    'IGameRecordRepository', 'IProfileRepository', 'IPuzzleRepository', 'ISavedGameRepository',
+    'IUserSettingsRepository',
     # Repository implementations
-    'SQLiteGameRecordRepository', 'SQLiteSavedGameRepository', 'SQLiteUserSettingsRepository',
+    'SQLiteGameRecordRepository', 'SQLiteProfileRepository', 'SQLitePuzzleRepository', 'SQLiteSavedGameRepository',
+    'SQLiteUserSettingsRepository', 'InMemoryGameRecordRepository', 'InMemoryProfileRepository',
+    'InMemoryPuzzleRepository', 'InMemorySavedGameRepository', 'InMemoryStore', 'InMemoryUserSettingsRepository',
     # Database manager
-    'DatabaseManager',
+    'DatabaseManager', 'ConnectionProfile',
     # Services
-    'GameRecordService', 'SavedGameService', 'UserSettingsService',
+    'GameRecordService', 'ProfileService', 'PuzzleArchiveService', 'SavedGameService', 'UserSettingsService',
+    # Caches
+    'LeaderboardCache',
     # Factory
-    'DatabaseFactory'
+    'DatabaseFactory',
+    # Unit of work
+    'UnitOfWork',
+    # Asynchronous persistence
+    'WriteBehindQueue', 'WriterContext',
+    # Bulk import/export
+    'BulkTransfer', 'ImportResult',
+    # Backups
+    'BackupManager', 'online_backup', 'restore_backup',
+    # Storage maintenance
+    'MaintenanceReport', 'StorageMaintenance',
+    # Query instrumentation
+    'InstrumentedRepository', 'MethodStats', 'QueryMetrics', 'instrument',
+    # Puzzle archive
+    'generate_puzzles'
 ]
\ No newline at end of file
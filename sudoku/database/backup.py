@@ -0,0 +1,156 @@
+"""
+Онлайн-резервне копіювання бази даних через sqlite3 backup API
+"""
+import gzip
+import logging
+import os
+import shutil
+import sqlite3
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, List, Optional
+
+# progress(скопійовано_сторінок, всього_сторінок)
+ProgressCallback = Callable[[int, int], None]
+
+BACKUP_PREFIX = 'sudoku-'
+
+
+def online_backup(source: sqlite3.Connection, target_path: str, pages: int = 256,
+                  progress: Optional[ProgressCallback] = None, compress: bool = False,
+                  sleep: float = 0.005) -> str:
+    """
+    Копіює базу по pages сторінок за крок з одного знімка, тож копія завжди узгоджена, а запис
+    у базу під час копіювання не зупиняється. Файл з'являється за target_path лише після
+    повного копіювання (для compress=True - стиснений gzip).
+    """
+    temp_path = f"{target_path}.partial"
+
+    def report(status, remaining, total):
+        if progress is not None:
+            progress(total - remaining, total)
+
+    try:
+        target = sqlite3.connect(temp_path)
+        # Транзакція читання фіксує знімок бази на весь час копіювання: у режимі WAL записи інших
+        # з'єднань не блокуються і не змушують backup починати спочатку після кожного коміту
+        pinned = not source.in_transaction
+        if pinned:
+            source.execute("BEGIN")
+            source.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+        try:
+            source.backup(target, pages=pages, progress=report, sleep=sleep)
+        finally:
+            if pinned:
+                source.rollback()
+            target.close()
+
+        if compress:
+            compressed_path = f"{temp_path}.gz"
+            with open(temp_path, 'rb') as raw, gzip.open(compressed_path, 'wb', compresslevel=6) as packed:
+                shutil.copyfileobj(raw, packed, 1024 * 1024)
+            os.remove(temp_path)
+            temp_path = compressed_path
+
+        os.replace(temp_path, target_path)
+        return target_path
+    except Exception:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def restore_backup(backup_path: str, db_path: str) -> None:
+    """Відновлює базу з резервної копії (звичайної або стисненої); гра має бути закрита"""
+    temp_path = f"{db_path}.restore"
+    opener = gzip.open if backup_path.endswith('.gz') else open
+    with opener(backup_path, 'rb') as source, open(temp_path, 'wb') as target:
+        shutil.copyfileobj(source, target, 1024 * 1024)
+
+    # Старий журнал WAL не повинен застосуватись до відновленої бази
+    for suffix in ('-wal', '-shm'):
+        if os.path.exists(db_path + suffix):
+            os.remove(db_path + suffix)
+    os.replace(temp_path, db_path)
+
+
+class BackupManager:
+    """Запускає резервні копії у фоновому потоці за розкладом і зберігає лише останні keep копій"""
+
+    def __init__(self, db_path: str, backup_dir: Optional[str] = None, keep: int = 5,
+                 compress: bool = True, pages_per_step: int = 256):
+        self.db_path = db_path
+        self.backup_dir = Path(backup_dir) if backup_dir else Path(db_path).parent / 'backups'
+        self.keep = keep
+        self.compress = compress
+        self.pages_per_step = pages_per_step
+        self.logger = logging.getLogger(__name__)
+
+        # Один робочий потік: копії не виконуються паралельно
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='db-backup')
+        self._stop_event = threading.Event()
+        self._scheduler: Optional[threading.Thread] = None
+        self._pending: Optional[Future] = None
+
+    def _new_backup_path(self) -> Path:
+        """Повертає шлях нової копії з часовою міткою"""
+        timestamp = datetime.now().strftime('%Y%m%d-%H%M%S-%f')
+        suffix = '.db.gz' if self.compress else '.db'
+        return self.backup_dir / f"{BACKUP_PREFIX}{timestamp}{suffix}"
+
+    def list_backups(self) -> List[Path]:
+        """Повертає наявні копії від найстарішої до найновішої"""
+        if not self.backup_dir.exists():
+            return []
+        return sorted(path for path in self.backup_dir.glob(f"{BACKUP_PREFIX}*")
+                      if path.name.endswith(('.db', '.db.gz')))
+
+    def _rotate(self):
+        """Видаляє найстаріші копії понад ліміт"""
+        backups = self.list_backups()
+        for path in backups[:max(0, len(backups) - self.keep)]:
+            path.unlink()
+            self.logger.info(f"Removed old backup: {path}")
+
+    def _run_backup(self, progress: Optional[ProgressCallback]) -> str:
+        """Виконує копію у робочому потоці через власне з'єднання"""
+        self.backup_dir.mkdir(parents=True, exist_ok=True)
+        source = sqlite3.connect(self.db_path)
+        try:
+            path = online_backup(source, str(self._new_backup_path()), self.pages_per_step,
+                                 progress, self.compress)
+        finally:
+            source.close()
+        self._rotate()
+        self.logger.info(f"Database backed up to: {path}")
+        return path
+
+    def start_backup(self, progress: Optional[ProgressCallback] = None) -> Future:
+        """Ставить резервну копію в чергу; Future повертає шлях до файлу"""
+        if self._pending is not None and not self._pending.done():
+            return self._pending
+        self._pending = self._executor.submit(self._run_backup, progress)
+        return self._pending
+
+    def schedule(self, interval_seconds: float) -> None:
+        """Запускає періодичні копії кожні interval_seconds секунд"""
+        if self._scheduler is not None:
+            return
+
+        def loop():
+            while not self._stop_event.wait(interval_seconds):
+                try:
+                    self.start_backup().result()
+                except Exception as e:
+                    if not self._stop_event.is_set():
+                        self.logger.error(f"Scheduled backup failed: {e}")
+
+        self._scheduler = threading.Thread(target=loop, name='db-backup-scheduler', daemon=True)
+        self._scheduler.start()
+
+    def stop(self, wait: bool = True) -> None:
+        """Зупиняє розклад; поточна копія (якщо є) завершується, якщо wait=True"""
+        self._stop_event.set()
+        self._executor.shutdown(wait=wait, cancel_futures=True)
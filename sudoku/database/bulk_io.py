@@ -0,0 +1,264 @@
+"""
+Потоковий експорт та імпорт рекордів, збережених ігор і архіву головоломок у форматах JSONL та CSV
+
+Запуск:
+    python -m sudoku.database.bulk_io export game_records records.jsonl [--db PATH]
+    python -m sudoku.database.bulk_io import game_records records.csv --on-conflict replace [--db PATH]
+"""
+import argparse
+import base64
+import csv
+import json
+import logging
+import sys
+from dataclasses import dataclass
+from itertools import islice
+from typing import Any, Dict, IO, Iterable, Iterator, List, Optional, Tuple
+
+from .database_manager import DatabaseManager
+from .models import DEFAULT_PROFILE_ID
+
+# Стовпці, що переносяться для кожної таблиці (службові created_at/updated_at заповнює база)
+TABLE_COLUMNS: Dict[str, Tuple[str, ...]] = {
+    'profiles': ('id', 'name', 'date_created', 'last_active'),
+    'game_records': ('id', 'profile_id', 'difficulty', 'completion_time', 'hints_used', 'score',
+                     'date_completed'),
+    'saved_games': ('id', 'profile_id', 'difficulty', 'state', 'elapsed_time', 'hints_used', 'filled_cells',
+                    'journal_seq', 'date_saved'),
+    'saved_game_moves': ('game_id', 'seq', 'move'),
+    'puzzles': ('id', 'difficulty', 'givens', 'solution', 'canonical_hash', 'rating', 'generator_version',
+                'date_created'),
+}
+
+# Бінарні стовпці записуються в base64, цілі - відновлюються з тексту CSV
+_BLOB_COLUMNS = {'state', 'givens', 'solution'}
+_TEXT_COLUMNS = {'difficulty', 'date_completed', 'date_saved', 'name', 'date_created', 'last_active',
+                 'canonical_hash'}
+# Значення для стовпців, яких немає у файлах, експортованих старішими версіями
+_MISSING_DEFAULTS = {'profile_id': DEFAULT_PROFILE_ID}
+
+# Таблиці, на ID яких посилаються інші таблиці: нові ID відірвали б від них пов'язані рядки
+# (ходи журналу від збережених ігор, рекорди і збереження від профілів)
+_REFERENCED_TABLES = ('profiles', 'saved_games', 'saved_game_moves')
+
+_CONFLICT_CLAUSES = {
+    'ignore': 'INSERT OR IGNORE',
+    'replace': 'INSERT OR REPLACE',
+    'abort': 'INSERT',
+}
+
+FORMATS = ('jsonl', 'csv')
+
+
+@dataclass
+class ImportResult:
+    """Результат імпорту"""
+    rows_read: int
+    rows_written: int
+
+
+class BulkTransfer:
+    """Переносить таблиці між базою та файлами порціями, не тримаючи всі рядки в пам'яті"""
+
+    def __init__(self, db_manager: DatabaseManager, chunk_size: int = 10000):
+        self.db_manager = db_manager
+        self.chunk_size = chunk_size
+        self.logger = logging.getLogger(__name__)
+
+    @staticmethod
+    def _columns(table: str) -> Tuple[str, ...]:
+        """Повертає стовпці таблиці, яку можна переносити"""
+        if table not in TABLE_COLUMNS:
+            raise ValueError(f"Unsupported table: {table}")
+        return TABLE_COLUMNS[table]
+
+    @staticmethod
+    def _check_format(fmt: str):
+        """Перевіряє назву формату"""
+        if fmt not in FORMATS:
+            raise ValueError(f"Unsupported format: {fmt}")
+
+    def iter_rows(self, table: str) -> Iterator[Tuple[Any, ...]]:
+        """Генератор рядків таблиці, що читає курсор порціями по chunk_size"""
+        columns = self._columns(table)
+        order = 'game_id, seq' if table == 'saved_game_moves' else 'id'
+        conn = self.db_manager.get_connection()
+        cursor = conn.execute(f"SELECT {', '.join(columns)} FROM {table} ORDER BY {order}")
+
+        while True:
+            rows = cursor.fetchmany(self.chunk_size)
+            if not rows:
+                break
+            for row in rows:
+                yield tuple(row)
+
+    def export_table(self, table: str, file: IO[str], fmt: str = 'jsonl') -> int:
+        """Записує таблицю у відкритий текстовий файл і повертає кількість рядків"""
+        self._check_format(fmt)
+        columns = self._columns(table)
+        blob_indexes = [i for i, column in enumerate(columns) if column in _BLOB_COLUMNS]
+        count = 0
+
+        if fmt == 'csv':
+            writer = csv.writer(file)
+            writer.writerow(columns)
+
+        for row in self.iter_rows(table):
+            if blob_indexes:
+                row = list(row)
+                for index in blob_indexes:
+                    row[index] = base64.b64encode(row[index]).decode('ascii')
+
+            if fmt == 'csv':
+                writer.writerow(row)
+            else:
+                file.write(json.dumps(dict(zip(columns, row)), separators=(',', ':')))
+                file.write('\n')
+            count += 1
+
+        self.logger.info(f"Exported {count} rows from {table}")
+        return count
+
+    def _read_rows(self, columns: Tuple[str, ...], file: IO[str], fmt: str) -> Iterator[Tuple[Any, ...]]:
+        """Читає рядки з файлу та перетворює їх на кортежі значень у порядку стовпців"""
+        if fmt == 'csv':
+            records: Iterable[Dict[str, Any]] = csv.DictReader(file)
+        else:
+            records = (json.loads(line) for line in file if line.strip())
+
+        for record in records:
+            values = []
+            for column in columns:
+                value = record.get(column, _MISSING_DEFAULTS.get(column))
+                if value == '' and fmt == 'csv':
+                    value = None
+                elif value is not None:
+                    if column in _BLOB_COLUMNS:
+                        value = base64.b64decode(value)
+                    elif column not in _TEXT_COLUMNS and fmt == 'csv':
+                        value = int(value)
+                values.append(value)
+            yield tuple(values)
+
+    def _drop_secondary_objects(self, table: str) -> List[str]:
+        """Видаляє індекси та тригери таблиці і повертає SQL для їх відновлення"""
+        with self.db_manager.transaction() as conn:
+            objects = conn.execute("""
+                SELECT type, name, sql FROM sqlite_master
+                WHERE tbl_name = ? AND type IN ('index', 'trigger') AND sql IS NOT NULL
+            """, (table,)).fetchall()
+            for row in objects:
+                conn.execute(f"DROP {row['type'].upper()} {row['name']}")
+        return [row['sql'] for row in objects]
+
+    def _restore_secondary_objects(self, table: str, statements: List[str]):
+        """Відновлює індекси та тригери і перераховує дані, які підтримували тригери"""
+        with self.db_manager.transaction() as conn:
+            for statement in statements:
+                conn.execute(statement)
+            if table == 'game_records':
+                self.db_manager.rebuild_player_stats(conn)
+
+    def import_table(self, table: str, file: IO[str], fmt: str = 'jsonl',
+                     on_conflict: str = 'ignore', keep_ids: bool = True,
+                     defer_indexes: bool = True) -> ImportResult:
+        """
+        Імпортує рядки з файлу порціями (кожна порція - один executemany) в одній транзакції:
+        перерваний імпорт не лишає ні частини рядків, ні таблиці без тригерів статистики.
+        on_conflict: 'ignore' пропускає рядки, що порушують обмеження, 'replace' замінює наявні,
+        'abort' зупиняє і відкочує весь імпорт на першому конфлікті.
+        keep_ids=False вставляє записи з новими ID (для злиття з іншою базою); для таблиць,
+        на ID яких посилаються інші, не підтримується.
+        defer_indexes: на час імпорту видаляє індекси і тригери таблиці та створює їх заново в кінці -
+        побудова індексу сортуванням у рази швидша за оновлення кількох B-дерев на кожну вставку.
+        """
+        self._check_format(fmt)
+        if on_conflict not in _CONFLICT_CLAUSES:
+            raise ValueError(f"Unsupported conflict mode: {on_conflict}")
+        if not keep_ids and table in _REFERENCED_TABLES:
+            raise ValueError(f"New IDs are not supported for {table}: other tables refer to its IDs")
+
+        columns = self._columns(table)
+        rows = self._read_rows(columns, file, fmt)
+        if not keep_ids and columns[0] == 'id':
+            columns = columns[1:]
+            rows = (row[1:] for row in rows)
+
+        sql = (f"{_CONFLICT_CLAUSES[on_conflict]} INTO {table} ({', '.join(columns)}) "
+               f"VALUES ({', '.join('?' for _ in columns)})")
+
+        rows_read = 0
+        rows_written = 0
+        with self.db_manager.transaction() as conn:
+            deferred = self._drop_secondary_objects(table) if defer_indexes else []
+            while True:
+                chunk = list(islice(rows, self.chunk_size))
+                if not chunk:
+                    break
+                # rowcount executemany - сума вставлених рядків без змін, зроблених тригерами
+                rows_written += conn.executemany(sql, chunk).rowcount
+                rows_read += len(chunk)
+
+            if defer_indexes:
+                self._restore_secondary_objects(table, deferred)
+            elif table == 'game_records' and on_conflict == 'replace':
+                # REPLACE видаляє старі рядки без тригерів DELETE, тому статистику перераховуємо
+                self.db_manager.rebuild_player_stats(conn)
+
+        self.logger.info(f"Imported {rows_written} of {rows_read} rows into {table}")
+        return ImportResult(rows_read, rows_written)
+
+    def export_file(self, table: str, path: str, fmt: Optional[str] = None) -> int:
+        """Експортує таблицю у файл; формат визначається за розширенням, якщо не заданий"""
+        fmt = fmt or _format_from_path(path)
+        with open(path, 'w', encoding='utf-8', newline='') as file:
+            return self.export_table(table, file, fmt)
+
+    def import_file(self, table: str, path: str, fmt: Optional[str] = None,
+                    on_conflict: str = 'ignore', keep_ids: bool = True,
+                    defer_indexes: bool = True) -> ImportResult:
+        """Імпортує таблицю з файлу; формат визначається за розширенням, якщо не заданий"""
+        fmt = fmt or _format_from_path(path)
+        with open(path, 'r', encoding='utf-8', newline='') as file:
+            return self.import_table(table, file, fmt, on_conflict, keep_ids, defer_indexes)
+
+
+def _format_from_path(path: str) -> str:
+    """Визначає формат файлу за розширенням"""
+    return 'csv' if path.lower().endswith('.csv') else 'jsonl'
+
+
+def main(argv=None) -> int:
+    """Точка входу командного рядка"""
+    parser = argparse.ArgumentParser(description="Bulk export/import of Sudoku game data")
+    parser.add_argument('command', choices=('export', 'import'))
+    parser.add_argument('table', choices=sorted(TABLE_COLUMNS))
+    parser.add_argument('path')
+    parser.add_argument('--db', default=None, help="Database path (default: ~/.sudoku_game/sudoku.db)")
+    parser.add_argument('--format', choices=FORMATS, default=None)
+    parser.add_argument('--on-conflict', choices=sorted(_CONFLICT_CLAUSES), default='ignore')
+    parser.add_argument('--new-ids', action='store_true',
+                        help="Assign new IDs instead of keeping exported ones (not for profiles and saved games)")
+    parser.add_argument('--keep-indexes', action='store_true',
+                        help="Update indexes row by row instead of rebuilding them (for small imports)")
+    parser.add_argument('--chunk-size', type=int, default=10000)
+    args = parser.parse_args(argv)
+
+    db_manager = DatabaseManager(args.db)
+    db_manager.initialize_database()
+    transfer = BulkTransfer(db_manager, args.chunk_size)
+    try:
+        if args.command == 'export':
+            count = transfer.export_file(args.table, args.path, args.format)
+            print(f"Exported {count} rows")
+        else:
+            result = transfer.import_file(args.table, args.path, args.format, args.on_conflict,
+                                          not args.new_ids, not args.keep_indexes)
+            print(f"Imported {result.rows_written} of {result.rows_read} rows")
+    finally:
+        db_manager.disconnect()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
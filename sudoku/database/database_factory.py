@@ -1,32 +1,66 @@
 """
 Фабрика для створення та ініціалізації бази даних
 """
-from typing import Tuple
+from typing import Optional, Tuple
 from .database_manager import DatabaseManager
+from .memory_repositories import (
+    InMemoryGameRecordRepository,
+    InMemoryProfileRepository,
+    InMemoryPuzzleRepository,
+    InMemorySavedGameRepository,
+    InMemoryStore,
+    InMemoryUserSettingsRepository
+)
 from .sqlite_repositories import (
     SQLiteGameRecordRepository,
+    SQLiteProfileRepository,
+    SQLitePuzzleRepository,
     SQLiteSavedGameRepository,
     SQLiteUserSettingsRepository
 )
-from .services import GameRecordService, SavedGameService, UserSettingsService
+from .services import (
+    GameRecordService, ProfileService, PuzzleArchiveService, SavedGameService, UserSettingsService
+)
+
+
+BACKEND_SQLITE = 'sqlite'
+BACKEND_MEMORY = 'memory'
 
 
 class DatabaseFactory:
-    """Фабрика для створення всіх компонентів бази даних"""
+    """
+    Фабрика для створення всіх компонентів бази даних.
+    backend='memory' створює репозиторії в пам'яті: для тестів, бенчмарків сервісів без вартості
+    SQLite і симуляцій без диска.
+    """
 
-    def __init__(self, db_path: str = None):
-        self.db_manager = DatabaseManager(db_path)
+    def __init__(self, db_path: str = None, backend: str = BACKEND_SQLITE):
+        if backend not in (BACKEND_SQLITE, BACKEND_MEMORY):
+            raise ValueError(f"Unknown database backend: {backend}")
+        self.backend = backend
+        self.db_manager: Optional[DatabaseManager] = None
+        self.store: Optional[InMemoryStore] = None
+        if backend == BACKEND_SQLITE:
+            self.db_manager = DatabaseManager(db_path)
+        else:
+            self.store = InMemoryStore()
 
     def initialize(self) -> Tuple[GameRecordService, SavedGameService, UserSettingsService]:
         """
         Ініціалізує базу даних та повертає всі сервіси
         """
-        self.db_manager.connect()
-        self.db_manager.initialize_database()
+        if self.store is not None:
+            self.store.initialize()
+            game_record_repo = InMemoryGameRecordRepository(self.store)
+            saved_game_repo = InMemorySavedGameRepository(self.store)
+            user_settings_repo = InMemoryUserSettingsRepository(self.store)
+        else:
+            self.db_manager.connect()
+            self.db_manager.initialize_database()
 
-        game_record_repo = SQLiteGameRecordRepository(self.db_manager)
-        saved_game_repo = SQLiteSavedGameRepository(self.db_manager)
-        user_settings_repo = SQLiteUserSettingsRepository(self.db_manager)
+            game_record_repo = SQLiteGameRecordRepository(self.db_manager)
+            saved_game_repo = SQLiteSavedGameRepository(self.db_manager)
+            user_settings_repo = SQLiteUserSettingsRepository(self.db_manager)
 
         game_record_service = GameRecordService(game_record_repo)
         saved_game_service = SavedGameService(saved_game_repo)
@@ -34,7 +68,20 @@ class DatabaseFactory:
 
         return game_record_service, saved_game_service, user_settings_service
 
+    def create_profile_service(self) -> ProfileService:
+        """Створює сервіс профілів гравців (після initialize)"""
+        if self.store is not None:
+            return ProfileService(InMemoryProfileRepository(self.store))
+        return ProfileService(SQLiteProfileRepository(self.db_manager))
+
+    def create_puzzle_service(self) -> PuzzleArchiveService:
+        """Створює сервіс архіву головоломок (після initialize)"""
+        if self.store is not None:
+            return PuzzleArchiveService(InMemoryPuzzleRepository(self.store))
+        return PuzzleArchiveService(SQLitePuzzleRepository(self.db_manager))
+
     def close(self):
         """Закриває з'єднання з базою даних"""
-        self.db_manager.disconnect()
+        if self.db_manager is not None:
+            self.db_manager.disconnect()
 
@@ -1,17 +1,216 @@
 """
 Менеджер бази даних для ініціалізації та управління з'єднанням
 """
+import itertools
+import json
 import sqlite3
 import os
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Dict, List, Optional
 import logging
 
+from .models import DEFAULT_PROFILE_ID, DEFAULT_PROFILE_NAME
+
+# Версія схеми, що зберігається в PRAGMA user_version
+SCHEMA_VERSION = 8
+
+# Значення PRAGMA auto_vacuum для режиму INCREMENTAL
+AUTO_VACUUM_INCREMENTAL = 2
+
+# Номери баз у пам'яті: кожен DatabaseManager(':memory:') отримує власну спільну базу
+_memory_databases = itertools.count(1)
+
+# Розрядність випадкового ключа порядку головоломок архіву (DEFAULT стовпця puzzles.pick_key)
+PUZZLE_PICK_KEY_BITS = 31
+
+# Базові налаштування нового профілю за замовчуванням
+DEFAULT_SETTINGS = [
+    ('theme', 'light'),
+    ('sound_enabled', 'true'),
+    ('auto_notes', 'false'),
+    ('highlight_conflicts', 'true'),
+    ('show_timer', 'true'),
+    ('max_hints', '5')
+]
+
+# Зведена статистика профілю по складності, яку підтримують тригери на game_records.
+# Статистика враховує і архів старих рекордів: архівовані записи не зникають зі статистики гравця
+PLAYER_STATS_SQL = """
+CREATE TABLE IF NOT EXISTS game_records_archive (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    difficulty TEXT NOT NULL,
+    period TEXT NOT NULL,  -- Місяць завершення ігор, YYYY-MM
+    games INTEGER NOT NULL,
+    total_time INTEGER NOT NULL,
+    total_hints INTEGER NOT NULL,
+    best_score INTEGER NOT NULL,
+    best_score_time INTEGER NOT NULL,
+    best_score_hints INTEGER NOT NULL,
+    best_time INTEGER NOT NULL,
+    last_played TEXT NOT NULL,
+    records BLOB NOT NULL,  -- Стиснені zlib рядки архівованих рекордів (JSON)
+    profile_id INTEGER NOT NULL DEFAULT 1
+);
+DROP INDEX IF EXISTS idx_game_records_archive_difficulty;
+CREATE INDEX IF NOT EXISTS idx_game_records_archive_profile
+    ON game_records_archive(profile_id, difficulty, period);
+
+CREATE TABLE IF NOT EXISTS player_stats (
+    profile_id INTEGER NOT NULL,
+    difficulty TEXT NOT NULL,
+    games INTEGER NOT NULL DEFAULT 0,
+    total_time INTEGER NOT NULL DEFAULT 0,
+    best_score_id INTEGER,  -- NULL, якщо найкращий результат уже в архіві
+    best_score INTEGER,
+    best_score_time INTEGER,
+    best_score_hints INTEGER,
+    best_time INTEGER,
+    last_played TEXT,
+    PRIMARY KEY (profile_id, difficulty)
+) WITHOUT ROWID;
+
+CREATE TRIGGER IF NOT EXISTS trg_game_records_stats_insert
+AFTER INSERT ON game_records
+BEGIN
+    INSERT OR IGNORE INTO player_stats (profile_id, difficulty) VALUES (NEW.profile_id, NEW.difficulty);
+    UPDATE player_stats SET
+        games = games + 1,
+        total_time = total_time + NEW.completion_time,
+        best_time = MIN(COALESCE(best_time, NEW.completion_time), NEW.completion_time),
+        last_played = MAX(COALESCE(last_played, NEW.date_completed), NEW.date_completed)
+    WHERE profile_id = NEW.profile_id AND difficulty = NEW.difficulty;
+    -- Порядок як у таблиці лідерів: score DESC, completion_time ASC, id ASC
+    UPDATE player_stats SET
+        best_score_id = NEW.id,
+        best_score = NEW.score,
+        best_score_time = NEW.completion_time,
+        best_score_hints = NEW.hints_used
+    WHERE profile_id = NEW.profile_id AND difficulty = NEW.difficulty
+      AND (best_score IS NULL OR NEW.score > best_score
+           OR (NEW.score = best_score AND NEW.completion_time < best_score_time));
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_game_records_stats_delete
+AFTER DELETE ON game_records
+BEGIN
+    UPDATE player_stats SET
+        games = games - 1,
+        total_time = total_time - OLD.completion_time
+    WHERE profile_id = OLD.profile_id AND difficulty = OLD.difficulty;
+    DELETE FROM player_stats
+    WHERE profile_id = OLD.profile_id AND difficulty = OLD.difficulty AND games <= 0;
+    -- Найкращі значення перераховуються пошуком по індексу, лише якщо видалено саме їх
+    UPDATE player_stats SET
+        best_time = (
+            SELECT MIN(value) FROM (
+                SELECT MIN(completion_time) AS value FROM game_records
+                WHERE profile_id = OLD.profile_id AND difficulty = OLD.difficulty
+                UNION ALL
+                SELECT MIN(best_time) FROM game_records_archive
+                WHERE profile_id = OLD.profile_id AND difficulty = OLD.difficulty
+            )
+        )
+    WHERE profile_id = OLD.profile_id AND difficulty = OLD.difficulty AND best_time = OLD.completion_time;
+    UPDATE player_stats SET
+        last_played = (
+            SELECT MAX(value) FROM (
+                SELECT MAX(date_completed) AS value FROM game_records
+                WHERE profile_id = OLD.profile_id AND difficulty = OLD.difficulty
+                UNION ALL
+                SELECT MAX(last_played) FROM game_records_archive
+                WHERE profile_id = OLD.profile_id AND difficulty = OLD.difficulty
+            )
+        )
+    WHERE profile_id = OLD.profile_id AND difficulty = OLD.difficulty AND last_played = OLD.date_completed;
+    UPDATE player_stats SET (best_score_id, best_score, best_score_time, best_score_hints) = (
+        SELECT id, score, completion_time, hints_used FROM (
+            SELECT * FROM (
+                SELECT id, score, completion_time, hints_used FROM game_records
+                WHERE profile_id = OLD.profile_id AND difficulty = OLD.difficulty
+                ORDER BY score DESC, completion_time ASC, id ASC
+                LIMIT 1
+            )
+            UNION ALL
+            SELECT * FROM (
+                SELECT NULL, best_score, best_score_time, best_score_hints FROM game_records_archive
+                WHERE profile_id = OLD.profile_id AND difficulty = OLD.difficulty
+                ORDER BY best_score DESC, best_score_time ASC
+                LIMIT 1
+            )
+        )
+        ORDER BY score DESC, completion_time ASC
+        LIMIT 1
+    )
+    WHERE profile_id = OLD.profile_id AND difficulty = OLD.difficulty AND best_score_id = OLD.id;
+END;
+
+-- Кількість рекордів усіх гравців з кожним часом завершення на складності. Місце результату
+-- за часом - сума рядків з меншим часом: кількість різних секунд на порядки менша за кількість ігор,
+-- тож ранг не залежить від розміру game_records. Архівовані рекорди тут не враховуються: ранг
+-- рахується серед ігор, що ще лежать у game_records, тоді як player_stats враховує й архів
+CREATE TABLE IF NOT EXISTS completion_time_counts (
+    difficulty TEXT NOT NULL,
+    completion_time INTEGER NOT NULL,
+    games INTEGER NOT NULL,
+    PRIMARY KEY (difficulty, completion_time)
+) WITHOUT ROWID;
+
+CREATE TRIGGER IF NOT EXISTS trg_game_records_time_counts_insert
+AFTER INSERT ON game_records
+BEGIN
+    INSERT INTO completion_time_counts (difficulty, completion_time, games)
+    VALUES (NEW.difficulty, NEW.completion_time, 1)
+    ON CONFLICT (difficulty, completion_time) DO UPDATE SET games = games + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_game_records_time_counts_delete
+AFTER DELETE ON game_records
+BEGIN
+    UPDATE completion_time_counts SET games = games - 1
+    WHERE difficulty = OLD.difficulty AND completion_time = OLD.completion_time;
+    DELETE FROM completion_time_counts
+    WHERE difficulty = OLD.difficulty AND completion_time = OLD.completion_time AND games <= 0;
+END;
+"""
+
+
+@dataclass
+class ConnectionProfile:
+    """Налаштування продуктивності з'єднання SQLite"""
+    journal_mode: str = 'WAL'  # Записи не блокують читачів, менше fsync на коміт
+    synchronous: str = 'NORMAL'  # У режимі WAL безпечно і без fsync на кожну транзакцію
+    mmap_size: int = 64 * 1024 * 1024  # Читання через відображення файлу в пам'ять
+    cache_size: int = -8192  # Від'ємне значення - розмір кешу сторінок у KiB
+    temp_store: str = 'MEMORY'
+    busy_timeout_ms: int = 5000
+    cached_statements: int = 256  # Кеш підготовлених запитів з'єднання (у sqlite3 за замовчуванням 128)
+
+    @classmethod
+    def performance(cls) -> 'ConnectionProfile':
+        """Профіль за замовчуванням для гри"""
+        return cls()
+
+    @classmethod
+    def legacy(cls) -> 'ConnectionProfile':
+        """Налаштування SQLite за замовчуванням (rollback-журнал, повний fsync)"""
+        return cls(journal_mode='DELETE', synchronous='FULL', mmap_size=0, cache_size=-2000,
+                   temp_store='DEFAULT', busy_timeout_ms=5000, cached_statements=128)
+
 
 class DatabaseManager:
-    """Клас для управління базою даних SQLite"""
+    """
+    Клас для управління базою даних SQLite.
+
+    Кожен потік отримує власне з'єднання (get_connection) і лише він ним користується, тож
+    репозиторії можна викликати з будь-якого потоку. У режимі WAL читачі працюють зі знімком
+    бази і не чекають на запис; транзакції запису всіх потоків серіалізує одне блокування.
+    """
 
-    def __init__(self, db_path: Optional[str] = None):
+    def __init__(self, db_path: Optional[str] = None, profile: Optional[ConnectionProfile] = None):
         if db_path is None:
             # Створюємо папку для даних гри
             data_dir = Path.home() / '.sudoku_game'
@@ -19,35 +218,226 @@ class DatabaseManager:
             db_path = str(data_dir / 'sudoku.db')
 
         self.db_path = db_path
-        self.connection: Optional[sqlite3.Connection] = None
+        self.profile = profile or ConnectionProfile.performance()
+
+        # База в пам'яті існує лише в межах з'єднання, тому з'єднання потоків ділять її через спільний кеш
+        self.shared_memory = db_path == ':memory:'
+        self._uri = f"file:sudoku-{next(_memory_databases)}?mode=memory&cache=shared" if self.shared_memory else None
+
+        self._local = threading.local()
+        # З'єднання всіх потоків, щоб закрити їх при завершенні роботи
+        self._connections: Dict[int, sqlite3.Connection] = {}
+        self._connections_lock = threading.Lock()
+        # Один записувач: транзакції запису різних потоків виконуються по черзі
+        self.write_lock = threading.RLock()
+        self._trace_callback: Optional[Callable[[str], None]] = None
 
         # Налаштування логування
         logging.basicConfig(level=logging.INFO)
         self.logger = logging.getLogger(__name__)
 
+    @property
+    def connection(self) -> Optional[sqlite3.Connection]:
+        """З'єднання поточного потоку (None, якщо потік ще не підключався)"""
+        return getattr(self._local, 'connection', None)
+
+    @property
+    def _transaction_depth(self) -> int:
+        return getattr(self._local, 'transaction_depth', 0)
+
+    @_transaction_depth.setter
+    def _transaction_depth(self, value: int):
+        self._local.transaction_depth = value
+
+    @property
+    def _after_commit(self) -> List[Callable[[], None]]:
+        callbacks = getattr(self._local, 'after_commit', None)
+        if callbacks is None:
+            callbacks = self._local.after_commit = []
+        return callbacks
+
+    @_after_commit.setter
+    def _after_commit(self, value: List[Callable[[], None]]):
+        self._local.after_commit = value
+
     def connect(self) -> sqlite3.Connection:
-        """Створює з'єднання з базою даних"""
+        """Створює з'єднання поточного потоку з базою даних"""
         try:
-            self.connection = sqlite3.connect(self.db_path)
-            self.connection.row_factory = sqlite3.Row  # Для роботи з рядками як з словниками
-            self.logger.info(f"Connected to database: {self.db_path}")
-            return self.connection
+            # check_same_thread=False лише для того, щоб disconnect_all міг закрити з'єднання інших
+            # потоків при завершенні роботи; користується з'єднанням тільки потік, що його створив
+            connection = sqlite3.connect(
+                self._uri or self.db_path,
+                timeout=self.profile.busy_timeout_ms / 1000,
+                cached_statements=self.profile.cached_statements,
+                check_same_thread=False,
+                uri=self._uri is not None
+            )
+            connection.row_factory = sqlite3.Row  # Для роботи з рядками як з словниками
+            self._apply_profile(connection)
+            if self._trace_callback is not None:
+                connection.set_trace_callback(self._trace_callback)
+
+            previous = self.connection
+            if previous is not None:
+                previous.close()
+            self._local.connection = connection
+            with self._connections_lock:
+                self._connections[threading.get_ident()] = connection
+            self.logger.info(f"Connected to database: {self.db_path} ({threading.current_thread().name})")
+            return connection
         except sqlite3.Error as e:
             self.logger.error(f"Error connecting to database: {e}")
             raise
 
+    def _apply_profile(self, conn: sqlite3.Connection):
+        """Застосовує PRAGMA-налаштування профілю до з'єднання"""
+        profile = self.profile
+        # Діє лише для ще порожньої бази і має передувати journal_mode, що записує заголовок файлу;
+        # наявні бази переходять у цей режим лише після повного VACUUM, який один раз робить initialize_database
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        journal_mode = conn.execute(f"PRAGMA journal_mode = {profile.journal_mode}").fetchone()[0]
+        conn.execute(f"PRAGMA synchronous = {profile.synchronous}")
+        conn.execute(f"PRAGMA mmap_size = {int(profile.mmap_size)}")
+        conn.execute(f"PRAGMA cache_size = {int(profile.cache_size)}")
+        conn.execute(f"PRAGMA temp_store = {profile.temp_store}")
+        conn.execute(f"PRAGMA busy_timeout = {int(profile.busy_timeout_ms)}")
+
+        if self.shared_memory:
+            # Спільний кеш не має знімків WAL, а таблиці блокуються без очікування busy_timeout;
+            # читачі бази в пам'яті не беруть блокувань і бачать ще не зафіксовані зміни
+            conn.execute("PRAGMA read_uncommitted = 1")
+
+        if journal_mode.upper() != profile.journal_mode.upper():
+            # Наприклад, база в пам'яті завжди використовує журнал MEMORY
+            self.logger.info(f"Journal mode {profile.journal_mode} not available, using {journal_mode}")
+
     def disconnect(self):
-        """Закриває з'єднання з базою даних"""
-        if self.connection:
-            self.connection.close()
-            self.connection = None
+        """Закриває з'єднання поточного потоку"""
+        connection = self.connection
+        if connection is not None:
+            self._local.connection = None
+            with self._connections_lock:
+                self._connections.pop(threading.get_ident(), None)
+            connection.close()
             self.logger.info("Database connection closed")
 
+    def disconnect_all(self):
+        """Закриває з'єднання всіх потоків; викликається, коли інші потоки вже не працюють з базою"""
+        self.disconnect()
+        with self._connections_lock:
+            connections, self._connections = self._connections, {}
+        for connection in connections.values():
+            connection.close()
+
+    def set_trace_callback(self, callback: Optional[Callable[[str], None]]):
+        """Передає callback текст кожного запиту всіх з'єднань, наявних і нових (None - вимикає)"""
+        self._trace_callback = callback
+        with self._connections_lock:
+            for connection in self._connections.values():
+                connection.set_trace_callback(callback)
+
     def get_connection(self) -> sqlite3.Connection:
-        """Повертає поточне з'єднання або створює нове"""
-        if self.connection is None:
+        """Повертає з'єднання поточного потоку або створює нове"""
+        connection = self.connection
+        if connection is None:
             return self.connect()
-        return self.connection
+        return connection
+
+    @contextmanager
+    def transaction(self):
+        """
+        Об'єднує кілька операцій репозиторіїв в одну транзакцію з одним комітом.
+        Зовнішня транзакція тримає блокування запису, тож записи різних потоків не перемежовуються.
+        Транзакція починається явним BEGIN: модуль sqlite3 сам відкриває її лише перед
+        INSERT/UPDATE/DELETE, а DDL (ALTER/CREATE/DROP) без неї фіксується одразу і не відкочується.
+        """
+        conn = self.get_connection()
+        outermost = self._transaction_depth == 0
+        if outermost:
+            self.write_lock.acquire()
+            try:
+                if not conn.in_transaction:
+                    conn.execute("BEGIN")
+            except Exception:
+                self.write_lock.release()
+                raise
+        self._transaction_depth += 1
+        try:
+            yield conn
+        except Exception:
+            self._transaction_depth -= 1
+            if outermost:
+                self._after_commit.clear()
+                try:
+                    conn.rollback()
+                finally:
+                    self.write_lock.release()
+            raise
+        else:
+            self._transaction_depth -= 1
+            if outermost:
+                try:
+                    conn.commit()
+                finally:
+                    self.write_lock.release()
+                self._run_after_commit()
+
+    @contextmanager
+    def savepoint(self):
+        """
+        Частина транзакції, яку можна відкотити окремо: виняток усередині блоку скасовує лише її
+        зміни та callback-и після коміту і передається далі, а решта транзакції продовжується.
+        """
+        with self.transaction() as conn:
+            name = f"sp{self._transaction_depth}"
+            callbacks = len(self._after_commit)
+            conn.execute(f"SAVEPOINT {name}")
+            try:
+                yield conn
+            except Exception:
+                conn.execute(f"ROLLBACK TO {name}")
+                conn.execute(f"RELEASE {name}")
+                del self._after_commit[callbacks:]
+                raise
+            conn.execute(f"RELEASE {name}")
+
+    @contextmanager
+    def snapshot(self):
+        """
+        Виконує кілька запитів читання над одним узгодженим знімком бази (у режимі WAL не чекає
+        на запис інших потоків). Усередині транзакції потоку просто використовує її.
+        """
+        conn = self.get_connection()
+        if self._transaction_depth or conn.in_transaction:
+            yield conn
+            return
+
+        conn.execute("BEGIN")
+        try:
+            yield conn
+        finally:
+            conn.rollback()
+
+    def commit(self):
+        """Фіксує зміни, якщо немає відкритої транзакції (інакше коміт зробить transaction())"""
+        if self._transaction_depth == 0:
+            self.get_connection().commit()
+
+    def call_after_commit(self, callback: Callable[[], None]):
+        """
+        Викликає callback після коміту поточної транзакції (одразу, якщо транзакції немає).
+        Після відкату транзакції callback не викликається.
+        """
+        if self._transaction_depth == 0:
+            callback()
+        else:
+            self._after_commit.append(callback)
+
+    def _run_after_commit(self):
+        """Виконує callback-и, відкладені до коміту"""
+        callbacks, self._after_commit = self._after_commit, []
+        for callback in callbacks:
+            callback()
 
     def initialize_database(self):
         """Ініціалізує базу даних, створюючи необхідні таблиці"""
@@ -56,9 +446,18 @@ class DatabaseManager:
         try:
             # SQL скрипт для створення таблиць
             create_tables_sql = """
+            -- Профілі гравців
+            CREATE TABLE IF NOT EXISTS profiles (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL UNIQUE COLLATE NOCASE,
+                date_created TEXT NOT NULL,
+                last_active TEXT
+            );
+            
             -- Таблиця для рекордів завершених ігор
             CREATE TABLE IF NOT EXISTS game_records (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
+                profile_id INTEGER NOT NULL DEFAULT 1,
                 difficulty TEXT NOT NULL CHECK (difficulty IN ('EASY', 'MEDIUM', 'HARD')),
                 completion_time INTEGER NOT NULL,
                 hints_used INTEGER NOT NULL DEFAULT 0,
@@ -70,72 +469,437 @@ class DatabaseManager:
             -- Таблиця для збережених ігор
             CREATE TABLE IF NOT EXISTS saved_games (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
+                profile_id INTEGER NOT NULL DEFAULT 1,
                 difficulty TEXT NOT NULL CHECK (difficulty IN ('EASY', 'MEDIUM', 'HARD')),
-                current_state TEXT NOT NULL,
-                solution TEXT NOT NULL,
+                state BLOB NOT NULL,  -- Стан дошки і розв'язок у форматі save_format
                 elapsed_time INTEGER NOT NULL DEFAULT 0,
                 hints_used INTEGER NOT NULL DEFAULT 0,
+                filled_cells INTEGER NOT NULL DEFAULT 0,
+                journal_seq INTEGER NOT NULL DEFAULT 0,  -- Останній хід, врахований у знімку state
                 date_saved TEXT NOT NULL,
                 created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
                 updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
             );
             
+            -- Журнал ходів після останнього знімка збереженої гри
+            CREATE TABLE IF NOT EXISTS saved_game_moves (
+                game_id INTEGER NOT NULL,
+                seq INTEGER NOT NULL,
+                move INTEGER NOT NULL,  -- Хід у форматі save_format.pack_move
+                PRIMARY KEY (game_id, seq)
+            ) WITHOUT ROWID;
+            
             -- Таблиця для налаштувань користувача
             CREATE TABLE IF NOT EXISTS user_settings (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
-                setting_name TEXT UNIQUE NOT NULL,
+                profile_id INTEGER NOT NULL DEFAULT 1,
+                setting_name TEXT NOT NULL,
                 setting_value TEXT NOT NULL,
                 created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+                updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE (profile_id, setting_name)
+            );
+            
+            -- Архів головоломок: задані клітинки і розв'язок у форматі save_format.pack_grid
+            CREATE TABLE IF NOT EXISTS puzzles (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                difficulty TEXT NOT NULL CHECK (difficulty IN ('EASY', 'MEDIUM', 'HARD')),
+                givens BLOB NOT NULL,
+                solution BLOB NOT NULL,
+                canonical_hash TEXT NOT NULL UNIQUE,
+                rating INTEGER NOT NULL,
+                generator_version INTEGER NOT NULL,
+                date_created TEXT NOT NULL,
+                -- Випадковий ключ для вибору головоломки: pick_unplayed шукає в індексі першу незіграну
+                -- після випадкового значення, а mark_played дає отриманій головоломці новий ключ
+                pick_key INTEGER NOT NULL DEFAULT (random() & 2147483647)
             );
             
-            -- Індекси для оптимізації запитів
-            CREATE INDEX IF NOT EXISTS idx_game_records_difficulty ON game_records(difficulty);
-            CREATE INDEX IF NOT EXISTS idx_game_records_score ON game_records(score DESC);
+            -- Головоломки архіву, які профіль уже отримував, і його найкращий результат на кожній
+            CREATE TABLE IF NOT EXISTS puzzle_plays (
+                profile_id INTEGER NOT NULL,
+                puzzle_id INTEGER NOT NULL,
+                date_played TEXT NOT NULL,
+                completion_time INTEGER,  -- NULL, поки головоломку не розв'язано
+                hints_used INTEGER,
+                date_completed TEXT,
+                PRIMARY KEY (profile_id, puzzle_id)
+            ) WITHOUT ROWID;
+            
+            -- Індекси для оптимізації запитів. Усі запити гри обмежені профілем, тому profile_id
+            -- стоїть першим: дані одного гравця лежать поруч і не залежать від кількості інших
+            DROP INDEX IF EXISTS idx_game_records_difficulty;
+            DROP INDEX IF EXISTS idx_game_records_difficulty_time;
+            DROP INDEX IF EXISTS idx_game_records_difficulty_score;
+            DROP INDEX IF EXISTS idx_game_records_score;
+            DROP INDEX IF EXISTS idx_game_records_difficulty_leaderboard;
+            DROP INDEX IF EXISTS idx_game_records_leaderboard;
+            -- Пошук найкращого часу для статистики
+            CREATE INDEX IF NOT EXISTS idx_game_records_profile_time
+                ON game_records(profile_id, difficulty, completion_time);
+            -- Покриваючі індекси таблиці лідерів у порядку (score DESC, completion_time ASC, id)
+            CREATE INDEX IF NOT EXISTS idx_game_records_profile_difficulty_leaderboard
+                ON game_records(profile_id, difficulty, score DESC, completion_time ASC, id,
+                                hints_used, date_completed);
+            CREATE INDEX IF NOT EXISTS idx_game_records_profile_leaderboard
+                ON game_records(profile_id, score DESC, completion_time ASC, id,
+                                difficulty, hints_used, date_completed);
             CREATE INDEX IF NOT EXISTS idx_game_records_date ON game_records(date_completed);
-            CREATE INDEX IF NOT EXISTS idx_saved_games_date ON saved_games(date_saved DESC);
-            CREATE INDEX IF NOT EXISTS idx_user_settings_name ON user_settings(setting_name);
+            DROP INDEX IF EXISTS idx_saved_games_date;
+            CREATE INDEX IF NOT EXISTS idx_saved_games_profile_date ON saved_games(profile_id, date_saved DESC);
+            DROP INDEX IF EXISTS idx_user_settings_name;
+            CREATE INDEX IF NOT EXISTS idx_profiles_last_active ON profiles(last_active DESC);
+            -- Випадковий вибір головоломки складності та вибірки за діапазоном рейтингу
+            CREATE INDEX IF NOT EXISTS idx_puzzles_difficulty_pick ON puzzles(difficulty, pick_key);
+            CREATE INDEX IF NOT EXISTS idx_puzzles_difficulty_rating ON puzzles(difficulty, rating);
+            CREATE INDEX IF NOT EXISTS idx_puzzles_rating ON puzzles(rating);
+            -- Результати гравців на одній головоломці від найшвидшого
+            CREATE INDEX IF NOT EXISTS idx_puzzle_plays_puzzle_time
+                ON puzzle_plays(puzzle_id, completion_time, hints_used) WHERE completion_time IS NOT NULL;
             """
 
-            conn.executescript(create_tables_sql)
-            conn.commit()
+            is_new_database = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'saved_games'"
+            ).fetchone() is None
+
+            if is_new_database:
+                # Нова база одразу отримує актуальну схему; перерване створення не лишає
+                # таблиць без номера версії, з якими наступний запуск почав би міграції
+                with self.transaction():
+                    self._execute_script(conn, create_tables_sql)
+                    self._execute_script(conn, PLAYER_STATS_SQL)
+                    conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            else:
+                # Існуючу базу спочатку мігруємо, потім дотворюємо відсутні таблиці та індекси
+                self._migrate_schema(conn)
+                with self.transaction():
+                    self._execute_script(conn, create_tables_sql)
+                    self._execute_script(conn, PLAYER_STATS_SQL)
 
             self.logger.info("Database tables created successfully")
 
-            # Ініціалізуємо базові налаштування
+            # Ініціалізуємо профіль за замовчуванням і його базові налаштування
+            self._initialize_default_profile(conn)
             self._initialize_default_settings(conn)
 
+            if not is_new_database:
+                # Бази, створені до incremental auto-vacuum, перемикаються один раз: інакше фонове
+                # обслуговування гри (vacuum_step) ніколи не поверне їхні вільні сторінки
+                self.enable_incremental_vacuum()
+
         except sqlite3.Error as e:
             self.logger.error(f"Error initializing database: {e}")
             conn.rollback()
             raise
 
+    @staticmethod
+    def _execute_script(conn: sqlite3.Connection, script: str):
+        """
+        Виконує SQL-скрипт по одному запиту в поточній транзакції. На відміну від executescript,
+        який спершу фіксує відкриту транзакцію, зміни скрипту відкочуються разом з нею.
+        """
+        statement = ''
+        for line in script.splitlines(keepends=True):
+            statement += line
+            # Тіло тригера містить ';', тому межу запиту визначає сам SQLite
+            if sqlite3.complete_statement(statement):
+                conn.execute(statement)
+                statement = ''
+
+    def get_schema_version(self) -> int:
+        """Повертає версію схеми бази даних (PRAGMA user_version)"""
+        return self.get_connection().execute("PRAGMA user_version").fetchone()[0]
+
+    def _migrate_schema(self, conn: sqlite3.Connection):
+        """Послідовно застосовує міграції від поточної версії схеми до SCHEMA_VERSION"""
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        migrations = {
+            1: self._migrate_v1_saved_game_progress,
+            2: self._migrate_v2_binary_saved_games,
+            3: self._migrate_v3_move_journal,
+            4: self._migrate_v4_player_stats,
+            5: self._migrate_v5_records_archive,
+            6: self._migrate_v6_profiles,
+            7: self._migrate_v7_time_ranks,
+            8: self._migrate_v8_global_time_ranks,
+        }
+
+        for target_version in range(version + 1, SCHEMA_VERSION + 1):
+            with self.transaction():
+                migrations[target_version](conn)
+                conn.execute(f"PRAGMA user_version = {target_version}")
+            self.logger.info(f"Database schema migrated to version {target_version}")
+
+    def _migrate_v1_saved_game_progress(self, conn: sqlite3.Connection):
+        """Додає кількість заповнених клітинок, щоб список збережень не декодував стан дошки"""
+        self._add_column(conn, 'saved_games', 'filled_cells', "INTEGER NOT NULL DEFAULT 0")
+
+        rows = conn.execute("SELECT id, current_state FROM saved_games").fetchall()
+        for row in rows:
+            try:
+                state = json.loads(row['current_state'])
+                filled = sum(1 for state_row in state for cell in state_row if cell.get('value'))
+            except (TypeError, ValueError, AttributeError) as e:
+                # Пошкоджене збереження не повинно блокувати запуск: лишаємо 0 заповнених клітинок
+                self.logger.warning(f"Skipping filled cells of saved game {row['id']}: {e}")
+                continue
+            conn.execute("UPDATE saved_games SET filled_cells = ? WHERE id = ?", (filled, row['id']))
+
+    def _migrate_v2_binary_saved_games(self, conn: sqlite3.Connection):
+        """Перебудовує таблицю збережень з JSON-стовпців на бінарний блок save_format"""
+        from .save_format import grid_from_legacy_state, pack_board
+
+        # Таблицю могла лишити перервана міграція з версії, що ще не виконувала її в одній транзакції
+        conn.execute("DROP TABLE IF EXISTS saved_games_new")
+        conn.execute("""
+            CREATE TABLE saved_games_new (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                difficulty TEXT NOT NULL CHECK (difficulty IN ('EASY', 'MEDIUM', 'HARD')),
+                state BLOB NOT NULL,
+                elapsed_time INTEGER NOT NULL DEFAULT 0,
+                hints_used INTEGER NOT NULL DEFAULT 0,
+                filled_cells INTEGER NOT NULL DEFAULT 0,
+                date_saved TEXT NOT NULL,
+                created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+
+        rows = conn.execute("SELECT * FROM saved_games").fetchall()
+        for row in rows:
+            try:
+                grid = grid_from_legacy_state(json.loads(row['current_state']))
+                state = pack_board(grid, json.loads(row['solution']))
+            except (TypeError, ValueError, KeyError, IndexError, AttributeError) as e:
+                # Збереження, яке не вдається розібрати, не переноситься, але й не блокує запуск
+                self.logger.warning(f"Dropping saved game {row['id']} that cannot be converted: {e}")
+                continue
+            conn.execute("""
+                INSERT INTO saved_games_new (id, difficulty, state, elapsed_time, hints_used, filled_cells,
+                                             date_saved, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (row['id'], row['difficulty'], state, row['elapsed_time'], row['hints_used'],
+                  row['filled_cells'], row['date_saved'], row['created_at'], row['updated_at']))
+
+        conn.execute("DROP TABLE saved_games")
+        conn.execute("ALTER TABLE saved_games_new RENAME TO saved_games")
+
+    def _migrate_v3_move_journal(self, conn: sqlite3.Connection):
+        """Додає позицію журналу ходів до збережених ігор (таблицю журналу створює основний скрипт)"""
+        self._add_column(conn, 'saved_games', 'journal_seq', "INTEGER NOT NULL DEFAULT 0")
+
+    def _migrate_v4_player_stats(self, conn: sqlite3.Connection):
+        """Створює таблицю статистики з тригерами і заповнює її з наявних рекордів"""
+        self._create_player_stats(conn)
+
+    def _migrate_v5_records_archive(self, conn: sqlite3.Connection):
+        """Додає архів рекордів і перестворює тригери статистики, щоб вони враховували архів"""
+        self._create_player_stats(conn)
+
+    def _migrate_v6_profiles(self, conn: sqlite3.Connection):
+        """Прив'язує рекорди, збереження та налаштування до профілю (наявні дані - до профілю за замовчуванням)"""
+        self._add_profile_column(conn, 'saved_games')
+
+        # Унікальність назви налаштування тепер у межах профілю, а обмеження UNIQUE змінюється
+        # лише перебудовою таблиці
+        conn.execute("""
+            CREATE TABLE user_settings_new (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                profile_id INTEGER NOT NULL DEFAULT 1,
+                setting_name TEXT NOT NULL,
+                setting_value TEXT NOT NULL,
+                created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE (profile_id, setting_name)
+            )
+        """)
+        conn.execute("""
+            INSERT INTO user_settings_new (id, profile_id, setting_name, setting_value, created_at, updated_at)
+            SELECT id, ?, setting_name, setting_value, created_at, updated_at FROM user_settings
+        """, (DEFAULT_PROFILE_ID,))
+        conn.execute("DROP TABLE user_settings")
+        conn.execute("ALTER TABLE user_settings_new RENAME TO user_settings")
+
+        # Первинний ключ статистики тепер (profile_id, difficulty)
+        self._create_player_stats(conn)
+
+    def _migrate_v7_time_ranks(self, conn: sqlite3.Connection):
+        """Додає лічильники часу завершення для рангу результату і заповнює їх з наявних рекордів"""
+        self._create_player_stats(conn)
+
+    def _migrate_v8_global_time_ranks(self, conn: sqlite3.Connection):
+        """Перебудовує лічильники часу завершення спільними для всіх профілів (ранг серед усіх гравців)"""
+        self._create_player_stats(conn)
+
+    def _add_column(self, conn: sqlite3.Connection, table: str, column: str, definition: str):
+        """Додає стовпець до наявної таблиці, якщо його ще немає"""
+        columns = {row['name'] for row in conn.execute(f"PRAGMA table_info({table})")}
+        if columns and column not in columns:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+    def _add_profile_column(self, conn: sqlite3.Connection, table: str):
+        """Додає стовпець profile_id до наявної таблиці, якщо його ще немає"""
+        self._add_column(conn, table, 'profile_id', f"INTEGER NOT NULL DEFAULT {DEFAULT_PROFILE_ID}")
+
+    def _create_player_stats(self, conn: sqlite3.Connection):
+        """
+        Перестворює статистику з тригерами за актуальним PLAYER_STATS_SQL і заповнює її.
+        Актуальна схема статистики розрахована на профілі, тому спершу додається profile_id.
+        """
+        self._add_profile_column(conn, 'game_records')
+        self._add_profile_column(conn, 'game_records_archive')
+        conn.execute("DROP TRIGGER IF EXISTS trg_game_records_stats_insert")
+        conn.execute("DROP TRIGGER IF EXISTS trg_game_records_stats_delete")
+        conn.execute("DROP TRIGGER IF EXISTS trg_game_records_time_counts_insert")
+        conn.execute("DROP TRIGGER IF EXISTS trg_game_records_time_counts_delete")
+        conn.execute("DROP TABLE IF EXISTS player_stats")
+        conn.execute("DROP TABLE IF EXISTS completion_time_counts")
+        self._execute_script(conn, PLAYER_STATS_SQL)
+        self.rebuild_player_stats(conn)
+
+    def rebuild_player_stats(self, conn: Optional[sqlite3.Connection] = None):
+        """
+        Перераховує player_stats з таблиці game_records та архіву старих рекордів, а також
+        лічильники часу завершення (усе, що підтримують тригери на game_records)
+        """
+        conn = conn or self.get_connection()
+        conn.execute("DELETE FROM completion_time_counts")
+        conn.execute("""
+            INSERT INTO completion_time_counts (difficulty, completion_time, games)
+            SELECT difficulty, completion_time, COUNT(*)
+            FROM game_records
+            GROUP BY difficulty, completion_time
+        """)
+        conn.execute("DELETE FROM player_stats")
+        conn.execute("""
+            INSERT INTO player_stats (profile_id, difficulty, games, total_time, best_score_id, best_score,
+                                      best_score_time, best_score_hints, best_time, last_played)
+            SELECT totals.profile_id, totals.difficulty, totals.games, totals.total_time,
+                   best.id, best.score, best.completion_time, best.hints_used,
+                   totals.best_time, totals.last_played
+            FROM (
+                SELECT profile_id, difficulty, COUNT(*) AS games, SUM(completion_time) AS total_time,
+                       MIN(completion_time) AS best_time, MAX(date_completed) AS last_played
+                FROM game_records
+                GROUP BY profile_id, difficulty
+            ) AS totals
+            JOIN game_records AS best ON best.id = (
+                SELECT id FROM game_records
+                WHERE profile_id = totals.profile_id AND difficulty = totals.difficulty
+                ORDER BY score DESC, completion_time ASC, id ASC
+                LIMIT 1
+            )
+        """)
+
+        # Додаємо підсумки архіву старих рекордів
+        conn.execute("""
+            INSERT INTO player_stats (profile_id, difficulty, games, total_time, best_time, last_played)
+            SELECT profile_id, difficulty, SUM(games), SUM(total_time), MIN(best_time), MAX(last_played)
+            FROM game_records_archive
+            WHERE true
+            GROUP BY profile_id, difficulty
+            ON CONFLICT (profile_id, difficulty) DO UPDATE SET
+                games = games + excluded.games,
+                total_time = total_time + excluded.total_time,
+                best_time = MIN(best_time, excluded.best_time),
+                last_played = MAX(last_played, excluded.last_played)
+        """)
+        conn.execute("""
+            UPDATE player_stats SET (best_score_id, best_score, best_score_time, best_score_hints) = (
+                SELECT NULL, archive.best_score, archive.best_score_time, archive.best_score_hints
+                FROM game_records_archive AS archive
+                WHERE archive.profile_id = player_stats.profile_id
+                  AND archive.difficulty = player_stats.difficulty
+                ORDER BY archive.best_score DESC, archive.best_score_time ASC
+                LIMIT 1
+            )
+            WHERE EXISTS (
+                SELECT 1 FROM game_records_archive AS archive
+                WHERE archive.profile_id = player_stats.profile_id
+                  AND archive.difficulty = player_stats.difficulty
+                  AND (player_stats.best_score IS NULL
+                       OR archive.best_score > player_stats.best_score
+                       OR (archive.best_score = player_stats.best_score
+                           AND archive.best_score_time < player_stats.best_score_time))
+            )
+        """)
+
+    def page_stats(self) -> Dict[str, int]:
+        """Повертає розмір сторінки, кількість сторінок і вільних сторінок файлу бази"""
+        conn = self.get_connection()
+        return {
+            'page_size': conn.execute("PRAGMA page_size").fetchone()[0],
+            'page_count': conn.execute("PRAGMA page_count").fetchone()[0],
+            'freelist_count': conn.execute("PRAGMA freelist_count").fetchone()[0],
+            'auto_vacuum': conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+        }
+
+    def enable_incremental_vacuum(self) -> bool:
+        """
+        Вмикає auto_vacuum=INCREMENTAL для бази, створеної без нього. Потребує повного VACUUM поза
+        транзакцією, тому викликається при ініціалізації бази (до запуску потоку запису) і з команди
+        обслуговування. Повертає True, якщо режим змінено.
+        """
+        conn = self.get_connection()
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == AUTO_VACUUM_INCREMENTAL:
+            return False
+
+        conn.commit()
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        conn.execute("VACUUM")
+        self.logger.info("Incremental auto-vacuum enabled")
+        return True
+
+    def incremental_vacuum(self, pages: Optional[int] = None) -> int:
+        """Повертає файлу до pages вільних сторінок (усі, якщо None) і повідомляє, скільки звільнено"""
+        conn = self.get_connection()
+        before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        steps = before if pages is None else min(pages, before)
+        with self.transaction() as conn:
+            # Прагма звільняє одну сторінку за крок, а модуль sqlite3 виконує лише перший крок
+            # запиту без стовпців результату, тому кроки робимо окремими викликами в одній транзакції
+            for _ in range(steps):
+                conn.execute("PRAGMA incremental_vacuum(1)")
+        return before - conn.execute("PRAGMA freelist_count").fetchone()[0]
+
+    def _initialize_default_profile(self, conn: sqlite3.Connection):
+        """Створює профіль за замовчуванням, якому належать дані без явного профілю"""
+        conn.execute("""
+            INSERT OR IGNORE INTO profiles (id, name, date_created) VALUES (?, ?, ?)
+        """, (DEFAULT_PROFILE_ID, DEFAULT_PROFILE_NAME, datetime.now().isoformat()))
+        conn.commit()
+
     def _initialize_default_settings(self, conn: sqlite3.Connection):
         """Ініціалізує базові налаштування користувача"""
-        default_settings = [
-            ('theme', 'light'),
-            ('sound_enabled', 'true'),
-            ('auto_notes', 'false'),
-            ('highlight_conflicts', 'true'),
-            ('show_timer', 'true'),
-            ('max_hints', '5')
-        ]
-
-        for setting_name, setting_value in default_settings:
+        for setting_name, setting_value in DEFAULT_SETTINGS:
             conn.execute("""
-                INSERT OR IGNORE INTO user_settings (setting_name, setting_value)
-                VALUES (?, ?)
-            """, (setting_name, setting_value))
+                INSERT OR IGNORE INTO user_settings (profile_id, setting_name, setting_value)
+                VALUES (?, ?, ?)
+            """, (DEFAULT_PROFILE_ID, setting_name, setting_value))
 
         conn.commit()
         self.logger.info("Default settings initialized")
 
-    def backup_database(self, backup_path: str):
-        """Створює резервну копію бази даних"""
+    def backup_database(self, backup_path: str, pages: int = 256, progress=None, compress: bool = False) -> str:
+        """
+        Створює узгоджену резервну копію через sqlite3 backup API, не зупиняючи запис у базу.
+        Для фонового та періодичного копіювання використовуйте BackupManager.
+        """
+        from .backup import online_backup
+
         try:
-            import shutil
-            shutil.copy2(self.db_path, backup_path)
-            self.logger.info(f"Database backed up to: {backup_path}")
+            if self.db_path == ':memory:':
+                source = self.get_connection()
+            else:
+                # Окреме з'єднання бачить лише зафіксовані дані, навіть якщо основне в середині транзакції
+                source = sqlite3.connect(self.db_path)
+            try:
+                path = online_backup(source, backup_path, pages, progress, compress)
+            finally:
+                if source is not self.connection:
+                    source.close()
+            self.logger.info(f"Database backed up to: {path}")
+            return path
         except Exception as e:
             self.logger.error(f"Error creating backup: {e}")
             raise
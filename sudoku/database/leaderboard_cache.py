@@ -0,0 +1,136 @@
+"""
+Кеш верхньої частини таблиці лідерів і персональної статистики профілів
+"""
+import threading
+from bisect import bisect_right
+from typing import Any, Dict, List, Optional, Tuple
+
+from .models import GameRecord, LeaderboardCursor
+from ..models import Difficulty
+
+# Ключ сортування таблиці лідерів: score DESC, completion_time ASC, id ASC
+SortKey = Tuple[int, int, int]
+
+
+def _sort_key(score: int, completion_time: int, record_id: int) -> SortKey:
+    """Повертає ключ, за яким записи впорядковані в таблиці лідерів"""
+    return -score, completion_time, record_id
+
+
+class _Board:
+    """Перші записи таблиці лідерів профілю на одній складності (або всіх, якщо складність None)"""
+
+    def __init__(self, records: List[GameRecord], complete: bool):
+        self.keys: List[SortKey] = [_sort_key(r.score, r.completion_time, r.id) for r in records]
+        self.records = list(records)
+        # True, якщо в кеші всі записи з бази, а не лише перші
+        self.complete = complete
+
+
+class LeaderboardCache:
+    """
+    Тримає перші capacity записів кожної складності кожного профілю, впорядковані як у таблиці лідерів.
+    Новий рекорд вставляється бінарним пошуком, видалений - прибирається з кешу, тож повторно
+    читати базу потрібно лише для сторінок за межами кешу. Спільний для сервісів головного
+    потоку і потоку запису, тому всі операції виконуються під блокуванням.
+    """
+
+    def __init__(self, capacity: int = 50):
+        self.capacity = capacity
+        self._boards: Dict[Tuple[int, Optional[Difficulty]], _Board] = {}
+        self._personal_stats: Dict[int, Dict[str, Any]] = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    @property
+    def generation(self) -> int:
+        """Лічильник змін; читання з бази зберігається в кеш, лише якщо він не змінився"""
+        return self._generation
+
+    def get_page(self, profile_id: int, difficulty: Optional[Difficulty], limit: int,
+                 after: Optional[LeaderboardCursor] = None) -> Optional[List[GameRecord]]:
+        """Повертає сторінку з кешу або None, якщо кеш не містить її повністю"""
+        with self._lock:
+            board = self._boards.get((profile_id, difficulty))
+            if board is None:
+                return None
+
+            start = 0
+            if after is not None:
+                start = bisect_right(board.keys, _sort_key(after.score, after.completion_time, after.id))
+            if start + limit > len(board.records) and not board.complete:
+                return None
+            return board.records[start:start + limit]
+
+    def store(self, profile_id: int, difficulty: Optional[Difficulty], records: List[GameRecord],
+              generation: int) -> None:
+        """Зберігає перші записи, прочитані з бази, якщо відтоді кеш не змінювався"""
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._boards[(profile_id, difficulty)] = _Board(records[:self.capacity],
+                                                            len(records) < self.capacity)
+
+    def get_personal_stats(self, profile_id: int) -> Optional[Dict[str, Any]]:
+        """Повертає збережену персональну статистику профілю"""
+        with self._lock:
+            return self._personal_stats.get(profile_id)
+
+    def store_personal_stats(self, profile_id: int, stats: Dict[str, Any], generation: int) -> None:
+        """Зберігає персональну статистику профілю, якщо відтоді кеш не змінювався"""
+        with self._lock:
+            if generation == self._generation:
+                self._personal_stats[profile_id] = stats
+
+    def add(self, record: GameRecord) -> None:
+        """Вставляє новий рекорд у таблиці його профілю для його складності та всіх складностей"""
+        key = _sort_key(record.score, record.completion_time, record.id)
+        with self._lock:
+            self._generation += 1
+            self._personal_stats.pop(record.profile_id, None)
+            for difficulty in (record.difficulty, None):
+                board = self._boards.get((record.profile_id, difficulty))
+                if board is None:
+                    continue
+                # Запис після останнього в неповному кеші може бути не на своєму місці
+                if not board.complete and (not board.keys or key > board.keys[-1]):
+                    continue
+
+                index = bisect_right(board.keys, key)
+                if index and board.keys[index - 1] == key:
+                    # Запис уже потрапив у кеш разом з читанням з бази
+                    continue
+                board.keys.insert(index, key)
+                board.records.insert(index, record)
+                if len(board.records) > self.capacity:
+                    board.keys.pop()
+                    board.records.pop()
+                    board.complete = False
+
+    def remove(self, record_id: int) -> None:
+        """Прибирає видалений рекорд; решта кешу лишається коректним початком таблиці"""
+        with self._lock:
+            self._generation += 1
+            # Профіль видаленого запису невідомий, тому скидаємо статистику всіх профілів
+            self._personal_stats.clear()
+            for board in self._boards.values():
+                for index, record in enumerate(board.records):
+                    if record.id == record_id:
+                        del board.keys[index]
+                        del board.records[index]
+                        break
+
+    def discard_profile(self, profile_id: int) -> None:
+        """Прибирає з кешу все, що належить профілю"""
+        with self._lock:
+            self._generation += 1
+            for key in [key for key in self._boards if key[0] == profile_id]:
+                del self._boards[key]
+            self._personal_stats.pop(profile_id, None)
+
+    def clear(self) -> None:
+        """Скидає весь кеш (після масових змін рекордів)"""
+        with self._lock:
+            self._generation += 1
+            self._boards.clear()
+            self._personal_stats.clear()
@@ -0,0 +1,126 @@
+"""
+Обслуговування сховища: ліміт збережень, архівування старих рекордів і повернення вільних сторінок
+
+Запуск:
+    python -m sudoku.database.maintenance [--db PATH] [--keep-saves N] [--archive-days D]
+"""
+import argparse
+import logging
+import sys
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+from .database_manager import AUTO_VACUUM_INCREMENTAL, DatabaseManager
+from .services import GameRecordService, SavedGameService
+from .sqlite_repositories import SQLiteGameRecordRepository, SQLiteSavedGameRepository
+
+
+@dataclass
+class MaintenanceReport:
+    """Результат обслуговування"""
+    pages_before: Dict[str, int]
+    pages_after: Dict[str, int] = field(default_factory=dict)
+    saves_deleted: int = 0
+    records_archived: int = 0
+    pages_freed: int = 0
+    vacuumed: bool = False
+
+    @property
+    def bytes_reclaimed(self) -> int:
+        """Наскільки зменшився файл бази"""
+        if not self.pages_after:
+            return 0
+        return ((self.pages_before['page_count'] - self.pages_after['page_count'])
+                * self.pages_before['page_size'])
+
+
+class StorageMaintenance:
+    """Застосовує політики зберігання та стискає файл бази"""
+
+    def __init__(self, db_manager: DatabaseManager, game_record_service: Optional[GameRecordService] = None):
+        self.db_manager = db_manager
+        # Сервіс гри передається, щоб архівування скинуло його кеш таблиці лідерів
+        self.game_record_service = game_record_service or GameRecordService(SQLiteGameRecordRepository(db_manager))
+        self.saved_game_service = SavedGameService(SQLiteSavedGameRepository(db_manager))
+        self.logger = logging.getLogger(__name__)
+
+    def apply_retention(self, keep_saves: Optional[int],
+                        archive_after_days: Optional[int] = None) -> Tuple[int, int]:
+        """Видаляє зайві збереження та архівує старі рекорди; повертає (видалено, заархівовано)"""
+        saves_deleted = 0
+        records_archived = 0
+        if keep_saves is not None:
+            saves_deleted = self.saved_game_service.prune_saves(keep_saves)
+        if archive_after_days is not None:
+            records_archived = self.game_record_service.archive_old_records(archive_after_days)
+
+        if saves_deleted or records_archived:
+            self.logger.info(f"Retention: {saves_deleted} saves deleted, {records_archived} records archived")
+        return saves_deleted, records_archived
+
+    def vacuum_step(self, pages: int) -> bool:
+        """Звільняє до pages сторінок; повертає True, якщо вільні сторінки ще лишились"""
+        stats = self.db_manager.page_stats()
+        if stats['auto_vacuum'] != AUTO_VACUUM_INCREMENTAL or not stats['freelist_count']:
+            return False
+        self.db_manager.incremental_vacuum(pages)
+        return self.db_manager.page_stats()['freelist_count'] > 0
+
+    def run(self, keep_saves: Optional[int], archive_after_days: Optional[int] = None,
+            full_vacuum: bool = False) -> MaintenanceReport:
+        """
+        Повне обслуговування для команди: політики зберігання, потім повернення всіх вільних сторінок.
+        База без incremental auto-vacuum (або full_vacuum=True) перебудовується повним VACUUM.
+        """
+        report = MaintenanceReport(pages_before=self.db_manager.page_stats())
+        report.saves_deleted, report.records_archived = self.apply_retention(keep_saves, archive_after_days)
+
+        if full_vacuum or report.pages_before['auto_vacuum'] != AUTO_VACUUM_INCREMENTAL:
+            free_before = self.db_manager.page_stats()['freelist_count']
+            if not self.db_manager.enable_incremental_vacuum():
+                self.db_manager.commit()
+                self.db_manager.get_connection().execute("VACUUM")
+            report.vacuumed = True
+            report.pages_freed = free_before
+        else:
+            report.pages_freed = self.db_manager.incremental_vacuum()
+
+        report.pages_after = self.db_manager.page_stats()
+        return report
+
+
+def _format_stats(stats: Dict[str, int]) -> str:
+    """Форматує статистику сторінок для виводу"""
+    size_kb = stats['page_count'] * stats['page_size'] / 1024
+    return f"{stats['page_count']} pages ({size_kb:.1f} KiB), {stats['freelist_count']} free"
+
+
+def main(argv=None) -> int:
+    """Точка входу командного рядка"""
+    from ..config import SAVES_KEEP_PER_DIFFICULTY, RECORDS_ARCHIVE_AFTER_DAYS
+
+    parser = argparse.ArgumentParser(description="Sudoku database storage maintenance")
+    parser.add_argument('--db', default=None, help="Database path (default: ~/.sudoku_game/sudoku.db)")
+    parser.add_argument('--keep-saves', type=int, default=SAVES_KEEP_PER_DIFFICULTY,
+                        help="Saved games to keep per difficulty")
+    parser.add_argument('--archive-days', type=int, default=RECORDS_ARCHIVE_AFTER_DAYS,
+                        help="Archive game records older than this many days")
+    parser.add_argument('--full', action='store_true', help="Rebuild the file with a full VACUUM")
+    args = parser.parse_args(argv)
+
+    db_manager = DatabaseManager(args.db)
+    db_manager.initialize_database()
+    try:
+        report = StorageMaintenance(db_manager).run(args.keep_saves, args.archive_days, args.full)
+    finally:
+        db_manager.disconnect()
+
+    print(f"Before: {_format_stats(report.pages_before)}")
+    print(f"After:  {_format_stats(report.pages_after)}")
+    print(f"Saves deleted: {report.saves_deleted}, records archived: {report.records_archived}, "
+          f"pages freed: {report.pages_freed}{' (full vacuum)' if report.vacuumed else ''}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,708 @@
+"""
+Реалізації репозиторіїв у пам'яті для тестів, бенчмарків і симуляцій без диска
+
+Порядок результатів такий самий, як у SQLite реалізацій: таблиця лідерів - score DESC,
+completion_time ASC, id ASC; збереження - date_saved DESC.
+"""
+import random
+from bisect import bisect_left, bisect_right
+from dataclasses import replace
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from .repositories import (
+    IGameRecordRepository, IProfileRepository, IPuzzleRepository, ISavedGameRepository, IUserSettingsRepository
+)
+from .database_manager import DEFAULT_SETTINGS, PUZZLE_PICK_KEY_BITS
+from .models import (
+    DEFAULT_PROFILE_ID, DEFAULT_PROFILE_NAME, ArchivedPuzzle, GameRecord, LeaderboardCursor, Profile,
+    PuzzleResult, SavedGame, SavedGameSummary, UserSetting
+)
+from .save_format import pack_board
+from ..models import Difficulty
+
+# Ключ таблиці лідерів: score DESC, completion_time ASC, id ASC
+SortKey = Tuple[int, int, int]
+
+
+class _SortedKeys:
+    """
+    Ключі таблиці лідерів. Нові ключі лише дописуються в кінець, а сортуються перед першим
+    читанням: симуляція, що записує мільйони ігор, не платить за вставку в середину списку,
+    а сортування Timsort відсортованого списку з дописаним хвостом майже лінійне.
+    """
+
+    def __init__(self):
+        self._keys: List[SortKey] = []
+        self._pending: List[SortKey] = []
+
+    def __len__(self) -> int:
+        return len(self._keys) + len(self._pending)
+
+    def add(self, key: SortKey):
+        """Додає ключ"""
+        self._pending.append(key)
+
+    def remove(self, key: SortKey):
+        """Видаляє ключ"""
+        keys = self.sorted()
+        index = bisect_left(keys, key)
+        if index < len(keys) and keys[index] == key:
+            del keys[index]
+
+    def sorted(self) -> List[SortKey]:
+        """Повертає всі ключі у порядку таблиці лідерів"""
+        if self._pending:
+            self._keys.extend(self._pending)
+            self._pending.clear()
+            self._keys.sort()
+        return self._keys
+
+
+# Найкращий результат статистики: (ID запису або None для архіву, score, completion_time, hints_used)
+BestScore = Tuple[Optional[int], int, int, int]
+
+
+def _better(candidate: Optional[BestScore], current: Optional[BestScore]) -> bool:
+    """Чи кращий candidate за current; рівний результат не замінює вже записаний, як у тригерах"""
+    if candidate is None:
+        return False
+    return current is None or (-candidate[1], candidate[2]) < (-current[1], current[2])
+
+
+class _RecordGroup:
+    """Рекорди профілю на одній складності та рядок статистики, який у SQLite підтримують тригери"""
+
+    def __init__(self):
+        self.keys = _SortedKeys()
+        self.games = 0
+        self.total_time = 0
+        self.best: Optional[BestScore] = None
+        self.best_time: Optional[int] = None
+        self.last_played: Optional[str] = None
+
+
+class _ArchiveTotals:
+    """Підсумки архівованих рекордів профілю на одній складності"""
+
+    def __init__(self):
+        self.games = 0
+        self.total_time = 0
+        self.best: Optional[BestScore] = None
+        self.best_time: Optional[int] = None
+        self.last_played: Optional[str] = None
+
+
+class InMemoryStore:
+    """Спільне сховище таблиць для репозиторіїв у пам'яті (аналог з'єднання з базою)"""
+
+    def __init__(self):
+        self.game_records: Dict[int, GameRecord] = {}
+        self.record_groups: Dict[Tuple[int, Difficulty], _RecordGroup] = {}
+        # Ключі (completion_time, id) живих записів усіх профілів - аналог completion_time_counts
+        self.record_times: Dict[Difficulty, _SortedKeys] = {}
+        self.profile_boards: Dict[int, _SortedKeys] = {}
+        self.records_archive: Dict[Tuple[int, Difficulty], _ArchiveTotals] = {}
+        self.saved_games: Dict[int, Dict[str, Any]] = {}
+        self.saved_game_moves: Dict[int, Dict[int, int]] = {}
+        self.user_settings: Dict[Tuple[int, str], UserSetting] = {}
+        self.profiles: Dict[int, Profile] = {}
+        self.puzzles: Dict[int, ArchivedPuzzle] = {}
+        self.puzzle_hashes: Dict[str, int] = {}
+        # Ключі (rating, id) і (pick_key, id) головоломок кожної складності - аналоги індексів puzzles
+        self.puzzle_ratings: Dict[Difficulty, _SortedKeys] = {}
+        self.puzzle_picks: Dict[Difficulty, _SortedKeys] = {}
+        # Поточний pick_key кожної головоломки, щоб замінити її ключ у puzzle_picks
+        self.puzzle_pick_keys: Dict[int, int] = {}
+        self.puzzle_plays: Dict[Tuple[int, int], Dict[str, Any]] = {}
+        self._sequences: Dict[str, int] = {}
+
+    def initialize(self):
+        """Створює профіль за замовчуванням і його базові налаштування, як initialize_database"""
+        if DEFAULT_PROFILE_ID not in self.profiles:
+            self.profiles[DEFAULT_PROFILE_ID] = Profile(DEFAULT_PROFILE_ID, DEFAULT_PROFILE_NAME, datetime.now())
+            self._sequences['profiles'] = max(self._sequences.get('profiles', 0), DEFAULT_PROFILE_ID)
+        for setting_name, setting_value in DEFAULT_SETTINGS:
+            key = (DEFAULT_PROFILE_ID, setting_name)
+            if key not in self.user_settings:
+                self.user_settings[key] = UserSetting(self.next_id('user_settings'), setting_name,
+                                                      setting_value, DEFAULT_PROFILE_ID)
+
+    def next_id(self, table: str) -> int:
+        """Видає наступний ID таблиці (як AUTOINCREMENT)"""
+        value = self._sequences.get(table, 0) + 1
+        self._sequences[table] = value
+        return value
+
+
+def _record_key(record: GameRecord) -> SortKey:
+    """Повертає ключ запису в таблиці лідерів"""
+    return -record.score, record.completion_time, record.id
+
+
+class InMemoryGameRecordRepository(IGameRecordRepository):
+    """Репозиторій рекордів у пам'яті: словник записів і відсортовані ключі таблиць лідерів"""
+
+    def __init__(self, store: InMemoryStore):
+        self.store = store
+
+    def save(self, record: GameRecord) -> int:
+        """Зберігає запис про гру і повертає ID"""
+        record = replace(record, id=self.store.next_id('game_records'))
+        self.store.game_records[record.id] = record
+
+        group = self.store.record_groups.get((record.profile_id, record.difficulty))
+        if group is None:
+            group = self.store.record_groups[(record.profile_id, record.difficulty)] = _RecordGroup()
+        group.keys.add(_record_key(record))
+        times = self.store.record_times.setdefault(record.difficulty, _SortedKeys())
+        times.add((record.completion_time, record.id))
+        group.games += 1
+        group.total_time += record.completion_time
+        best = (record.id, record.score, record.completion_time, record.hints_used)
+        if _better(best, group.best):
+            group.best = best
+        if group.best_time is None or record.completion_time < group.best_time:
+            group.best_time = record.completion_time
+        date_completed = record.date_completed.isoformat()
+        if group.last_played is None or date_completed > group.last_played:
+            group.last_played = date_completed
+
+        self.store.profile_boards.setdefault(record.profile_id, _SortedKeys()).add(_record_key(record))
+        return record.id
+
+    def get_by_id(self, record_id: int, profile_id: Optional[int] = None) -> Optional[GameRecord]:
+        """Отримує запис за ID; з profile_id запис іншого профілю не повертається"""
+        record = self.store.game_records.get(record_id)
+        if record is None or (profile_id is not None and record.profile_id != profile_id):
+            return None
+        return record
+
+    def _records(self, keys: List[SortKey]) -> List[GameRecord]:
+        """Перетворює ключі таблиці лідерів на записи"""
+        records = self.store.game_records
+        return [records[key[2]] for key in keys]
+
+    def _board(self, profile_id: int, difficulty: Optional[Difficulty]) -> List[SortKey]:
+        """Повертає відсортовані ключі таблиці лідерів профілю"""
+        if difficulty is None:
+            board = self.store.profile_boards.get(profile_id)
+        else:
+            group = self.store.record_groups.get((profile_id, difficulty))
+            board = group.keys if group else None
+        return board.sorted() if board else []
+
+    def get_all(self, profile_id: int) -> List[GameRecord]:
+        """Отримує всі записи профілю"""
+        records = self._records(self._board(profile_id, None))
+        return sorted(records, key=lambda record: record.date_completed, reverse=True)
+
+    def get_by_difficulty(self, profile_id: int, difficulty: Difficulty) -> List[GameRecord]:
+        """Отримує записи профілю за рівнем складності"""
+        return self._records(self._board(profile_id, difficulty))
+
+    def get_top_scores(self, profile_id: int, limit: int = 10) -> List[GameRecord]:
+        """Отримує топ результатів профілю"""
+        return self._records(self._board(profile_id, None)[:limit])
+
+    def get_leaderboard_page(self, profile_id: int, difficulty: Optional[Difficulty], limit: int,
+                             after: Optional[LeaderboardCursor] = None) -> List[GameRecord]:
+        """Отримує сторінку таблиці лідерів профілю бінарним пошуком від курсора"""
+        keys = self._board(profile_id, difficulty)
+        start = 0
+        if after is not None:
+            start = bisect_right(keys, (-after.score, after.completion_time, after.id))
+        return self._records(keys[start:start + limit])
+
+    def get_difficulty_stats(self, profile_id: int) -> Dict[Difficulty, Dict[str, Any]]:
+        """Повертає статистику профілю по складності разом з архівом"""
+        stats = {}
+        for difficulty in Difficulty:
+            group = self.store.record_groups.get((profile_id, difficulty))
+            if group is None or group.games <= 0:
+                continue
+            stats[difficulty] = {
+                'games': group.games,
+                'total_time': group.total_time,
+                'best_score': group.best[1],
+                'best_score_time': group.best[2],
+                'best_score_hints': group.best[3],
+                'best_time': group.best_time,
+                'last_played': group.last_played
+            }
+        return stats
+
+    def _live_best(self, group: _RecordGroup) -> Optional[BestScore]:
+        """Найкращий результат серед записів групи (без архіву)"""
+        keys = group.keys.sorted()
+        if not keys:
+            return None
+        record = self.store.game_records[keys[0][2]]
+        return record.id, record.score, record.completion_time, record.hints_used
+
+    def count_by_time(self, difficulty: Difficulty, completion_time: int) -> Tuple[int, int]:
+        """
+        Повертає кількість рекордів усіх профілів на складності з часом, меншим за completion_time,
+        і загальну кількість рекордів складності (архівовані не враховуються)
+        """
+        keys = self.store.record_times.get(difficulty)
+        if keys is None:
+            return 0, 0
+        times = keys.sorted()
+        return bisect_left(times, (completion_time,)), len(times)
+
+    def archive_before(self, cutoff: datetime) -> int:
+        """Переносить рекорди, завершені до cutoff, до підсумків архіву; статистика гравця не змінюється"""
+        old_records = [record for record in self.store.game_records.values()
+                       if record.date_completed < cutoff]
+
+        for record in old_records:
+            key = (record.profile_id, record.difficulty)
+            archive = self.store.records_archive.get(key)
+            if archive is None:
+                archive = self.store.records_archive[key] = _ArchiveTotals()
+            archive.games += 1
+            archive.total_time += record.completion_time
+            best = (None, record.score, record.completion_time, record.hints_used)
+            if _better(best, archive.best):
+                archive.best = best
+            if archive.best_time is None or record.completion_time < archive.best_time:
+                archive.best_time = record.completion_time
+            date_completed = record.date_completed.isoformat()
+            if archive.last_played is None or date_completed > archive.last_played:
+                archive.last_played = date_completed
+
+            # Запис лишається в підсумках групи, прибирається лише з таблиць лідерів
+            self.store.game_records.pop(record.id)
+            self.store.profile_boards[record.profile_id].remove(_record_key(record))
+            self.store.record_groups[key].keys.remove(_record_key(record))
+            self.store.record_times[record.difficulty].remove((record.completion_time, record.id))
+
+        if old_records:
+            # Як rebuild_player_stats: найкращий з живих записів, архів - лише якщо він строго кращий
+            for key, group in self.store.record_groups.items():
+                archive = self.store.records_archive.get(key)
+                group.best = self._live_best(group)
+                if archive is not None and _better(archive.best, group.best):
+                    group.best = archive.best
+        return len(old_records)
+
+    def delete(self, record_id: int, profile_id: Optional[int] = None) -> bool:
+        """Видаляє запис; з profile_id запис іншого профілю не видаляється"""
+        record = self.get_by_id(record_id, profile_id)
+        if record is None:
+            return False
+        del self.store.game_records[record_id]
+
+        key = (record.profile_id, record.difficulty)
+        self.store.profile_boards[record.profile_id].remove(_record_key(record))
+        group = self.store.record_groups[key]
+        group.keys.remove(_record_key(record))
+        self.store.record_times[record.difficulty].remove((record.completion_time, record.id))
+        group.games -= 1
+        group.total_time -= record.completion_time
+        if group.games <= 0:
+            del self.store.record_groups[key]
+            return True
+
+        # Найкращі значення перераховуються, лише якщо видалено саме їх
+        archive = self.store.records_archive.get(key)
+        remaining = self._records(group.keys.sorted())
+        if group.best_time == record.completion_time:
+            group.best_time = min([other.completion_time for other in remaining]
+                                  + ([archive.best_time] if archive else []), default=None)
+        if group.last_played == record.date_completed.isoformat():
+            group.last_played = max([other.date_completed.isoformat() for other in remaining]
+                                    + ([archive.last_played] if archive else []), default=None)
+        if group.best is not None and group.best[0] == record_id:
+            group.best = self._live_best(group)
+            if archive is not None and _better(archive.best, group.best):
+                group.best = archive.best
+        return True
+
+    def save_many(self, records: List[GameRecord]) -> List[int]:
+        """Зберігає записи і повертає їхні ID у тому ж порядку"""
+        return [self.save(record) for record in records]
+
+    def get_many(self, record_ids: List[int]) -> List[GameRecord]:
+        """Отримує записи за списком ID у тому ж порядку (відсутні пропускаються)"""
+        records = self.store.game_records
+        return [records[record_id] for record_id in record_ids if record_id in records]
+
+    def delete_many(self, record_ids: List[int], profile_id: Optional[int] = None) -> int:
+        """Видаляє записи і повертає кількість видалених; з profile_id записи інших профілів пропускаються"""
+        return sum(self.delete(record_id, profile_id) for record_id in record_ids)
+
+
+class InMemorySavedGameRepository(ISavedGameRepository):
+    """Репозиторій збережених ігор у пам'яті; рядки зберігаються так само, як у таблиці saved_games"""
+
+    def __init__(self, store: InMemoryStore):
+        self.store = store
+
+    @staticmethod
+    def _row(game: SavedGame, game_id: int) -> Dict[str, Any]:
+        """Перетворює гру на рядок зі знімком дошки, щоб подальші ходи не змінювали збереження"""
+        return {
+            'id': game_id,
+            'profile_id': game.profile_id,
+            'difficulty': game.difficulty.name,
+            'state': pack_board(game.current_state, game.solution),
+            'elapsed_time': game.elapsed_time,
+            'hints_used': game.hints_used,
+            'filled_cells': game.count_filled_cells(),
+            'journal_seq': game.journal_seq,
+            'date_saved': game.date_saved.isoformat()
+        }
+
+    def _profile_rows(self, profile_id: int) -> List[Dict[str, Any]]:
+        """Повертає рядки профілю від найновішого"""
+        rows = [row for row in self.store.saved_games.values() if row['profile_id'] == profile_id]
+        rows.sort(key=lambda row: row['date_saved'], reverse=True)
+        return rows
+
+    def save(self, game: SavedGame) -> int:
+        """Зберігає гру і повертає ID"""
+        if game.id is None:
+            game_id = self.store.next_id('saved_games')
+            self.store.saved_games[game_id] = self._row(game, game_id)
+            return game_id
+
+        row = self.store.saved_games.get(game.id)
+        if row is not None:
+            # Як і в SQLite, збереження наявної гри не змінює її складність і профіль
+            updated = self._row(game, game.id)
+            updated['difficulty'] = row['difficulty']
+            updated['profile_id'] = row['profile_id']
+            self.store.saved_games[game.id] = updated
+        return game.id
+
+    def _owned_row(self, game_id: int, profile_id: Optional[int]) -> Optional[Dict[str, Any]]:
+        """Повертає рядок гри, якщо він є і (з profile_id) належить профілю"""
+        row = self.store.saved_games.get(game_id)
+        if row is None or (profile_id is not None and row['profile_id'] != profile_id):
+            return None
+        return row
+
+    def get_by_id(self, game_id: int, profile_id: Optional[int] = None) -> Optional[SavedGame]:
+        """Отримує збережену гру за ID; з profile_id гра іншого профілю не повертається"""
+        row = self._owned_row(game_id, profile_id)
+        return SavedGame.from_dict(row) if row else None
+
+    def get_all(self, profile_id: int) -> List[SavedGame]:
+        """Отримує всі збережені ігри профілю"""
+        return [SavedGame.from_dict(row) for row in self._profile_rows(profile_id)]
+
+    def get_latest(self, profile_id: int) -> Optional[SavedGame]:
+        """Отримує останню збережену гру профілю"""
+        rows = self._profile_rows(profile_id)
+        return SavedGame.from_dict(rows[0]) if rows else None
+
+    def get_summaries(self, profile_id: int, limit: Optional[int] = None) -> List[SavedGameSummary]:
+        """Отримує короткі відомості про збереження профілю без декодування стану"""
+        rows = self._profile_rows(profile_id)[:limit]
+        return [SavedGameSummary.from_dict(row) for row in rows]
+
+    def exists(self, profile_id: int) -> bool:
+        """Перевіряє, чи є в профілю хоча б одне збереження"""
+        return any(row['profile_id'] == profile_id for row in self.store.saved_games.values())
+
+    def update(self, game: SavedGame, profile_id: Optional[int] = None) -> bool:
+        """Оновлює збережену гру; з profile_id гра іншого профілю не змінюється"""
+        if game.id is None or self._owned_row(game.id, profile_id) is None:
+            return False
+        self.store.saved_games[game.id] = self._row(game, game.id)
+        return True
+
+    def delete(self, game_id: int, profile_id: Optional[int] = None) -> bool:
+        """Видаляє збережену гру; з profile_id гра іншого профілю не видаляється"""
+        if self._owned_row(game_id, profile_id) is None:
+            return False
+        self.store.saved_game_moves.pop(game_id, None)
+        del self.store.saved_games[game_id]
+        return True
+
+    def prune(self, keep_per_difficulty: int) -> int:
+        """Залишає кожному профілю лише keep_per_difficulty найновіших збережень кожної складності"""
+        groups: Dict[Tuple[int, str], List[Dict[str, Any]]] = {}
+        for row in self.store.saved_games.values():
+            groups.setdefault((row['profile_id'], row['difficulty']), []).append(row)
+
+        pruned = 0
+        for rows in groups.values():
+            rows.sort(key=lambda row: (row['date_saved'], row['id']), reverse=True)
+            for row in rows[keep_per_difficulty:]:
+                self.delete(row['id'])
+                pruned += 1
+        return pruned
+
+    def append_moves(self, game_id: int, moves: List[Tuple[int, int]]) -> None:
+        """Дописує ходи (номер, упакований хід) до журналу гри"""
+        self.store.saved_game_moves.setdefault(game_id, {}).update(moves)
+
+    def get_moves(self, game_id: int, after_seq: int = 0) -> List[Tuple[int, int]]:
+        """Отримує ходи журналу з номером більшим за after_seq у порядку їх виконання"""
+        journal = self.store.saved_game_moves.get(game_id, {})
+        return sorted((seq, move) for seq, move in journal.items() if seq > after_seq)
+
+    def compact(self, game: SavedGame, profile_id: Optional[int] = None) -> bool:
+        """
+        Записує новий знімок гри і видаляє ходи журналу, які він уже містить;
+        з profile_id гра іншого профілю не змінюється
+        """
+        updated = self.update(game, profile_id)
+        journal = self.store.saved_game_moves.get(game.id)
+        if updated and journal:
+            for seq in [seq for seq in journal if seq <= game.journal_seq]:
+                del journal[seq]
+        return updated
+
+    def save_many(self, games: List[SavedGame]) -> List[int]:
+        """Зберігає ігри (нові створює, наявні оновлює) і повертає їхні ID"""
+        return [self.save(game) for game in games]
+
+    def get_many(self, game_ids: List[int]) -> List[SavedGame]:
+        """Отримує збережені ігри за списком ID у тому ж порядку (відсутні пропускаються)"""
+        rows = self.store.saved_games
+        return [SavedGame.from_dict(rows[game_id]) for game_id in game_ids if game_id in rows]
+
+    def delete_many(self, game_ids: List[int], profile_id: Optional[int] = None) -> int:
+        """
+        Видаляє збережені ігри разом з журналами і повертає кількість видалених;
+        з profile_id ігри інших профілів пропускаються
+        """
+        return sum(self.delete(game_id, profile_id) for game_id in game_ids)
+
+
+class InMemoryUserSettingsRepository(IUserSettingsRepository):
+    """Репозиторій налаштувань у пам'яті"""
+
+    def __init__(self, store: InMemoryStore):
+        self.store = store
+
+    def save(self, setting: UserSetting) -> int:
+        """Зберігає налаштування (замінює наявне з тією ж назвою)"""
+        setting = replace(setting, id=self.store.next_id('user_settings'))
+        self.store.user_settings[(setting.profile_id, setting.setting_name)] = setting
+        return setting.id
+
+    def get_by_name(self, profile_id: int, name: str) -> Optional[UserSetting]:
+        """Отримує налаштування профілю за назвою"""
+        return self.store.user_settings.get((profile_id, name))
+
+    def get_all(self, profile_id: int) -> List[UserSetting]:
+        """Отримує всі налаштування профілю"""
+        settings = [setting for (owner, _), setting in self.store.user_settings.items() if owner == profile_id]
+        return sorted(settings, key=lambda setting: setting.setting_name)
+
+    def update(self, setting: UserSetting) -> bool:
+        """Оновлює налаштування"""
+        key = (setting.profile_id, setting.setting_name)
+        existing = self.store.user_settings.get(key)
+        if existing is None:
+            return False
+        self.store.user_settings[key] = replace(existing, setting_value=setting.setting_value)
+        return True
+
+    def delete(self, profile_id: int, name: str) -> bool:
+        """Видаляє налаштування профілю"""
+        return self.store.user_settings.pop((profile_id, name), None) is not None
+
+    def save_many(self, settings: List[UserSetting]) -> int:
+        """Створює або оновлює налаштування і повертає їх кількість"""
+        for setting in settings:
+            existing = self.store.user_settings.get((setting.profile_id, setting.setting_name))
+            if existing is not None:
+                self.update(setting)
+            else:
+                self.save(setting)
+        return len(settings)
+
+    def get_many(self, profile_id: int, names: List[str]) -> List[UserSetting]:
+        """Отримує налаштування профілю за списком назв (відсутні пропускаються)"""
+        settings = self.store.user_settings
+        return [settings[(profile_id, name)] for name in names if (profile_id, name) in settings]
+
+    def delete_many(self, profile_id: int, names: List[str]) -> int:
+        """Видаляє налаштування профілю і повертає кількість видалених"""
+        return sum(self.delete(profile_id, name) for name in names)
+
+
+class InMemoryProfileRepository(IProfileRepository):
+    """Репозиторій профілів у пам'яті"""
+
+    def __init__(self, store: InMemoryStore):
+        self.store = store
+
+    def save(self, profile: Profile) -> int:
+        """Створює профіль і повертає ID"""
+        if self.get_by_name(profile.name) is not None:
+            raise ValueError(f"Profile '{profile.name}' already exists")
+        profile = replace(profile, id=self.store.next_id('profiles'))
+        self.store.profiles[profile.id] = profile
+        return profile.id
+
+    def get_by_id(self, profile_id: int) -> Optional[Profile]:
+        """Отримує профіль за ID"""
+        return self.store.profiles.get(profile_id)
+
+    def get_by_name(self, name: str) -> Optional[Profile]:
+        """Отримує профіль за ім'ям (без урахування регістру)"""
+        name = name.casefold()
+        return next((profile for profile in self.store.profiles.values()
+                     if profile.name.casefold() == name), None)
+
+    def get_all(self, limit: Optional[int] = None) -> List[Profile]:
+        """Отримує профілі, починаючи з тих, що грали нещодавно"""
+        profiles = sorted(self.store.profiles.values(), key=lambda profile: profile.id)
+        # Стабільне сортування зберігає порядок за ID серед рівних; профілі без активності - в кінці
+        profiles.sort(key=lambda profile: profile.last_active or datetime.min, reverse=True)
+        return profiles[:limit]
+
+    def rename(self, profile_id: int, name: str) -> bool:
+        """Змінює ім'я профілю"""
+        profile = self.store.profiles.get(profile_id)
+        if profile is None:
+            return False
+        self.store.profiles[profile_id] = replace(profile, name=name)
+        return True
+
+    def touch(self, profile_id: int, when: datetime) -> bool:
+        """Запам'ятовує час останньої активності профілю"""
+        profile = self.store.profiles.get(profile_id)
+        if profile is None:
+            return False
+        self.store.profiles[profile_id] = replace(profile, last_active=when)
+        return True
+
+    def delete(self, profile_id: int) -> bool:
+        """Видаляє профіль разом з усіма його рекордами, збереженнями та налаштуваннями"""
+        store = self.store
+        records = InMemoryGameRecordRepository(store)
+        for record_id in [key[2] for key in records._board(profile_id, None)]:
+            records.delete(record_id)
+        for table in (store.records_archive, store.record_groups):
+            for key in [key for key in table if key[0] == profile_id]:
+                del table[key]
+        store.profile_boards.pop(profile_id, None)
+
+        saved_games = InMemorySavedGameRepository(store)
+        for game_id in [row['id'] for row in saved_games._profile_rows(profile_id)]:
+            saved_games.delete(game_id)
+        for table in (store.user_settings, store.puzzle_plays):
+            for key in [key for key in table if key[0] == profile_id]:
+                del table[key]
+
+        return store.profiles.pop(profile_id, None) is not None
+
+
+class InMemoryPuzzleRepository(IPuzzleRepository):
+    """Репозиторій архіву головоломок у пам'яті: словник головоломок і відсортовані ключі індексів"""
+
+    def __init__(self, store: InMemoryStore):
+        self.store = store
+
+    def save(self, puzzle: ArchivedPuzzle) -> Optional[int]:
+        """Додає головоломку і повертає ID (None, якщо головоломка з таким відбитком вже є)"""
+        store = self.store
+        if puzzle.canonical_hash in store.puzzle_hashes:
+            return None
+        puzzle = replace(puzzle, id=store.next_id('puzzles'))
+        store.puzzles[puzzle.id] = puzzle
+        store.puzzle_hashes[puzzle.canonical_hash] = puzzle.id
+        store.puzzle_ratings.setdefault(puzzle.difficulty, _SortedKeys()).add((puzzle.rating, puzzle.id))
+        store.puzzle_picks.setdefault(puzzle.difficulty, _SortedKeys())
+        self._set_pick_key(puzzle)
+        return puzzle.id
+
+    def _set_pick_key(self, puzzle: ArchivedPuzzle):
+        """Дає головоломці новий випадковий ключ вибору, як DEFAULT стовпця pick_key"""
+        picks = self.store.puzzle_picks[puzzle.difficulty]
+        old_key = self.store.puzzle_pick_keys.get(puzzle.id)
+        if old_key is not None:
+            picks.remove((old_key, puzzle.id))
+        pick_key = random.getrandbits(PUZZLE_PICK_KEY_BITS)
+        self.store.puzzle_pick_keys[puzzle.id] = pick_key
+        picks.add((pick_key, puzzle.id))
+
+    def save_many(self, puzzles: List[ArchivedPuzzle]) -> int:
+        """Додає головоломки, пропускаючи наявні, і повертає кількість доданих"""
+        return sum(1 for puzzle in puzzles if self.save(puzzle) is not None)
+
+    def get_by_id(self, puzzle_id: int) -> Optional[ArchivedPuzzle]:
+        """Отримує головоломку за ID"""
+        return self.store.puzzles.get(puzzle_id)
+
+    def get_by_hash(self, canonical_hash: str) -> Optional[ArchivedPuzzle]:
+        """Отримує головоломку за канонічним відбитком"""
+        return self.store.puzzles.get(self.store.puzzle_hashes.get(canonical_hash))
+
+    @staticmethod
+    def _keys(index: Dict[Difficulty, _SortedKeys], difficulty: Difficulty) -> List[Tuple[int, int]]:
+        """Ключі індексу головоломок складності у порядку зростання"""
+        keys = index.get(difficulty)
+        return keys.sorted() if keys is not None else []
+
+    def get_rating_range(self, difficulty: Difficulty) -> Optional[Tuple[int, int]]:
+        """Повертає найменший і найбільший рейтинг головоломок складності (None, якщо їх немає)"""
+        keys = self._keys(self.store.puzzle_ratings, difficulty)
+        return (keys[0][0], keys[-1][0]) if keys else None
+
+    def pick_unplayed(self, profile_id: int, difficulty: Difficulty, pivot: int) -> Optional[ArchivedPuzzle]:
+        """
+        Повертає незіграну профілем головоломку складності з найменшим випадковим ключем, не меншим
+        за pivot (якщо таких немає - з найменшим ключем загалом); None, якщо незіграних немає
+        """
+        keys = self._keys(self.store.puzzle_picks, difficulty)
+        plays = self.store.puzzle_plays
+        start = bisect_left(keys, (pivot,))
+        for index in range(start, start + len(keys)):
+            _, puzzle_id = keys[index % len(keys)]
+            if (profile_id, puzzle_id) not in plays:
+                return self.store.puzzles[puzzle_id]
+        return None
+
+    def count(self, difficulty: Optional[Difficulty] = None) -> int:
+        """Кількість головоломок архіву (усіх або однієї складності)"""
+        if difficulty is None:
+            return len(self.store.puzzles)
+        return len(self._keys(self.store.puzzle_ratings, difficulty))
+
+    def count_unplayed(self, profile_id: int, difficulty: Difficulty) -> int:
+        """Кількість головоломок складності, яких профіль ще не отримував"""
+        puzzles = self.store.puzzles
+        played = sum(1 for played_profile, puzzle_id in self.store.puzzle_plays
+                     if played_profile == profile_id and puzzles[puzzle_id].difficulty == difficulty)
+        return self.count(difficulty) - played
+
+    def mark_played(self, profile_id: int, puzzle_id: int, when: datetime) -> None:
+        """Запам'ятовує, що профіль отримав головоломку, і дає їй новий випадковий ключ вибору"""
+        if (profile_id, puzzle_id) in self.store.puzzle_plays:
+            return
+        self.store.puzzle_plays[(profile_id, puzzle_id)] = {
+            'date_played': when, 'completion_time': None, 'hints_used': None, 'date_completed': None
+        }
+        self._set_pick_key(self.store.puzzles[puzzle_id])
+
+    def record_result(self, profile_id: int, puzzle_id: int, completion_time: int, hints_used: int,
+                      when: datetime) -> bool:
+        """Записує результат профілю на головоломці, якщо він кращий за попередній"""
+        self.mark_played(profile_id, puzzle_id, when)
+        play = self.store.puzzle_plays[(profile_id, puzzle_id)]
+        if (play['completion_time'] is not None and
+                (completion_time, hints_used) >= (play['completion_time'], play['hints_used'])):
+            return False
+        play.update(completion_time=completion_time, hints_used=hints_used, date_completed=when)
+        return True
+
+    def get_results(self, puzzle_id: int, limit: int = 10) -> List[PuzzleResult]:
+        """Найкращі результати різних профілів на головоломці (completion_time ASC, hints_used ASC)"""
+        profiles = self.store.profiles
+        results = [
+            PuzzleResult(profile_id, profiles[profile_id].name, play['completion_time'], play['hints_used'],
+                         play['date_completed'])
+            for (profile_id, played_id), play in self.store.puzzle_plays.items()
+            if played_id == puzzle_id and play['completion_time'] is not None and profile_id in profiles
+        ]
+        results.sort(key=lambda result: (result.completion_time, result.hints_used, result.profile_id))
+        return results[:limit]
@@ -4,9 +4,14 @@
 from dataclasses import dataclass
 from datetime import datetime
 from typing import Optional, Dict, Any, List
-import json
 
-from ..models import Difficulty
+from ..models import Cell, Difficulty
+from ..config import GRID_SIZE
+from .save_format import pack_board, pack_grid, unpack_board, unpack_grid
+
+# Профіль, якому належать дані, створені до появи профілів
+DEFAULT_PROFILE_ID = 1
+DEFAULT_PROFILE_NAME = 'Player'
 
 
 @dataclass
@@ -18,11 +23,13 @@ class GameRecord:
     hints_used: int
     score: int
     date_completed: datetime
+    profile_id: int = DEFAULT_PROFILE_ID
 
     def to_dict(self) -> Dict[str, Any]:
         """Конвертує об'єкт у словник"""
         return {
             'id': self.id,
+            'profile_id': self.profile_id,
             'difficulty': self.difficulty.name,
             'completion_time': self.completion_time,
             'hints_used': self.hints_used,
@@ -39,43 +46,107 @@ class GameRecord:
             completion_time=data['completion_time'],
             hints_used=data['hints_used'],
             score=data['score'],
-            date_completed=datetime.fromisoformat(data['date_completed'])
+            date_completed=datetime.fromisoformat(data['date_completed']),
+            profile_id=data.get('profile_id', DEFAULT_PROFILE_ID)
         )
 
 
+@dataclass(frozen=True)
+class LeaderboardCursor:
+    """Курсор для посторінкового читання таблиці лідерів (score DESC, completion_time ASC, id ASC)"""
+    score: int
+    completion_time: int
+    id: int
+
+    @classmethod
+    def after(cls, record: GameRecord) -> 'LeaderboardCursor':
+        """Створює курсор, що вказує на позицію після заданого запису"""
+        return cls(record.score, record.completion_time, record.id)
+
+
+@dataclass(frozen=True)
+class TimeRank:
+    """Місце результату за часом серед неархівованих рекордів усіх гравців на складності (1 - найшвидший)"""
+    rank: int
+    total: int
+
+    @property
+    def top_percent(self) -> float:
+        """Частка рекордів, не повільніших за результат, у відсотках"""
+        return 100.0 * self.rank / self.total if self.total else 100.0
+
+
 @dataclass
 class SavedGame:
     """Модель для збереженої гри"""
     id: Optional[int]
     difficulty: Difficulty
-    current_state: List[List[Dict[str, Any]]]  # Стан дошки в JSON форматі
+    current_state: List[List[Cell]]  # Стан дошки
     solution: List[List[int]]  # Розв'язок
     elapsed_time: int  # Пройдений час в секундах
     hints_used: int
     date_saved: datetime
+    journal_seq: int = 0  # Останній хід журналу, врахований у стані дошки
+    profile_id: int = DEFAULT_PROFILE_ID
 
     def to_dict(self) -> Dict[str, Any]:
-        """Конвертує об'єкт у словник"""
+        """Конвертує об'єкт у словник (стан і розв'язок упаковуються в один бінарний блок)"""
         return {
             'id': self.id,
+            'profile_id': self.profile_id,
             'difficulty': self.difficulty.name,
-            'current_state': json.dumps(self.current_state),
-            'solution': json.dumps(self.solution),
+            'state': pack_board(self.current_state, self.solution),
             'elapsed_time': self.elapsed_time,
             'hints_used': self.hints_used,
-            'date_saved': self.date_saved.isoformat()
+            'date_saved': self.date_saved.isoformat(),
+            'journal_seq': self.journal_seq
         }
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'SavedGame':
         """Створює об'єкт з словника"""
+        current_state, solution = unpack_board(data['state'])
         return cls(
             id=data.get('id'),
             difficulty=Difficulty[data['difficulty']],
-            current_state=json.loads(data['current_state']) if isinstance(data['current_state'], str) else data['current_state'],
-            solution=json.loads(data['solution']) if isinstance(data['solution'], str) else data['solution'],
+            current_state=current_state,
+            solution=solution,
             elapsed_time=data['elapsed_time'],
             hints_used=data['hints_used'],
+            date_saved=datetime.fromisoformat(data['date_saved']),
+            journal_seq=data.get('journal_seq', 0),
+            profile_id=data.get('profile_id', DEFAULT_PROFILE_ID)
+        )
+
+    def count_filled_cells(self) -> int:
+        """Рахує заповнені клітинки поточного стану дошки"""
+        return sum(1 for row in self.current_state for cell in row if cell.value)
+
+
+@dataclass
+class SavedGameSummary:
+    """Короткі відомості про збережену гру без стану дошки та розв'язку"""
+    id: int
+    difficulty: Difficulty
+    elapsed_time: int
+    hints_used: int
+    filled_cells: int
+    date_saved: datetime
+
+    @property
+    def progress(self) -> float:
+        """Частка заповнених клітинок (від 0 до 1)"""
+        return self.filled_cells / (GRID_SIZE * GRID_SIZE)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'SavedGameSummary':
+        """Створює об'єкт з словника"""
+        return cls(
+            id=data['id'],
+            difficulty=Difficulty[data['difficulty']],
+            elapsed_time=data['elapsed_time'],
+            hints_used=data['hints_used'],
+            filled_cells=data['filled_cells'],
             date_saved=datetime.fromisoformat(data['date_saved'])
         )
 
@@ -86,11 +157,13 @@ class UserSetting:
     id: Optional[int]
     setting_name: str
     setting_value: str
+    profile_id: int = DEFAULT_PROFILE_ID
 
     def to_dict(self) -> Dict[str, Any]:
         """Конвертує об'єкт у словник"""
         return {
             'id': self.id,
+            'profile_id': self.profile_id,
             'setting_name': self.setting_name,
             'setting_value': self.setting_value
         }
@@ -101,5 +174,95 @@ class UserSetting:
         return cls(
             id=data.get('id'),
             setting_name=data['setting_name'],
-            setting_value=data['setting_value']
+            setting_value=data['setting_value'],
+            profile_id=data.get('profile_id', DEFAULT_PROFILE_ID)
+        )
+
+
+@dataclass
+class Profile:
+    """Модель профілю гравця"""
+    id: Optional[int]
+    name: str
+    date_created: datetime
+    last_active: Optional[datetime] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Конвертує об'єкт у словник"""
+        return {
+            'id': self.id,
+            'name': self.name,
+            'date_created': self.date_created.isoformat(),
+            'last_active': self.last_active.isoformat() if self.last_active else None
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Profile':
+        """Створює об'єкт з словника"""
+        return cls(
+            id=data.get('id'),
+            name=data['name'],
+            date_created=datetime.fromisoformat(data['date_created']),
+            last_active=datetime.fromisoformat(data['last_active']) if data.get('last_active') else None
+        )
+
+
+@dataclass
+class ArchivedPuzzle:
+    """Модель головоломки з архіву"""
+    id: Optional[int]
+    difficulty: Difficulty
+    givens: List[List[int]]  # Задані клітинки (0 - порожня)
+    solution: List[List[int]]
+    canonical_hash: str  # Відбиток, однаковий для поворотів, віддзеркалень і перейменувань цифр
+    rating: int  # Оцінка складності розв'язувачем (більше - складніше)
+    generator_version: int
+    date_created: datetime
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Конвертує об'єкт у словник (сітки упаковуються по 4 біти на клітинку)"""
+        return {
+            'id': self.id,
+            'difficulty': self.difficulty.name,
+            'givens': pack_grid(self.givens),
+            'solution': pack_grid(self.solution),
+            'canonical_hash': self.canonical_hash,
+            'rating': self.rating,
+            'generator_version': self.generator_version,
+            'date_created': self.date_created.isoformat()
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ArchivedPuzzle':
+        """Створює об'єкт з словника"""
+        return cls(
+            id=data.get('id'),
+            difficulty=Difficulty[data['difficulty']],
+            givens=unpack_grid(data['givens']),
+            solution=unpack_grid(data['solution']),
+            canonical_hash=data['canonical_hash'],
+            rating=data['rating'],
+            generator_version=data['generator_version'],
+            date_created=datetime.fromisoformat(data['date_created'])
+        )
+
+
+@dataclass
+class PuzzleResult:
+    """Найкращий результат профілю на головоломці архіву (для порівняння гравців)"""
+    profile_id: int
+    profile_name: str
+    completion_time: int
+    hints_used: int
+    date_completed: datetime
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'PuzzleResult':
+        """Створює об'єкт з словника"""
+        return cls(
+            profile_id=data['profile_id'],
+            profile_name=data['profile_name'],
+            completion_time=data['completion_time'],
+            hints_used=data['hints_used'],
+            date_completed=datetime.fromisoformat(data['date_completed'])
         )
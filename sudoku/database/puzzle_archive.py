@@ -0,0 +1,77 @@
+"""
+Поповнення архіву головоломок генерацією поза грою
+
+Запуск:
+    python -m sudoku.database.puzzle_archive generate --count 500 [--difficulty HARD] [--db PATH]
+    python -m sudoku.database.puzzle_archive stats [--db PATH]
+"""
+import argparse
+import logging
+import sys
+from typing import Callable, List
+
+from ..core import ISudokuGenerator, SudokuGenerator
+from ..models import Difficulty
+from .database_manager import DatabaseManager
+from .models import ArchivedPuzzle
+from .services import PuzzleArchiveService
+from .sqlite_repositories import SQLitePuzzleRepository
+
+logger = logging.getLogger(__name__)
+
+
+def generate_puzzles(service: PuzzleArchiveService, difficulty: Difficulty, count: int,
+                     generator_factory: Callable[[], ISudokuGenerator] = SudokuGenerator,
+                     batch_size: int = 100) -> int:
+    """
+    Генерує count головоломок складності і додає їх в архів порціями по batch_size
+    (одна транзакція на порцію); повертає кількість нових, повтори відкидаються за відбитком
+    """
+    added = 0
+    batch: List[ArchivedPuzzle] = []
+    for index in range(count):
+        # Окремий генератор на кожну головоломку, бо SudokuGenerator повертає власну сітку
+        generator = generator_factory()
+        givens, solution = generator.generate(difficulty)
+        batch.append(service.build_puzzle(difficulty, givens, solution, getattr(generator, 'version', 0)))
+        if len(batch) >= batch_size or index == count - 1:
+            added += service.add_puzzles(batch)
+            batch = []
+
+    logger.info(f"Added {added} of {count} generated {difficulty.name} puzzles to the archive")
+    return added
+
+
+def main(argv=None) -> int:
+    """Точка входу командного рядка"""
+    parser = argparse.ArgumentParser(description="Offline generation of the Sudoku puzzle archive")
+    parser.add_argument('command', choices=('generate', 'stats'))
+    parser.add_argument('--db', default=None, help="Database path (default: ~/.sudoku_game/sudoku.db)")
+    parser.add_argument('--count', type=int, default=100, help="Puzzles to generate per difficulty")
+    parser.add_argument('--difficulty', choices=[difficulty.name for difficulty in Difficulty], action='append',
+                        help="Difficulty to generate (repeatable; default: all)")
+    parser.add_argument('--batch-size', type=int, default=100)
+    args = parser.parse_args(argv)
+
+    db_manager = DatabaseManager(args.db)
+    db_manager.initialize_database()
+    repository = SQLitePuzzleRepository(db_manager)
+    service = PuzzleArchiveService(repository)
+    difficulties = [Difficulty[name] for name in args.difficulty] if args.difficulty else list(Difficulty)
+    try:
+        if args.command == 'generate':
+            for difficulty in difficulties:
+                added = generate_puzzles(service, difficulty, args.count, batch_size=args.batch_size)
+                print(f"{difficulty.name}: added {added} of {args.count}")
+        else:
+            for difficulty in difficulties:
+                rating_range = repository.get_rating_range(difficulty)
+                ratings = f"rating {rating_range[0]}-{rating_range[1]}" if rating_range else "empty"
+                print(f"{difficulty.name}: {repository.count(difficulty)} puzzles, {ratings}")
+    finally:
+        db_manager.disconnect()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,294 @@
+"""
+Інструментування репозиторіїв: кількість викликів, гістограми затримок, кількість повернутих рядків
+і журнал повільних запитів з планом виконання
+
+Звіт за збереженими агрегатами:
+    python -m sudoku.database.query_stats [--file PATH] [--sort total|calls|p99|rows] [--slow N]
+"""
+import argparse
+import json
+import logging
+import math
+import sqlite3
+import sys
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from datetime import datetime
+from functools import wraps
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from .database_manager import DatabaseManager
+
+# Верхні межі кошиків гістограми затримок у мс; останній кошик - усе, що довше
+LATENCY_BUCKETS_MS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 1000)
+
+# Службові запити, для яких план виконання не будується
+_NO_PLAN_PREFIXES = ('BEGIN', 'COMMIT', 'ROLLBACK', 'END', 'SAVEPOINT', 'RELEASE', 'PRAGMA', 'CREATE',
+                     'DROP', 'ALTER', 'EXPLAIN', 'VACUUM', 'ANALYZE', '--')
+
+
+def _count_rows(result: Any) -> int:
+    """
+    Кількість рядків у результаті методу репозиторію: списки і словники - за довжиною, окремий
+    об'єкт або кортеж значень (наприклад, (кількість швидших, усього)) - один рядок
+    """
+    if result is None or isinstance(result, (bool, int, float, str, bytes)):
+        return 0
+    if isinstance(result, (list, dict)):
+        return len(result)
+    return 1
+
+
+class MethodStats:
+    """Агрегати викликів одного методу репозиторію"""
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.rows = 0
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+
+    def add(self, duration_ms: float, rows: int, failed: bool = False) -> None:
+        """Додає один виклик"""
+        self.calls += 1
+        self.errors += failed
+        self.total_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+        self.rows += rows
+        self.buckets[bisect_left(LATENCY_BUCKETS_MS, duration_ms)] += 1
+
+    def percentile(self, percent: float) -> float:
+        """
+        Оцінка перцентиля з гістограми: верхня межа кошика, в який він потрапляє, але не більше
+        за найдовший виклик (межа кошика може перевищувати всі виміряні значення)
+        """
+        if not self.calls:
+            return 0.0
+        rank = max(1, math.ceil(percent / 100 * self.calls))
+        cumulative = 0
+        for index, count in enumerate(self.buckets):
+            cumulative += count
+            if cumulative >= rank:
+                if index < len(LATENCY_BUCKETS_MS):
+                    return min(LATENCY_BUCKETS_MS[index], self.max_ms)
+                return self.max_ms
+        return self.max_ms
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Конвертує агрегати у словник"""
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'total_ms': round(self.total_ms, 3),
+            'avg_ms': round(self.total_ms / self.calls, 4) if self.calls else 0.0,
+            'max_ms': round(self.max_ms, 3),
+            'p50_ms': self.percentile(50),
+            'p95_ms': self.percentile(95),
+            'p99_ms': self.percentile(99),
+            'rows': self.rows,
+            'histogram': list(self.buckets)
+        }
+
+
+class QueryMetrics:
+    """
+    Збирає агрегати викликів репозиторіїв усіх потоків. Текст SQL, виконаного під час виклику,
+    перехоплюється через trace callback з'єднань, тож повільний виклик потрапляє в журнал разом
+    з EXPLAIN QUERY PLAN кожного свого запиту.
+    """
+
+    def __init__(self, slow_threshold_ms: float = 20.0, slow_log_size: int = 100):
+        self.slow_threshold_ms = slow_threshold_ms
+        self.methods: Dict[str, MethodStats] = {}
+        self.slow_queries: Deque[Dict[str, Any]] = deque(maxlen=slow_log_size)
+        self._lock = threading.Lock()
+        # SQL, виконаний у поточному виклику, окремо для кожного потоку
+        self._local = threading.local()
+        self.logger = logging.getLogger(__name__)
+
+    def attach(self, db_manager: DatabaseManager) -> None:
+        """Підписується на текст запитів усіх з'єднань менеджера"""
+        db_manager.set_trace_callback(self._trace)
+
+    def _trace(self, sql: str) -> None:
+        """Trace callback з'єднання: запам'ятовує запит, якщо потік зараз у заміряному виклику"""
+        statements = getattr(self._local, 'statements', None)
+        # Програми тригерів повідомляються з текстом зовнішнього запиту - повтори пропускаємо
+        if statements is not None and (not statements or statements[-1] != sql):
+            statements.append(sql)
+
+    def record(self, name: str, duration_ms: float, rows: int = 0, failed: bool = False) -> None:
+        """Додає замір, зроблений поза репозиторієм (наприклад, коміт пакета черги запису)"""
+        with self._lock:
+            stats = self.methods.get(name)
+            if stats is None:
+                stats = self.methods[name] = MethodStats()
+            stats.add(duration_ms, rows, failed)
+
+    def measure(self, name: str, db_manager: Optional[DatabaseManager], func: Callable, *args, **kwargs) -> Any:
+        """Виконує метод репозиторію і записує його час, кількість рядків і повільні запити"""
+        outer = getattr(self._local, 'statements', None)
+        statements: List[str] = []
+        self._local.statements = statements
+        failed = True
+        result = None
+        start = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+            failed = False
+            return result
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            self._local.statements = None
+            try:
+                self.record(name, duration_ms, _count_rows(result), failed)
+                if duration_ms >= self.slow_threshold_ms:
+                    self._log_slow(name, duration_ms, statements, db_manager)
+            finally:
+                self._local.statements = outer
+                if outer is not None:
+                    outer.extend(statements)
+
+    def _explain(self, db_manager: Optional[DatabaseManager], sql: str) -> List[str]:
+        """Будує план виконання запиту на з'єднанні поточного потоку"""
+        if db_manager is None or sql.lstrip().upper().startswith(_NO_PLAN_PREFIXES):
+            return []
+        try:
+            rows = db_manager.get_connection().execute(f"EXPLAIN QUERY PLAN {sql}").fetchall()
+        except sqlite3.Error as e:
+            return [f"plan unavailable: {e}"]
+        return [row[3] for row in rows]
+
+    def _log_slow(self, name: str, duration_ms: float, statements: List[str],
+                  db_manager: Optional[DatabaseManager]) -> None:
+        """Записує повільний виклик у журнал разом з планами його запитів"""
+        entry = {
+            'method': name,
+            'duration_ms': round(duration_ms, 3),
+            'timestamp': datetime.now().isoformat(),
+            'queries': [{'sql': ' '.join(sql.split()), 'plan': self._explain(db_manager, sql)}
+                        for sql in statements if not sql.startswith('--')]
+        }
+        with self._lock:
+            self.slow_queries.append(entry)
+
+        details = '; '.join(f"{query['sql']} [{' | '.join(query['plan'])}]" for query in entry['queries'])
+        self.logger.warning(f"Slow repository call {name}: {duration_ms:.1f} ms: {details}")
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Повертає всі агрегати і журнал повільних запитів"""
+        with self._lock:
+            return {
+                'buckets_ms': list(LATENCY_BUCKETS_MS),
+                'slow_threshold_ms': self.slow_threshold_ms,
+                'methods': {name: stats.to_dict() for name, stats in self.methods.items()},
+                'slow_queries': list(self.slow_queries)
+            }
+
+    def export_json(self, path: str) -> None:
+        """Записує агрегати у JSON файл для команди звіту"""
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(self.snapshot(), file, ensure_ascii=False, indent=1)
+
+    def reset(self) -> None:
+        """Очищає всі агрегати"""
+        with self._lock:
+            self.methods.clear()
+            self.slow_queries.clear()
+
+
+class InstrumentedRepository:
+    """Проксі репозиторію, що заміряє виклики всіх його публічних методів"""
+
+    def __init__(self, repository: Any, metrics: QueryMetrics, name: Optional[str] = None):
+        self._repository = repository
+        self._metrics = metrics
+        self._name = name or type(repository).__name__
+
+    def __getattr__(self, attr: str) -> Any:
+        value = getattr(self._repository, attr)
+        if attr.startswith('_') or not callable(value):
+            return value
+
+        name = f"{self._name}.{attr}"
+        metrics = self._metrics
+        db_manager = getattr(self._repository, 'db_manager', None)
+
+        @wraps(value)
+        def wrapper(*args, **kwargs):
+            return metrics.measure(name, db_manager, value, *args, **kwargs)
+
+        # Наступні звернення до методу обходять __getattr__
+        setattr(self, attr, wrapper)
+        return wrapper
+
+
+def instrument(repository: Any, metrics: Optional[QueryMetrics]) -> Any:
+    """Обгортає репозиторій заміром викликів (без metrics повертає його без змін)"""
+    if metrics is None:
+        return repository
+    return InstrumentedRepository(repository, metrics)
+
+
+_SORT_KEYS = {
+    'total': 'total_ms',
+    'calls': 'calls',
+    'p99': 'p99_ms',
+    'rows': 'rows'
+}
+
+
+def format_report(data: Dict[str, Any], sort: str = 'total', slow: int = 10) -> str:
+    """Форматує збережені агрегати у текстову таблицю"""
+    key = _SORT_KEYS[sort]
+    methods = sorted(data['methods'].items(), key=lambda item: item[1][key], reverse=True)
+
+    lines = [f"{'method':<58} {'calls':>8} {'total ms':>10} {'avg ms':>8} {'p50':>6} {'p95':>6} "
+             f"{'p99':>7} {'max ms':>8} {'rows':>9} {'err':>4}"]
+    for name, stats in methods:
+        lines.append(f"{name:<58} {stats['calls']:>8} {stats['total_ms']:>10.1f} {stats['avg_ms']:>8.3f} "
+                     f"{stats['p50_ms']:>6g} {stats['p95_ms']:>6g} {stats['p99_ms']:>7g} "
+                     f"{stats['max_ms']:>8.2f} {stats['rows']:>9} {stats['errors']:>4}")
+
+    slow_queries = data['slow_queries'][-slow:] if slow else []
+    if slow_queries:
+        lines.append('')
+        lines.append(f"Slow calls (>= {data['slow_threshold_ms']} ms), latest {len(slow_queries)}:")
+        for entry in slow_queries:
+            lines.append(f"  {entry['timestamp']} {entry['method']}: {entry['duration_ms']} ms")
+            for query in entry['queries']:
+                lines.append(f"    {query['sql']}")
+                for step in query['plan']:
+                    lines.append(f"      -> {step}")
+    return '\n'.join(lines)
+
+
+def main(argv=None) -> int:
+    """Точка входу командного рядка"""
+    from ..config import QUERY_STATS_FILE
+
+    parser = argparse.ArgumentParser(description="Repository query statistics report")
+    parser.add_argument('--file', default=str(Path.home() / '.sudoku_game' / QUERY_STATS_FILE),
+                        help="Statistics file written by the game")
+    parser.add_argument('--sort', choices=sorted(_SORT_KEYS), default='total', help="Sort column")
+    parser.add_argument('--slow', type=int, default=10, help="Number of slow calls to show")
+    args = parser.parse_args(argv)
+
+    try:
+        with open(args.file, encoding='utf-8') as file:
+            data = json.load(file)
+    except OSError as e:
+        print(f"Cannot read {args.file}: {e}", file=sys.stderr)
+        return 1
+
+    print(format_report(data, args.sort, args.slow))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
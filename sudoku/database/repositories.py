@@ -2,10 +2,12 @@
 Інтерфейси репозиторіїв для роботи з даними
 """
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 from datetime import datetime
 
-from .models import GameRecord, SavedGame, UserSetting
+from .models import (
+    ArchivedPuzzle, GameRecord, LeaderboardCursor, Profile, PuzzleResult, SavedGame, SavedGameSummary, UserSetting
+)
 from ..models import Difficulty
 
 
@@ -18,28 +20,73 @@ class IGameRecordRepository(ABC):
         pass
 
     @abstractmethod
-    def get_by_id(self, record_id: int) -> Optional[GameRecord]:
-        """Отримує запис за ID"""
+    def get_by_id(self, record_id: int, profile_id: Optional[int] = None) -> Optional[GameRecord]:
+        """Отримує запис за ID; з profile_id запис іншого профілю не повертається"""
         pass
 
     @abstractmethod
-    def get_all(self) -> List[GameRecord]:
-        """Отримує всі записи"""
+    def get_all(self, profile_id: int) -> List[GameRecord]:
+        """Отримує всі записи профілю"""
         pass
 
     @abstractmethod
-    def get_by_difficulty(self, difficulty: Difficulty) -> List[GameRecord]:
-        """Отримує записи за рівнем складності"""
+    def get_by_difficulty(self, profile_id: int, difficulty: Difficulty) -> List[GameRecord]:
+        """Отримує записи профілю за рівнем складності"""
         pass
 
     @abstractmethod
-    def get_top_scores(self, limit: int = 10) -> List[GameRecord]:
-        """Отримує топ результатів"""
+    def get_top_scores(self, profile_id: int, limit: int = 10) -> List[GameRecord]:
+        """Отримує топ результатів профілю"""
         pass
 
     @abstractmethod
-    def delete(self, record_id: int) -> bool:
-        """Видаляє запис"""
+    def get_leaderboard_page(self, profile_id: int, difficulty: Optional[Difficulty], limit: int,
+                             after: Optional[LeaderboardCursor] = None) -> List[GameRecord]:
+        """Отримує сторінку таблиці лідерів профілю, що починається після курсора"""
+        pass
+
+    @abstractmethod
+    def get_difficulty_stats(self, profile_id: int) -> Dict[Difficulty, Dict[str, Any]]:
+        """
+        Повертає агреговану статистику профілю для кожного рівня складності, на якому є записи:
+        games, total_time, best_score, best_score_time, best_score_hints, best_time, last_played
+        """
+        pass
+
+    @abstractmethod
+    def count_by_time(self, difficulty: Difficulty, completion_time: int) -> Tuple[int, int]:
+        """
+        Повертає кількість рекордів усіх профілів на складності з часом, меншим за completion_time,
+        і загальну кількість рекордів складності (архівовані не враховуються)
+        """
+        pass
+
+    @abstractmethod
+    def archive_before(self, cutoff: datetime) -> int:
+        """Переносить рекорди, завершені до cutoff, до архіву і повертає їх кількість"""
+        pass
+
+    @abstractmethod
+    def delete(self, record_id: int, profile_id: Optional[int] = None) -> bool:
+        """Видаляє запис; з profile_id запис іншого профілю не видаляється"""
+        pass
+
+    @abstractmethod
+    def save_many(self, records: List[GameRecord]) -> List[int]:
+        """Зберігає записи однією транзакцією і повертає їхні ID у тому ж порядку"""
+        pass
+
+    @abstractmethod
+    def get_many(self, record_ids: List[int]) -> List[GameRecord]:
+        """Отримує записи за списком ID у тому ж порядку (відсутні пропускаються)"""
+        pass
+
+    @abstractmethod
+    def delete_many(self, record_ids: List[int], profile_id: Optional[int] = None) -> int:
+        """
+        Видаляє записи однією транзакцією і повертає кількість видалених;
+        з profile_id записи інших профілів пропускаються
+        """
         pass
 
 
@@ -52,28 +99,79 @@ class ISavedGameRepository(ABC):
         pass
 
     @abstractmethod
-    def get_by_id(self, game_id: int) -> Optional[SavedGame]:
-        """Отримує збережену гру за ID"""
+    def get_by_id(self, game_id: int, profile_id: Optional[int] = None) -> Optional[SavedGame]:
+        """Отримує збережену гру за ID; з profile_id гра іншого профілю не повертається"""
+        pass
+
+    @abstractmethod
+    def get_all(self, profile_id: int) -> List[SavedGame]:
+        """Отримує всі збережені ігри профілю"""
+        pass
+
+    @abstractmethod
+    def get_latest(self, profile_id: int) -> Optional[SavedGame]:
+        """Отримує останню збережену гру профілю"""
+        pass
+
+    @abstractmethod
+    def get_summaries(self, profile_id: int, limit: Optional[int] = None) -> List[SavedGameSummary]:
+        """Отримує короткі відомості про збереження профілю (від найновішого) без декодування стану"""
+        pass
+
+    @abstractmethod
+    def exists(self, profile_id: int) -> bool:
+        """Перевіряє, чи є в профілю хоча б одне збереження"""
         pass
 
     @abstractmethod
-    def get_all(self) -> List[SavedGame]:
-        """Отримує всі збережені ігри"""
+    def update(self, game: SavedGame, profile_id: Optional[int] = None) -> bool:
+        """Оновлює збережену гру; з profile_id гра іншого профілю не змінюється"""
         pass
 
     @abstractmethod
-    def get_latest(self) -> Optional[SavedGame]:
-        """Отримує останню збережену гру"""
+    def delete(self, game_id: int, profile_id: Optional[int] = None) -> bool:
+        """Видаляє збережену гру; з profile_id гра іншого профілю не видаляється"""
         pass
 
     @abstractmethod
-    def update(self, game: SavedGame) -> bool:
-        """Оновлює збережену гру"""
+    def prune(self, keep_per_difficulty: int) -> int:
+        """Залишає кожному профілю лише keep_per_difficulty найновіших збережень кожної складності"""
         pass
 
     @abstractmethod
-    def delete(self, game_id: int) -> bool:
-        """Видаляє збережену гру"""
+    def append_moves(self, game_id: int, moves: List[Tuple[int, int]]) -> None:
+        """Дописує ходи (номер, упакований хід) до журналу гри"""
+        pass
+
+    @abstractmethod
+    def get_moves(self, game_id: int, after_seq: int = 0) -> List[Tuple[int, int]]:
+        """Отримує ходи журналу з номером більшим за after_seq у порядку їх виконання"""
+        pass
+
+    @abstractmethod
+    def compact(self, game: SavedGame, profile_id: Optional[int] = None) -> bool:
+        """
+        Записує новий знімок гри і видаляє ходи журналу, які він уже містить;
+        з profile_id гра іншого профілю не змінюється
+        """
+        pass
+
+    @abstractmethod
+    def save_many(self, games: List[SavedGame]) -> List[int]:
+        """Зберігає ігри однією транзакцією (нові створює, наявні оновлює) і повертає їхні ID"""
+        pass
+
+    @abstractmethod
+    def get_many(self, game_ids: List[int]) -> List[SavedGame]:
+        """Отримує збережені ігри за списком ID у тому ж порядку (відсутні пропускаються)"""
+        pass
+
+    @abstractmethod
+    def delete_many(self, game_ids: List[int], profile_id: Optional[int] = None) -> int:
+        """
+        Видаляє збережені ігри разом з журналами однією транзакцією і повертає кількість видалених;
+        з profile_id ігри інших профілів пропускаються
+        """
         pass
 
 
@@ -86,13 +184,13 @@ class IUserSettingsRepository(ABC):
         pass
 
     @abstractmethod
-    def get_by_name(self, name: str) -> Optional[UserSetting]:
-        """Отримує налаштування за назвою"""
+    def get_by_name(self, profile_id: int, name: str) -> Optional[UserSetting]:
+        """Отримує налаштування профілю за назвою"""
         pass
 
     @abstractmethod
-    def get_all(self) -> List[UserSetting]:
-        """Отримує всі налаштування"""
+    def get_all(self, profile_id: int) -> List[UserSetting]:
+        """Отримує всі налаштування профілю"""
         pass
 
     @abstractmethod
@@ -101,6 +199,122 @@ class IUserSettingsRepository(ABC):
         pass
 
     @abstractmethod
-    def delete(self, name: str) -> bool:
-        """Видаляє налаштування"""
-        pass
\ No newline at end of file
+    def delete(self, profile_id: int, name: str) -> bool:
+        """Видаляє налаштування профілю"""
+        pass
+
+    @abstractmethod
+    def save_many(self, settings: List[UserSetting]) -> int:
+        """Створює або оновлює налаштування однією транзакцією і повертає їх кількість"""
+        pass
+
+    @abstractmethod
+    def get_many(self, profile_id: int, names: List[str]) -> List[UserSetting]:
+        """Отримує налаштування профілю за списком назв (відсутні пропускаються)"""
+        pass
+
+    @abstractmethod
+    def delete_many(self, profile_id: int, names: List[str]) -> int:
+        """Видаляє налаштування профілю однією транзакцією і повертає кількість видалених"""
+        pass
+
+
+class IProfileRepository(ABC):
+    """Інтерфейс репозиторію для профілів гравців"""
+
+    @abstractmethod
+    def save(self, profile: Profile) -> int:
+        """Створює профіль і повертає ID"""
+        pass
+
+    @abstractmethod
+    def get_by_id(self, profile_id: int) -> Optional[Profile]:
+        """Отримує профіль за ID"""
+        pass
+
+    @abstractmethod
+    def get_by_name(self, name: str) -> Optional[Profile]:
+        """Отримує профіль за ім'ям (без урахування регістру)"""
+        pass
+
+    @abstractmethod
+    def get_all(self, limit: Optional[int] = None) -> List[Profile]:
+        """Отримує профілі, починаючи з тих, що грали нещодавно"""
+        pass
+
+    @abstractmethod
+    def rename(self, profile_id: int, name: str) -> bool:
+        """Змінює ім'я профілю"""
+        pass
+
+    @abstractmethod
+    def touch(self, profile_id: int, when: datetime) -> bool:
+        """Запам'ятовує час останньої активності профілю"""
+        pass
+
+    @abstractmethod
+    def delete(self, profile_id: int) -> bool:
+        """Видаляє профіль разом з усіма його рекордами, збереженнями та налаштуваннями"""
+        pass
+
+class IPuzzleRepository(ABC):
+    """Інтерфейс репозиторію для архіву головоломок"""
+
+    @abstractmethod
+    def save(self, puzzle: ArchivedPuzzle) -> Optional[int]:
+        """Додає головоломку і повертає ID (None, якщо головоломка з таким відбитком вже є)"""
+        pass
+
+    @abstractmethod
+    def save_many(self, puzzles: List[ArchivedPuzzle]) -> int:
+        """Додає головоломки однією транзакцією, пропускаючи наявні, і повертає кількість доданих"""
+        pass
+
+    @abstractmethod
+    def get_by_id(self, puzzle_id: int) -> Optional[ArchivedPuzzle]:
+        """Отримує головоломку за ID"""
+        pass
+
+    @abstractmethod
+    def get_by_hash(self, canonical_hash: str) -> Optional[ArchivedPuzzle]:
+        """Отримує головоломку за канонічним відбитком"""
+        pass
+
+    @abstractmethod
+    def get_rating_range(self, difficulty: Difficulty) -> Optional[Tuple[int, int]]:
+        """Повертає найменший і найбільший рейтинг головоломок складності (None, якщо їх немає)"""
+        pass
+
+    @abstractmethod
+    def pick_unplayed(self, profile_id: int, difficulty: Difficulty, pivot: int) -> Optional[ArchivedPuzzle]:
+        """
+        Повертає незіграну профілем головоломку складності з найменшим випадковим ключем, не меншим
+        за pivot (якщо таких немає - з найменшим ключем загалом); None, якщо незіграних немає
+        """
+        pass
+
+    @abstractmethod
+    def count(self, difficulty: Optional[Difficulty] = None) -> int:
+        """Кількість головоломок архіву (усіх або однієї складності)"""
+        pass
+
+    @abstractmethod
+    def count_unplayed(self, profile_id: int, difficulty: Difficulty) -> int:
+        """Кількість головоломок складності, яких профіль ще не отримував"""
+        pass
+
+    @abstractmethod
+    def mark_played(self, profile_id: int, puzzle_id: int, when: datetime) -> None:
+        """Запам'ятовує, що профіль отримав головоломку, і дає їй новий випадковий ключ вибору"""
+        pass
+
+    @abstractmethod
+    def record_result(self, profile_id: int, puzzle_id: int, completion_time: int, hints_used: int,
+                      when: datetime) -> bool:
+        """Записує результат профілю на головоломці, якщо він кращий за попередній"""
+        pass
+
+    @abstractmethod
+    def get_results(self, puzzle_id: int, limit: int = 10) -> List[PuzzleResult]:
+        """Найкращі результати різних профілів на головоломці (completion_time ASC, hints_used ASC)"""
+        pass
@@ -0,0 +1,161 @@
+"""
+Компактний бінарний формат збереженої гри
+
+Структура блоку (версія 1):
+    1 байт   - версія формату
+    41 байт  - значення клітинок, по 4 біти на клітинку
+    11 байт  - бітова карта фіксованих клітинок
+    11 байт  - бітова карта невірно введених клітинок
+    92 байти - замітки, по 9 біт на клітинку
+    41 байт  - розв'язок, по 4 біти на клітинку
+
+Сітка головоломки архіву (задані клітинки або розв'язок) - 41 байт, по 4 біти на клітинку.
+
+Хід журналу пакується в одне ціле число:
+    біти 0-1   - тип ходу
+    біти 2-8   - індекс клітинки
+    біти 9-12  - значення
+    біти 13+   - пройдений час у секундах
+"""
+from typing import Any, Dict, List, Tuple
+
+from ..config import GRID_SIZE
+from ..models import Cell, Move, MoveKind
+
+FORMAT_VERSION = 1
+
+CELL_COUNT = GRID_SIZE * GRID_SIZE
+NIBBLES_SIZE = (CELL_COUNT + 1) // 2
+BITMAP_SIZE = (CELL_COUNT + 7) // 8
+NOTES_SIZE = (CELL_COUNT * GRID_SIZE + 7) // 8
+BLOB_SIZE = 1 + NIBBLES_SIZE + 2 * BITMAP_SIZE + NOTES_SIZE + NIBBLES_SIZE
+
+_NOTE_MASK = (1 << GRID_SIZE) - 1
+# Таблиця відповідності 9-бітної маски списку заміток
+_NOTES_BY_MASK = [tuple(note + 1 for note in range(GRID_SIZE) if mask >> note & 1)
+                  for mask in range(_NOTE_MASK + 1)]
+
+
+class SaveFormatError(ValueError):
+    """Помилка декодування збереженої гри"""
+    pass
+
+
+def _pack_nibbles(values: List[int]) -> bytes:
+    """Пакує значення 0-15 по два в байт"""
+    if len(values) % 2:
+        values = values + [0]
+    return bytes((values[i] << 4) | values[i + 1] for i in range(0, len(values), 2))
+
+
+def _unpack_nibbles(data: bytes) -> List[int]:
+    """Розпаковує значення, упаковані по два в байт"""
+    values = []
+    for byte in data:
+        values.append(byte >> 4)
+        values.append(byte & 0x0F)
+    return values[:CELL_COUNT]
+
+
+def pack_board(grid: List[List[Cell]], solution: List[List[int]]) -> bytes:
+    """Пакує стан дошки і розв'язок у бінарний блок"""
+    cells = [cell for row in grid for cell in row]
+    fixed_bits = 0
+    invalid_bits = 0
+    notes_bits = 0
+
+    for index, cell in enumerate(cells):
+        if cell.is_fixed:
+            fixed_bits |= 1 << index
+        if not cell.is_valid:
+            invalid_bits |= 1 << index
+        if cell.notes:
+            mask = 0
+            for note in cell.notes:
+                mask |= 1 << (note - 1)
+            notes_bits |= mask << (index * GRID_SIZE)
+
+    return b''.join((
+        bytes((FORMAT_VERSION,)),
+        _pack_nibbles([cell.value for cell in cells]),
+        fixed_bits.to_bytes(BITMAP_SIZE, 'little'),
+        invalid_bits.to_bytes(BITMAP_SIZE, 'little'),
+        notes_bits.to_bytes(NOTES_SIZE, 'little'),
+        _pack_nibbles([value for row in solution for value in row])
+    ))
+
+
+def unpack_board(data: bytes) -> Tuple[List[List[Cell]], List[List[int]]]:
+    """Відновлює клітинки дошки і розв'язок з бінарного блоку"""
+    if not data or data[0] != FORMAT_VERSION:
+        version = data[0] if data else None
+        raise SaveFormatError(f"Unsupported save format version: {version}")
+    if len(data) != BLOB_SIZE:
+        raise SaveFormatError(f"Invalid save size: {len(data)} bytes, expected {BLOB_SIZE}")
+
+    offset = 1
+    values = _unpack_nibbles(data[offset:offset + NIBBLES_SIZE])
+    offset += NIBBLES_SIZE
+    fixed_bits = int.from_bytes(data[offset:offset + BITMAP_SIZE], 'little')
+    offset += BITMAP_SIZE
+    invalid_bits = int.from_bytes(data[offset:offset + BITMAP_SIZE], 'little')
+    offset += BITMAP_SIZE
+    notes_bits = int.from_bytes(data[offset:offset + NOTES_SIZE], 'little')
+    offset += NOTES_SIZE
+    solution_values = _unpack_nibbles(data[offset:offset + NIBBLES_SIZE])
+
+    grid = []
+    for row in range(GRID_SIZE):
+        grid_row = []
+        for col in range(GRID_SIZE):
+            index = row * GRID_SIZE + col
+            cell = Cell(row, col, values[index], bool(fixed_bits >> index & 1))
+            cell.is_valid = not (invalid_bits >> index & 1)
+            mask = notes_bits >> (index * GRID_SIZE) & _NOTE_MASK
+            if mask:
+                cell.notes = set(_NOTES_BY_MASK[mask])
+            grid_row.append(cell)
+        grid.append(grid_row)
+
+    solution = [solution_values[row * GRID_SIZE:(row + 1) * GRID_SIZE] for row in range(GRID_SIZE)]
+    return grid, solution
+
+
+def pack_grid(grid: List[List[int]]) -> bytes:
+    """Пакує сітку цифр (0 - порожня клітинка) по 4 біти на клітинку"""
+    return _pack_nibbles([value for row in grid for value in row])
+
+
+def unpack_grid(data: bytes) -> List[List[int]]:
+    """Відновлює сітку цифр, упаковану pack_grid"""
+    if len(data) != NIBBLES_SIZE:
+        raise SaveFormatError(f"Invalid grid size: {len(data)} bytes, expected {NIBBLES_SIZE}")
+    values = _unpack_nibbles(data)
+    return [values[row * GRID_SIZE:(row + 1) * GRID_SIZE] for row in range(GRID_SIZE)]
+
+
+def grid_from_legacy_state(state: List[List[Dict[str, Any]]]) -> List[List[Cell]]:
+    """Перетворює стан дошки зі старого JSON-формату (словники клітинок) у клітинки"""
+    grid = []
+    for row, row_data in enumerate(state):
+        grid_row = []
+        for col, cell_data in enumerate(row_data):
+            cell = Cell(row, col, cell_data.get('value', 0), cell_data.get('is_fixed', False))
+            cell.notes = set(cell_data.get('notes', ()))
+            cell.is_valid = cell_data.get('is_valid', True)
+            grid_row.append(cell)
+        grid.append(grid_row)
+    return grid
+
+
+def pack_move(move: Move, elapsed_time: int) -> int:
+    """Пакує хід і час, коли його зроблено, в ціле число"""
+    index = move.row * GRID_SIZE + move.col
+    return move.kind.value | index << 2 | move.value << 9 | elapsed_time << 13
+
+
+def unpack_move(packed: int) -> Tuple[Move, int]:
+    """Розпаковує хід і час у секундах"""
+    index = packed >> 2 & 0x7F
+    move = Move(MoveKind(packed & 0x03), index // GRID_SIZE, index % GRID_SIZE, packed >> 9 & 0x0F)
+    return move, packed >> 13
@@ -1,21 +1,48 @@
 """
 Сервісний шар для бізнес-логіки роботи з базою даних
 """
-from typing import List, Optional, Dict, Any
-from datetime import datetime
+from typing import List, Optional, Dict, Any, Tuple
+from datetime import datetime, timedelta
 import json
-
-from .repositories import IGameRecordRepository, ISavedGameRepository, IUserSettingsRepository
-from .models import GameRecord, SavedGame, UserSetting
-from ..models import Difficulty, Cell
+import random
+
+from .repositories import (
+    IGameRecordRepository, IProfileRepository, IPuzzleRepository, ISavedGameRepository, IUserSettingsRepository
+)
+from .models import (
+    DEFAULT_PROFILE_ID, ArchivedPuzzle, GameRecord, LeaderboardCursor, Profile, PuzzleResult, SavedGame,
+    SavedGameSummary, TimeRank, UserSetting
+)
+from ..models import Difficulty, Cell, Move
+from ..core.rating import canonical_hash, rate_puzzle
 from ..utils.helpers import calculate_difficulty_score
+from .save_format import unpack_move
+from .leaderboard_cache import LeaderboardCache
+from .database_manager import DEFAULT_SETTINGS, PUZZLE_PICK_KEY_BITS
 
 
 class GameRecordService:
     """Сервіс для роботи з рекордами ігор"""
 
-    def __init__(self, repository: IGameRecordRepository):
+    def __init__(self, repository: IGameRecordRepository,
+                 leaderboard_cache: Optional[LeaderboardCache] = None,
+                 profile_id: int = DEFAULT_PROFILE_ID):
         self.repository = repository
+        # Кеш можна розділити між сервісами різних з'єднань (наприклад, з потоком запису)
+        self.leaderboard_cache = leaderboard_cache if leaderboard_cache is not None else LeaderboardCache()
+        self.profile_id = profile_id
+
+    def set_profile(self, profile_id: int):
+        """Перемикає сервіс на рекорди іншого профілю"""
+        self.profile_id = profile_id
+
+    def _after_commit(self, callback):
+        """Викликає callback після коміту транзакції репозиторію (одразу, якщо репозиторій без транзакцій)"""
+        db_manager = getattr(self.repository, 'db_manager', None)
+        if db_manager is None:
+            callback()
+        else:
+            db_manager.call_after_commit(callback)
 
     def save_game_record(self, difficulty: Difficulty, completion_time: int, hints_used: int) -> int:
         """Зберігає новий рекорд гри"""
@@ -27,145 +54,295 @@ class GameRecordService:
             completion_time=completion_time,
             hints_used=hints_used,
             score=score,
-            date_completed=datetime.now()
+            date_completed=datetime.now(),
+            profile_id=self.profile_id
         )
 
-        return self.repository.save(record)
+        record.id = self.repository.save(record)
+        # Кеш оновлюється лише після коміту: інакше читання з іншого з'єднання збереже в кеш
+        # таблицю без цього запису
+        self._after_commit(lambda: self.leaderboard_cache.add(record))
+        return record.id
 
     def get_leaderboard(self, difficulty: Optional[Difficulty] = None, limit: int = 10) -> List[GameRecord]:
         """Отримує таблицю лідерів"""
-        if difficulty:
-            records = self.repository.get_by_difficulty(difficulty)
+        return self.get_leaderboard_page(difficulty, limit)
+
+    def get_leaderboard_page(self, difficulty: Optional[Difficulty] = None, limit: int = 10,
+                             after: Optional[LeaderboardCursor] = None) -> List[GameRecord]:
+        """Отримує наступну сторінку таблиці лідерів після курсора"""
+        cache = self.leaderboard_cache
+        cached = cache.get_page(self.profile_id, difficulty, limit, after)
+        if cached is not None:
+            return cached
+
+        if after is None and limit <= cache.capacity:
+            # Перша сторінка: читаємо стільки, скільки вміщує кеш, щоб наступні сторінки бралися з нього
+            generation = cache.generation
+            records = self.repository.get_leaderboard_page(self.profile_id, difficulty, cache.capacity)
+            cache.store(self.profile_id, difficulty, records, generation)
             return records[:limit]
-        else:
-            return self.repository.get_top_scores(limit)
+
+        return self.repository.get_leaderboard_page(self.profile_id, difficulty, limit, after)
 
     def get_personal_stats(self) -> Dict[str, Any]:
         """Отримує персональну статистику гравця"""
-        all_records = self.repository.get_all()
+        cached = self.leaderboard_cache.get_personal_stats(self.profile_id)
+        if cached is not None:
+            return cached
+
+        generation = self.leaderboard_cache.generation
+        stats = self._calculate_personal_stats()
+        self.leaderboard_cache.store_personal_stats(self.profile_id, stats, generation)
+        return stats
 
-        if not all_records:
+    def _calculate_personal_stats(self) -> Dict[str, Any]:
+        """Розраховує персональну статистику зі зведеної таблиці"""
+        difficulty_stats = self.repository.get_difficulty_stats(self.profile_id)
+        total_games = sum(stats['games'] for stats in difficulty_stats.values())
+
+        if not total_games:
             return {
                 'total_games': 0,
                 'total_time': 0,
                 'average_time': 0,
                 'best_scores': {},
-                'games_by_difficulty': {}
+                'games_by_difficulty': {},
+                'last_played': None
             }
 
+        total_time = sum(stats['total_time'] for stats in difficulty_stats.values())
         stats = {
-            'total_games': len(all_records),
-            'total_time': sum(r.completion_time for r in all_records),
-            'average_time': sum(r.completion_time for r in all_records) // len(all_records),
+            'total_games': total_games,
+            'total_time': total_time,
+            'average_time': total_time // total_games,
             'best_scores': {},
-            'games_by_difficulty': {}
+            'games_by_difficulty': {},
+            'last_played': max(stats['last_played'] for stats in difficulty_stats.values())
         }
 
         # Статистика по складності
         for difficulty in Difficulty:
-            difficulty_records = [r for r in all_records if r.difficulty == difficulty]
-            if difficulty_records:
-                best_record = max(difficulty_records, key=lambda x: x.score)
+            difficulty_record = difficulty_stats.get(difficulty)
+            if difficulty_record:
                 stats['best_scores'][difficulty.name] = {
-                    'score': best_record.score,
-                    'time': best_record.completion_time,
-                    'hints_used': best_record.hints_used
+                    'score': difficulty_record['best_score'],
+                    'time': difficulty_record['best_score_time'],
+                    'hints_used': difficulty_record['best_score_hints'],
+                    'best_time': difficulty_record['best_time']
                 }
-                stats['games_by_difficulty'][difficulty.name] = len(difficulty_records)
+                stats['games_by_difficulty'][difficulty.name] = difficulty_record['games']
 
         return stats
 
+    def get_time_rank(self, difficulty: Difficulty, completion_time: int, recorded: bool = False) -> TimeRank:
+        """
+        Місце часу серед рекордів усіх гравців на складності; рівний час ділить місце.
+        Архівовані рекорди не враховуються, тож загальна кількість може бути меншою за кількість
+        ігор у статистиці. recorded=False - результат ще не збережено (рахується як додатковий
+        рекорд), True - він уже серед рекордів.
+        """
+        faster, total = self.repository.count_by_time(difficulty, completion_time)
+        return TimeRank(faster + 1, total if recorded else total + 1)
+
+    def archive_old_records(self, older_than_days: int) -> int:
+        """Архівує рекорди, старші за вказану кількість днів"""
+        cutoff = datetime.now() - timedelta(days=older_than_days)
+        archived = self.repository.archive_before(cutoff)
+        if archived:
+            self._after_commit(self.leaderboard_cache.clear)
+        return archived
+
     def delete_record(self, record_id: int) -> bool:
         """Видаляє запис"""
-        return self.repository.delete(record_id)
+        deleted = self.repository.delete(record_id, self.profile_id)
+        if deleted:
+            self._after_commit(lambda: self.leaderboard_cache.remove(record_id))
+        return deleted
+
+    def import_records(self, records: List[GameRecord]) -> List[int]:
+        """Зберігає готові записи (наприклад, з імпорту) однією транзакцією і повертає їхні ID"""
+        record_ids = self.repository.save_many(records)
+        for record, record_id in zip(records, record_ids):
+            record.id = record_id
+        if record_ids:
+            self._after_commit(self.leaderboard_cache.clear)
+        return record_ids
+
+    def delete_records(self, record_ids: List[int]) -> int:
+        """Видаляє записи однією транзакцією"""
+        deleted = self.repository.delete_many(record_ids, self.profile_id)
+        if deleted:
+            self._after_commit(self.leaderboard_cache.clear)
+        return deleted
 
 
 class SavedGameService:
     """Сервіс для роботи зі збереженими іграми"""
 
-    def __init__(self, repository: ISavedGameRepository):
+    def __init__(self, repository: ISavedGameRepository, profile_id: int = DEFAULT_PROFILE_ID):
         self.repository = repository
+        self.profile_id = profile_id
+
+    def set_profile(self, profile_id: int):
+        """Перемикає сервіс на збереження іншого профілю"""
+        self.profile_id = profile_id
 
     def save_game(self, difficulty: Difficulty, grid: List[List[Cell]],
                   solution: List[List[int]], elapsed_time: int, hints_used: int) -> int:
         """Зберігає поточну гру"""
-        # Конвертуємо сітку клітинок у JSON-серіалізовану форму
-        grid_data = [[cell.to_dict() for cell in row] for row in grid]
-
         saved_game = SavedGame(
             id=None,
             difficulty=difficulty,
-            current_state=grid_data,
+            current_state=grid,
             solution=solution,
             elapsed_time=elapsed_time,
             hints_used=hints_used,
-            date_saved=datetime.now()
+            date_saved=datetime.now(),
+            profile_id=self.profile_id
         )
 
         return self.repository.save(saved_game)
 
     def load_game(self, game_id: int) -> Optional[SavedGame]:
         """Завантажує збережену гру"""
-        return self.repository.get_by_id(game_id)
+        return self.repository.get_by_id(game_id, self.profile_id)
 
     def get_all_saves(self) -> List[SavedGame]:
         """Отримує всі збережені ігри"""
-        return self.repository.get_all()
+        return self.repository.get_all(self.profile_id)
+
+    def get_save_summaries(self, limit: Optional[int] = None) -> List[SavedGameSummary]:
+        """Отримує список збережень для відображення без завантаження стану дошки"""
+        return self.repository.get_summaries(self.profile_id, limit)
 
     def get_latest_save(self) -> Optional[SavedGame]:
         """Отримує останнє збереження"""
-        return self.repository.get_latest()
+        return self.repository.get_latest(self.profile_id)
 
     def update_save(self, saved_game: SavedGame) -> bool:
         """Оновлює збережену гру"""
         saved_game.date_saved = datetime.now()
-        return self.repository.update(saved_game)
+        return self.repository.update(saved_game, self.profile_id)
 
     def delete_save(self, game_id: int) -> bool:
         """Видаляє збережену гру"""
-        return self.repository.delete(game_id)
+        return self.repository.delete(game_id, self.profile_id)
+
+    def delete_saves(self, game_ids: List[int]) -> int:
+        """Видаляє кілька збережених ігор однією транзакцією"""
+        return self.repository.delete_many(game_ids, self.profile_id)
 
     def has_saves(self) -> bool:
         """Перевіряє, чи є збережені ігри"""
-        saves = self.repository.get_all()
-        return len(saves) > 0
+        return self.repository.exists(self.profile_id)
+
+    def prune_saves(self, keep_per_difficulty: int) -> int:
+        """Видаляє старі збереження понад ліміт для кожної складності"""
+        return self.repository.prune(keep_per_difficulty)
+
+    def append_moves(self, game_id: int, moves: List[Tuple[int, int]]) -> None:
+        """Дописує упаковані ходи до журналу автозбереження"""
+        self.repository.append_moves(game_id, moves)
+
+    def get_journal(self, game_id: int, after_seq: int = 0) -> List[Tuple[int, Move, int]]:
+        """Отримує ходи після знімка як (номер, хід, час у секундах)"""
+        journal = []
+        for seq, packed in self.repository.get_moves(game_id, after_seq):
+            move, elapsed_time = unpack_move(packed)
+            journal.append((seq, move, elapsed_time))
+        return journal
+
+    def compact_game(self, game_id: int, difficulty: Difficulty, grid: List[List[Cell]],
+                     solution: List[List[int]], elapsed_time: int, hints_used: int, journal_seq: int) -> bool:
+        """Згортає журнал у новий знімок дошки"""
+        saved_game = SavedGame(
+            id=game_id,
+            difficulty=difficulty,
+            current_state=grid,
+            solution=solution,
+            elapsed_time=elapsed_time,
+            hints_used=hints_used,
+            date_saved=datetime.now(),
+            journal_seq=journal_seq,
+            profile_id=self.profile_id
+        )
+
+        return self.repository.compact(saved_game, self.profile_id)
 
 
 class UserSettingsService:
     """Сервіс для роботи з налаштуваннями користувача"""
 
-    def __init__(self, repository: IUserSettingsRepository):
+    def __init__(self, repository: IUserSettingsRepository, profile_id: int = DEFAULT_PROFILE_ID):
         self.repository = repository
+        self.profile_id = profile_id
+        # Кеш усіх налаштувань профілю: читання з пам'яті, запис одразу в репозиторій
+        self._cache: Optional[Dict[str, str]] = None
+
+    def set_profile(self, profile_id: int):
+        """Перемикає сервіс на налаштування іншого профілю"""
+        self.profile_id = profile_id
+        self._cache = None
+
+    def _settings(self) -> Dict[str, str]:
+        """Повертає кеш налаштувань, завантажуючи його одним запитом при першому зверненні"""
+        if self._cache is None:
+            self._cache = {setting.setting_name: setting.setting_value
+                           for setting in self.repository.get_all(self.profile_id)}
+        return self._cache
+
+    def refresh(self) -> Dict[str, str]:
+        """Перезавантажує кеш з репозиторію"""
+        self._cache = None
+        return self._settings()
 
     def get_setting(self, name: str, default_value: str = None) -> Optional[str]:
         """Отримує значення налаштування за назвою"""
-        setting = self.repository.get_by_name(name)
-        if setting:
-            return setting.setting_value
-        return default_value
+        return self._settings().get(name, default_value)
 
     def set_setting(self, name: str, value: str) -> bool:
         """Встановлює значення налаштування"""
-        existing_setting = self.repository.get_by_name(name)
+        settings = self._settings()
+        setting = UserSetting(id=None, setting_name=name, setting_value=value, profile_id=self.profile_id)
 
-        if existing_setting:
+        if name in settings:
             # Оновлюємо існуюче налаштування
-            existing_setting.setting_value = value
-            return self.repository.update(existing_setting)
+            success = self.repository.update(setting)
         else:
             # Створюємо нове налаштування
-            new_setting = UserSetting(
-                id=None,
-                setting_name=name,
-                setting_value=value
-            )
-            self.repository.save(new_setting)
-            return True
+            self.repository.save(setting)
+            success = True
+
+        if success:
+            settings[name] = value
+        return success
+
+    def get_bool(self, name: str, default_value: bool) -> bool:
+        """Отримує логічне налаштування"""
+        value = self._settings().get(name)
+        if value is None:
+            return default_value
+        return value.lower() == 'true'
+
+    def set_bool(self, name: str, value: bool) -> bool:
+        """Встановлює логічне налаштування"""
+        return self.set_setting(name, str(value).lower())
+
+    def get_int(self, name: str, default_value: int) -> int:
+        """Отримує цілочисельне налаштування"""
+        try:
+            return int(self._settings().get(name, default_value))
+        except (ValueError, TypeError):
+            return default_value
+
+    def set_int(self, name: str, value: int) -> bool:
+        """Встановлює цілочисельне налаштування"""
+        return self.set_setting(name, str(value))
 
     def get_all_settings(self) -> Dict[str, str]:
         """Отримує всі налаштування у вигляді словника"""
-        settings = self.repository.get_all()
-        return {setting.setting_name: setting.setting_value for setting in settings}
+        return dict(self._settings())
 
     def get_theme(self) -> str:
         """Отримує поточну тему"""
@@ -179,48 +356,45 @@ class UserSettingsService:
 
     def is_sound_enabled(self) -> bool:
         """Перевіряє, чи увімкнений звук"""
-        return self.get_setting('sound_enabled', 'true').lower() == 'true'
+        return self.get_bool('sound_enabled', True)
 
     def set_sound_enabled(self, enabled: bool) -> bool:
         """Встановлює статус звуку"""
-        return self.set_setting('sound_enabled', str(enabled).lower())
+        return self.set_bool('sound_enabled', enabled)
 
     def is_auto_notes_enabled(self) -> bool:
         """Перевіряє, чи увімкнені автоматичні нотатки"""
-        return self.get_setting('auto_notes', 'false').lower() == 'true'
+        return self.get_bool('auto_notes', False)
 
     def set_auto_notes_enabled(self, enabled: bool) -> bool:
         """Встановлює статус автоматичних нотаток"""
-        return self.set_setting('auto_notes', str(enabled).lower())
+        return self.set_bool('auto_notes', enabled)
 
     def is_highlight_conflicts_enabled(self) -> bool:
         """Перевіряє, чи увімкнене підсвічування конфліктів"""
-        return self.get_setting('highlight_conflicts', 'true').lower() == 'true'
+        return self.get_bool('highlight_conflicts', True)
 
     def set_highlight_conflicts_enabled(self, enabled: bool) -> bool:
         """Встановлює статус підсвічування конфліктів"""
-        return self.set_setting('highlight_conflicts', str(enabled).lower())
+        return self.set_bool('highlight_conflicts', enabled)
 
     def is_timer_shown(self) -> bool:
         """Перевіряє, чи показується таймер"""
-        return self.get_setting('show_timer', 'true').lower() == 'true'
+        return self.get_bool('show_timer', True)
 
     def set_timer_shown(self, shown: bool) -> bool:
         """Встановлює, чи показувати таймер"""
-        return self.set_setting('show_timer', str(shown).lower())
+        return self.set_bool('show_timer', shown)
 
     def get_max_hints(self) -> int:
         """Отримує максимальну кількість підказок"""
-        try:
-            return int(self.get_setting('max_hints', '5'))
-        except (ValueError, TypeError):
-            return 5
+        return self.get_int('max_hints', 5)
 
     def set_max_hints(self, max_hints: int) -> bool:
         """Встановлює максимальну кількість підказок"""
         if max_hints < 0:
             raise ValueError("Max hints cannot be negative")
-        return self.set_setting('max_hints', str(max_hints))
+        return self.set_int('max_hints', max_hints)
 
     def get_difficulty_preference(self) -> Optional[str]:
         """Отримує переважний рівень складності"""
@@ -235,34 +409,159 @@ class UserSettingsService:
 
     def reset_settings(self) -> bool:
         """Скидає всі налаштування до значень за замовчуванням"""
-        default_settings = {
-            'theme': 'light',
-            'sound_enabled': 'true',
-            'auto_notes': 'false',
-            'highlight_conflicts': 'true',
-            'show_timer': 'true',
-            'max_hints': '5'
-        }
-
-        success = True
-        for name, value in default_settings.items():
-            if not self.set_setting(name, value):
-                success = False
-
-        return success
+        return self.import_settings(dict(DEFAULT_SETTINGS))
 
     def delete_setting(self, name: str) -> bool:
         """Видаляє налаштування"""
-        return self.repository.delete(name)
+        deleted = self.repository.delete(self.profile_id, name)
+        self._settings().pop(name, None)
+        return deleted
 
     def export_settings(self) -> Dict[str, str]:
         """Експортує налаштування для бекапу"""
         return self.get_all_settings()
 
     def import_settings(self, settings: Dict[str, str]) -> bool:
-        """Імпортує налаштування з бекапу"""
-        success = True
-        for name, value in settings.items():
-            if not self.set_setting(name, value):
-                success = False
-        return success
\ No newline at end of file
+        """Імпортує налаштування з бекапу однією транзакцією"""
+        self.repository.save_many([
+            UserSetting(id=None, setting_name=name, setting_value=value, profile_id=self.profile_id)
+            for name, value in settings.items()
+        ])
+        self._settings().update(settings)
+        return True
+
+
+class ProfileService:
+    """Сервіс для роботи з профілями гравців"""
+
+    MAX_NAME_LENGTH = 32
+
+    def __init__(self, repository: IProfileRepository):
+        self.repository = repository
+
+    def _validate_name(self, name: str) -> str:
+        """Перевіряє ім'я профілю і повертає його без зайвих пробілів"""
+        name = name.strip()
+        if not name:
+            raise ValueError("Profile name cannot be empty")
+        if len(name) > self.MAX_NAME_LENGTH:
+            raise ValueError(f"Profile name cannot be longer than {self.MAX_NAME_LENGTH} characters")
+        existing = self.repository.get_by_name(name)
+        if existing is not None:
+            raise ValueError(f"Profile '{existing.name}' already exists")
+        return name
+
+    def create_profile(self, name: str) -> Profile:
+        """Створює новий профіль"""
+        profile = Profile(id=None, name=self._validate_name(name), date_created=datetime.now())
+        profile.id = self.repository.save(profile)
+        return profile
+
+    def get_profile(self, profile_id: int) -> Optional[Profile]:
+        """Отримує профіль за ID"""
+        return self.repository.get_by_id(profile_id)
+
+    def find_profile(self, name: str) -> Optional[Profile]:
+        """Шукає профіль за ім'ям"""
+        return self.repository.get_by_name(name.strip())
+
+    def get_profiles(self, limit: Optional[int] = None) -> List[Profile]:
+        """Отримує профілі, починаючи з тих, що грали нещодавно"""
+        return self.repository.get_all(limit)
+
+    def get_last_active_profile(self) -> Optional[Profile]:
+        """Отримує профіль, який грав останнім"""
+        profiles = self.repository.get_all(1)
+        return profiles[0] if profiles else None
+
+    def rename_profile(self, profile_id: int, name: str) -> bool:
+        """Перейменовує профіль"""
+        return self.repository.rename(profile_id, self._validate_name(name))
+
+    def touch_profile(self, profile_id: int) -> bool:
+        """Позначає профіль як активний зараз"""
+        return self.repository.touch(profile_id, datetime.now())
+
+    def delete_profile(self, profile_id: int) -> bool:
+        """Видаляє профіль з усіма його даними (профіль за замовчуванням видалити не можна)"""
+        if profile_id == DEFAULT_PROFILE_ID:
+            raise ValueError("The default profile cannot be deleted")
+        return self.repository.delete(profile_id)
+
+
+class PuzzleArchiveService:
+    """
+    Сервіс архіву головоломок: поповнення згенерованими головоломками, вибір незіграної
+    головоломки для нової гри і порівняння результатів гравців на одній головоломці
+    """
+
+    def __init__(self, repository: IPuzzleRepository, profile_id: int = DEFAULT_PROFILE_ID):
+        self.repository = repository
+        self.profile_id = profile_id
+
+    def set_profile(self, profile_id: int):
+        """Перемикає сервіс на інший профіль"""
+        self.profile_id = profile_id
+
+    @staticmethod
+    def build_puzzle(difficulty: Difficulty, givens: List[List[int]], solution: List[List[int]],
+                     generator_version: int) -> ArchivedPuzzle:
+        """Створює запис архіву: рахує канонічний відбиток і рейтинг головоломки"""
+        return ArchivedPuzzle(
+            id=None,
+            difficulty=difficulty,
+            givens=[list(row) for row in givens],
+            solution=[list(row) for row in solution],
+            canonical_hash=canonical_hash(givens),
+            rating=rate_puzzle(givens),
+            generator_version=generator_version,
+            date_created=datetime.now()
+        )
+
+    def add_puzzle(self, difficulty: Difficulty, givens: List[List[int]], solution: List[List[int]],
+                   generator_version: int) -> int:
+        """Додає головоломку в архів і повертає її ID (для вже наявної - ID запису з тим самим відбитком)"""
+        puzzle = self.build_puzzle(difficulty, givens, solution, generator_version)
+        puzzle_id = self.repository.save(puzzle)
+        if puzzle_id is None:
+            puzzle_id = self.repository.get_by_hash(puzzle.canonical_hash).id
+        return puzzle_id
+
+    def add_puzzles(self, puzzles: List[ArchivedPuzzle]) -> int:
+        """Додає підготовлені головоломки однією транзакцією і повертає кількість нових"""
+        return self.repository.save_many(puzzles)
+
+    def get_puzzle(self, puzzle_id: int) -> Optional[ArchivedPuzzle]:
+        """Отримує головоломку за ID (для повторної гри)"""
+        return self.repository.get_by_id(puzzle_id)
+
+    def next_puzzle(self, difficulty: Difficulty) -> Optional[ArchivedPuzzle]:
+        """
+        Вибирає випадкову головоломку складності, яку профіль ще не отримував (None, якщо таких немає).
+        Замість ORDER BY RANDOM() береться перша незіграна головоломка після випадкового значення
+        ключа: один пошук в індексі без підрахунку і сортування архіву. Отримана головоломка
+        в mark_played отримує новий ключ, тож нерівні проміжки між ключами не закріплюються.
+        """
+        pivot = random.getrandbits(PUZZLE_PICK_KEY_BITS)
+        return self.repository.pick_unplayed(self.profile_id, difficulty, pivot)
+
+    def mark_played(self, puzzle_id: int) -> None:
+        """Запам'ятовує, що профіль отримав головоломку, щоб вона не випадала повторно"""
+        self.repository.mark_played(self.profile_id, puzzle_id, datetime.now())
+
+    def record_result(self, puzzle_id: int, completion_time: int, hints_used: int) -> bool:
+        """Записує результат профілю на головоломці, якщо він кращий за попередній"""
+        return self.repository.record_result(self.profile_id, puzzle_id, completion_time, hints_used,
+                                             datetime.now())
+
+    def get_results(self, puzzle_id: int, limit: int = 10) -> List[PuzzleResult]:
+        """Найкращі результати гравців на головоломці"""
+        return self.repository.get_results(puzzle_id, limit)
+
+    def count_unplayed(self, difficulty: Difficulty) -> int:
+        """Кількість головоломок складності, яких профіль ще не отримував"""
+        return self.repository.count_unplayed(self.profile_id, difficulty)
+
+    def count(self, difficulty: Optional[Difficulty] = None) -> int:
+        """Кількість головоломок архіву"""
+        return self.repository.count(difficulty)
@@ -1,15 +1,53 @@
 """
 SQLite реалізації репозиторіїв
 """
+import json
 import sqlite3
-from typing import List, Optional
+import zlib
+from itertools import groupby
+from typing import Any, Dict, List, Optional, Tuple
 from datetime import datetime
 
-from .repositories import IGameRecordRepository, ISavedGameRepository, IUserSettingsRepository
-from .models import GameRecord, SavedGame, UserSetting
+from .repositories import (
+    IGameRecordRepository, IProfileRepository, IPuzzleRepository, ISavedGameRepository, IUserSettingsRepository
+)
+from .models import (
+    ArchivedPuzzle, GameRecord, LeaderboardCursor, Profile, PuzzleResult, SavedGame, SavedGameSummary, UserSetting
+)
 from .database_manager import DatabaseManager
+from .save_format import pack_board
 from ..models import Difficulty
 
+# Найбільша кількість ID в одному IN (...): менше за ліміт параметрів запиту старих версій SQLite
+IN_CHUNK_SIZE = 500
+
+
+def _chunks(values: List[Any], size: int = IN_CHUNK_SIZE):
+    """Ділить список на частини для запитів з IN (...)"""
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def _placeholders(count: int) -> str:
+    """Повертає '?, ?, ...' для IN (...)"""
+    return ', '.join('?' * count)
+
+
+def _inserted_ids(conn: sqlite3.Connection, count: int) -> List[int]:
+    """
+    ID рядків, щойно вставлених одним executemany. Транзакція тримає блокування запису,
+    тож AUTOINCREMENT видає їх підряд і останній з них повертає last_insert_rowid().
+    """
+    last_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+    return list(range(last_id - count + 1, last_id + 1))
+
+
+def _owned_by(profile_id: Optional[int]) -> Tuple[str, Tuple[int, ...]]:
+    """Умова належності рядка профілю для запитів за ID (порожня, якщо профіль не задано)"""
+    if profile_id is None:
+        return "", ()
+    return " AND profile_id = ?", (profile_id,)
+
 
 class SQLiteGameRecordRepository(IGameRecordRepository):
     """SQLite реалізація репозиторію для рекордів ігор"""
@@ -19,74 +57,236 @@ class SQLiteGameRecordRepository(IGameRecordRepository):
 
     def save(self, record: GameRecord) -> int:
         """Зберігає запис про гру і повертає ID"""
-        conn = self.db_manager.get_connection()
-        cursor = conn.execute("""
-            INSERT INTO game_records (difficulty, completion_time, hints_used, score, date_completed)
-            VALUES (?, ?, ?, ?, ?)
-        """, (
-            record.difficulty.name,
-            record.completion_time,
-            record.hints_used,
-            record.score,
-            record.date_completed.isoformat()
-        ))
-
-        conn.commit()
+        with self.db_manager.transaction() as conn:
+            cursor = conn.execute("""
+                INSERT INTO game_records (profile_id, difficulty, completion_time, hints_used, score, date_completed)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, (
+                record.profile_id,
+                record.difficulty.name,
+                record.completion_time,
+                record.hints_used,
+                record.score,
+                record.date_completed.isoformat()
+            ))
         return cursor.lastrowid
 
-    def get_by_id(self, record_id: int) -> Optional[GameRecord]:
-        """Отримує запис за ID"""
+    def get_by_id(self, record_id: int, profile_id: Optional[int] = None) -> Optional[GameRecord]:
+        """Отримує запис за ID; з profile_id запис іншого профілю не повертається"""
+        owned, owner = _owned_by(profile_id)
         conn = self.db_manager.get_connection()
-        cursor = conn.execute("""
-            SELECT * FROM game_records WHERE id = ?
-        """, (record_id,))
+        cursor = conn.execute(f"""
+            SELECT * FROM game_records WHERE id = ?{owned}
+        """, (record_id, *owner))
 
         row = cursor.fetchone()
         if row:
             return GameRecord.from_dict(dict(row))
         return None
 
-    def get_all(self) -> List[GameRecord]:
-        """Отримує всі записи"""
+    def get_all(self, profile_id: int) -> List[GameRecord]:
+        """Отримує всі записи профілю"""
         conn = self.db_manager.get_connection()
         cursor = conn.execute("""
-            SELECT * FROM game_records ORDER BY date_completed DESC
-        """)
+            SELECT * FROM game_records WHERE profile_id = ? ORDER BY date_completed DESC
+        """, (profile_id,))
 
         return [GameRecord.from_dict(dict(row)) for row in cursor.fetchall()]
 
-    def get_by_difficulty(self, difficulty: Difficulty) -> List[GameRecord]:
-        """Отримує записи за рівнем складності"""
+    def get_by_difficulty(self, profile_id: int, difficulty: Difficulty) -> List[GameRecord]:
+        """Отримує записи профілю за рівнем складності"""
         conn = self.db_manager.get_connection()
         cursor = conn.execute("""
             SELECT * FROM game_records 
-            WHERE difficulty = ? 
+            WHERE profile_id = ? AND difficulty = ? 
             ORDER BY score DESC, completion_time ASC
-        """, (difficulty.name,))
+        """, (profile_id, difficulty.name))
 
         return [GameRecord.from_dict(dict(row)) for row in cursor.fetchall()]
 
-    def get_top_scores(self, limit: int = 10) -> List[GameRecord]:
-        """Отримує топ результатів"""
+    def get_top_scores(self, profile_id: int, limit: int = 10) -> List[GameRecord]:
+        """Отримує топ результатів профілю"""
         conn = self.db_manager.get_connection()
         cursor = conn.execute("""
             SELECT * FROM game_records 
+            WHERE profile_id = ?
             ORDER BY score DESC, completion_time ASC 
             LIMIT ?
-        """, (limit,))
+        """, (profile_id, limit))
 
         return [GameRecord.from_dict(dict(row)) for row in cursor.fetchall()]
 
-    def delete(self, record_id: int) -> bool:
-        """Видаляє запис"""
+    def get_leaderboard_page(self, profile_id: int, difficulty: Optional[Difficulty], limit: int,
+                             after: Optional[LeaderboardCursor] = None) -> List[GameRecord]:
+        """Отримує сторінку таблиці лідерів профілю пошуком по індексу від курсора (без OFFSET)"""
+        conditions = ["profile_id = ?"]
+        params: List[Any] = [profile_id]
+
+        if difficulty:
+            conditions.append("difficulty = ?")
+            params.append(difficulty.name)
+
+        if after:
+            # Порядок змішаний (DESC/ASC), тому порівняння кортежів розписано вручну:
+            # "score <= ?" задає діапазон пошуку по індексу, решта лише відсіює рядки на межі
+            conditions.append("""(score <= ? AND (score < ? OR completion_time > ?
+                                  OR (completion_time = ? AND id > ?)))""")
+            params.extend([after.score, after.score, after.completion_time, after.completion_time, after.id])
+
+        params.append(limit)
+
         conn = self.db_manager.get_connection()
-        cursor = conn.execute("""
-            DELETE FROM game_records WHERE id = ?
-        """, (record_id,))
+        cursor = conn.execute(f"""
+            SELECT id, profile_id, difficulty, completion_time, hints_used, score, date_completed
+            FROM game_records
+            WHERE {' AND '.join(conditions)}
+            ORDER BY score DESC, completion_time ASC, id ASC
+            LIMIT ?
+        """, params)
+
+        return [GameRecord.from_dict(dict(row)) for row in cursor.fetchall()]
 
-        conn.commit()
+    def get_difficulty_stats(self, profile_id: int) -> Dict[Difficulty, Dict[str, Any]]:
+        """Повертає статистику профілю по складності з таблиці player_stats, яку підтримують тригери"""
+        conn = self.db_manager.get_connection()
+        cursor = conn.execute("""
+            SELECT difficulty, games, total_time, best_score, best_score_time, best_score_hints,
+                   best_time, last_played
+            FROM player_stats
+            WHERE profile_id = ? AND games > 0
+        """, (profile_id,))
+
+        return {
+            Difficulty[row['difficulty']]: {
+                'games': row['games'],
+                'total_time': row['total_time'],
+                'best_score': row['best_score'],
+                'best_score_time': row['best_score_time'],
+                'best_score_hints': row['best_score_hints'],
+                'best_time': row['best_time'],
+                'last_played': row['last_played']
+            }
+            for row in cursor.fetchall()
+        }
+
+    def count_by_time(self, difficulty: Difficulty, completion_time: int) -> Tuple[int, int]:
+        """
+        Повертає кількість рекордів усіх профілів на складності з часом, меншим за completion_time,
+        і загальну кількість рекордів складності (архівовані не враховуються)
+        """
+        conn = self.db_manager.get_connection()
+        # Сума по лічильниках часу, а не COUNT(*) по game_records: діапазон індексу має стільки
+        # рядків, скільки різних секунд, а не ігор, тож час запиту не росте з кількістю рекордів
+        row = conn.execute("""
+            SELECT
+                (SELECT COALESCE(SUM(games), 0) FROM completion_time_counts
+                 WHERE difficulty = :difficulty AND completion_time < :completion_time),
+                (SELECT COALESCE(SUM(games), 0) FROM completion_time_counts
+                 WHERE difficulty = :difficulty)
+        """, {'difficulty': difficulty.name, 'completion_time': completion_time}).fetchone()
+        return row[0], row[1]
+
+    def archive_before(self, cutoff: datetime) -> int:
+        """
+        Переносить рекорди, завершені до cutoff, в архів: по рядку на профіль, складність і місяць
+        з підсумками та стисненими вихідними записами. Статистика гравця не змінюється.
+        """
+        with self.db_manager.transaction() as conn:
+            cursor = conn.execute("""
+                SELECT id, profile_id, difficulty, completion_time, hints_used, score, date_completed
+                FROM game_records
+                WHERE date_completed < ?
+                ORDER BY profile_id, difficulty, date_completed
+            """, (cutoff.isoformat(),))
+
+            archived = 0
+            groups = groupby(cursor, key=lambda row: (row['profile_id'], row['difficulty'],
+                                                      row['date_completed'][:7]))
+            for (profile_id, difficulty, period), rows in groups:
+                # Профіль і складність спільні для групи і зберігаються в самому рядку архіву
+                records = [(row['id'], row['completion_time'], row['hints_used'], row['score'],
+                            row['date_completed']) for row in rows]
+                best = min(records, key=lambda record: (-record[3], record[1], record[0]))
+                conn.execute("""
+                    INSERT INTO game_records_archive (profile_id, difficulty, period, games, total_time,
+                                                      total_hints, best_score, best_score_time,
+                                                      best_score_hints, best_time, last_played, records)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, (
+                    profile_id,
+                    difficulty,
+                    period,
+                    len(records),
+                    sum(record[1] for record in records),
+                    sum(record[2] for record in records),
+                    best[3],
+                    best[1],
+                    best[2],
+                    min(record[1] for record in records),
+                    max(record[4] for record in records),
+                    zlib.compress(json.dumps(records, separators=(',', ':')).encode('utf-8'), 9)
+                ))
+                archived += len(records)
+
+            if archived:
+                conn.execute("DELETE FROM game_records WHERE date_completed < ?", (cutoff.isoformat(),))
+                # Тригер видалення зменшив лічильники - перераховуємо статистику разом з архівом
+                self.db_manager.rebuild_player_stats(conn)
+
+        return archived
+
+    def delete(self, record_id: int, profile_id: Optional[int] = None) -> bool:
+        """Видаляє запис; з profile_id запис іншого профілю не видаляється"""
+        owned, owner = _owned_by(profile_id)
+        with self.db_manager.transaction() as conn:
+            cursor = conn.execute(f"""
+                DELETE FROM game_records WHERE id = ?{owned}
+            """, (record_id, *owner))
         return cursor.rowcount > 0
 
+    def save_many(self, records: List[GameRecord]) -> List[int]:
+        """Зберігає записи однією транзакцією і повертає їхні ID у тому ж порядку"""
+        if not records:
+            return []
+        with self.db_manager.transaction() as conn:
+            conn.executemany("""
+                INSERT INTO game_records (profile_id, difficulty, completion_time, hints_used, score, date_completed)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, [(
+                record.profile_id,
+                record.difficulty.name,
+                record.completion_time,
+                record.hints_used,
+                record.score,
+                record.date_completed.isoformat()
+            ) for record in records])
+            return _inserted_ids(conn, len(records))
+
+    def get_many(self, record_ids: List[int]) -> List[GameRecord]:
+        """Отримує записи за списком ID у тому ж порядку (відсутні пропускаються)"""
+        conn = self.db_manager.get_connection()
+        found = {}
+        for chunk in _chunks(list(record_ids)):
+            cursor = conn.execute(f"""
+                SELECT * FROM game_records WHERE id IN ({_placeholders(len(chunk))})
+            """, chunk)
+            for row in cursor.fetchall():
+                found[row['id']] = GameRecord.from_dict(dict(row))
+
+        return [found[record_id] for record_id in record_ids if record_id in found]
+
+    def delete_many(self, record_ids: List[int], profile_id: Optional[int] = None) -> int:
+        """
+        Видаляє записи однією транзакцією і повертає кількість видалених;
+        з profile_id записи інших профілів пропускаються
+        """
+        owned, owner = _owned_by(profile_id)
+        with self.db_manager.transaction() as conn:
+            cursor = conn.executemany(f"""
+                DELETE FROM game_records WHERE id = ?{owned}
+            """, [(record_id, *owner) for record_id in record_ids])
+        return max(cursor.rowcount, 0)
+
 
 class SQLiteSavedGameRepository(ISavedGameRepository):
     """SQLite реалізація репозиторію для збережених ігор"""
@@ -96,108 +296,265 @@ class SQLiteSavedGameRepository(ISavedGameRepository):
 
     def save(self, game: SavedGame) -> int:
         """Зберігає гру і повертає ID"""
-        conn = self.db_manager.get_connection()
-
-        if game.id is None:
-            # Створення нового запису
-            cursor = conn.execute("""
-                INSERT INTO saved_games (difficulty, current_state, solution, elapsed_time, hints_used, date_saved)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (
-                game.difficulty.name,
-                game.to_dict()['current_state'],
-                game.to_dict()['solution'],
-                game.elapsed_time,
-                game.hints_used,
-                game.date_saved.isoformat()
-            ))
-            game_id = cursor.lastrowid
-        else:
-            # Оновлення існуючого запису
-            conn.execute("""
-                UPDATE saved_games 
-                SET current_state = ?, elapsed_time = ?, hints_used = ?, 
-                    date_saved = ?, updated_at = CURRENT_TIMESTAMP
-                WHERE id = ?
-            """, (
-                game.to_dict()['current_state'],
-                game.elapsed_time,
-                game.hints_used,
-                game.date_saved.isoformat(),
-                game.id
-            ))
-            game_id = game.id
-
-        conn.commit()
+        with self.db_manager.transaction() as conn:
+            if game.id is None:
+                # Створення нового запису
+                cursor = conn.execute("""
+                    INSERT INTO saved_games (profile_id, difficulty, state, elapsed_time, hints_used,
+                                             filled_cells, journal_seq, date_saved)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """, (
+                    game.profile_id,
+                    game.difficulty.name,
+                    pack_board(game.current_state, game.solution),
+                    game.elapsed_time,
+                    game.hints_used,
+                    game.count_filled_cells(),
+                    game.journal_seq,
+                    game.date_saved.isoformat()
+                ))
+                game_id = cursor.lastrowid
+            else:
+                # Оновлення існуючого запису
+                conn.execute("""
+                    UPDATE saved_games 
+                    SET state = ?, elapsed_time = ?, hints_used = ?, filled_cells = ?, journal_seq = ?,
+                        date_saved = ?, updated_at = CURRENT_TIMESTAMP
+                    WHERE id = ?
+                """, (
+                    pack_board(game.current_state, game.solution),
+                    game.elapsed_time,
+                    game.hints_used,
+                    game.count_filled_cells(),
+                    game.journal_seq,
+                    game.date_saved.isoformat(),
+                    game.id
+                ))
+                game_id = game.id
         return game_id
 
-    def get_by_id(self, game_id: int) -> Optional[SavedGame]:
-        """Отримує збережену гру за ID"""
+    def get_by_id(self, game_id: int, profile_id: Optional[int] = None) -> Optional[SavedGame]:
+        """Отримує збережену гру за ID; з profile_id гра іншого профілю не повертається"""
+        owned, owner = _owned_by(profile_id)
         conn = self.db_manager.get_connection()
-        cursor = conn.execute("""
-            SELECT * FROM saved_games WHERE id = ?
-        """, (game_id,))
+        cursor = conn.execute(f"""
+            SELECT * FROM saved_games WHERE id = ?{owned}
+        """, (game_id, *owner))
 
         row = cursor.fetchone()
         if row:
             return SavedGame.from_dict(dict(row))
         return None
 
-    def get_all(self) -> List[SavedGame]:
-        """Отримує всі збережені ігри"""
+    def get_all(self, profile_id: int) -> List[SavedGame]:
+        """Отримує всі збережені ігри профілю"""
         conn = self.db_manager.get_connection()
         cursor = conn.execute("""
-            SELECT * FROM saved_games ORDER BY date_saved DESC
-        """)
+            SELECT * FROM saved_games WHERE profile_id = ? ORDER BY date_saved DESC
+        """, (profile_id,))
 
         return [SavedGame.from_dict(dict(row)) for row in cursor.fetchall()]
 
-    def get_latest(self) -> Optional[SavedGame]:
-        """Отримує останню збережену гру"""
+    def get_latest(self, profile_id: int) -> Optional[SavedGame]:
+        """Отримує останню збережену гру профілю"""
         conn = self.db_manager.get_connection()
         cursor = conn.execute("""
-            SELECT * FROM saved_games ORDER BY date_saved DESC LIMIT 1
-        """)
+            SELECT * FROM saved_games WHERE profile_id = ? ORDER BY date_saved DESC LIMIT 1
+        """, (profile_id,))
 
         row = cursor.fetchone()
         if row:
             return SavedGame.from_dict(dict(row))
         return None
 
-    def update(self, game: SavedGame) -> bool:
-        """Оновлює збережену гру"""
+    def get_summaries(self, profile_id: int, limit: Optional[int] = None) -> List[SavedGameSummary]:
+        """Отримує короткі відомості про збереження профілю (від найновішого) без декодування стану"""
+        conn = self.db_manager.get_connection()
+        # Бінарний стан дошки не читається зовсім
+        cursor = conn.execute("""
+            SELECT id, difficulty, elapsed_time, hints_used, filled_cells, date_saved
+            FROM saved_games
+            WHERE profile_id = ?
+            ORDER BY date_saved DESC
+            LIMIT ?
+        """, (profile_id, -1 if limit is None else limit))
+
+        return [SavedGameSummary.from_dict(dict(row)) for row in cursor.fetchall()]
+
+    def exists(self, profile_id: int) -> bool:
+        """Перевіряє, чи є в профілю хоча б одне збереження"""
+        conn = self.db_manager.get_connection()
+        cursor = conn.execute("SELECT EXISTS (SELECT 1 FROM saved_games WHERE profile_id = ?)", (profile_id,))
+        return bool(cursor.fetchone()[0])
+
+    def update(self, game: SavedGame, profile_id: Optional[int] = None) -> bool:
+        """Оновлює збережену гру; з profile_id гра іншого профілю не змінюється"""
         if game.id is None:
             return False
 
-        conn = self.db_manager.get_connection()
-        cursor = conn.execute("""
-            UPDATE saved_games 
-            SET difficulty = ?, current_state = ?, solution = ?, elapsed_time = ?, 
-                hints_used = ?, date_saved = ?, updated_at = CURRENT_TIMESTAMP
-            WHERE id = ?
-        """, (
-            game.difficulty.name,
-            game.to_dict()['current_state'],
-            game.to_dict()['solution'],
-            game.elapsed_time,
-            game.hints_used,
-            game.date_saved.isoformat(),
-            game.id
-        ))
-
-        conn.commit()
+        owned, owner = _owned_by(profile_id)
+        with self.db_manager.transaction() as conn:
+            cursor = conn.execute(f"""
+                UPDATE saved_games 
+                SET difficulty = ?, state = ?, elapsed_time = ?, hints_used = ?, filled_cells = ?,
+                    journal_seq = ?, date_saved = ?, updated_at = CURRENT_TIMESTAMP
+                WHERE id = ?{owned}
+            """, (
+                game.difficulty.name,
+                pack_board(game.current_state, game.solution),
+                game.elapsed_time,
+                game.hints_used,
+                game.count_filled_cells(),
+                game.journal_seq,
+                game.date_saved.isoformat(),
+                game.id,
+                *owner
+            ))
         return cursor.rowcount > 0
 
-    def delete(self, game_id: int) -> bool:
-        """Видаляє збережену гру"""
+    def prune(self, keep_per_difficulty: int) -> int:
+        """Залишає кожному профілю лише keep_per_difficulty найновіших збережень кожної складності"""
+        with self.db_manager.transaction() as conn:
+            conn.execute("""
+                CREATE TEMP TABLE IF NOT EXISTS pruned_saved_games (id INTEGER PRIMARY KEY)
+            """)
+            conn.execute("DELETE FROM temp.pruned_saved_games")
+            conn.execute("""
+                INSERT INTO temp.pruned_saved_games (id)
+                SELECT id FROM (
+                    SELECT id, ROW_NUMBER() OVER (
+                        PARTITION BY profile_id, difficulty ORDER BY date_saved DESC, id DESC
+                    ) AS position
+                    FROM saved_games
+                )
+                WHERE position > ?
+            """, (keep_per_difficulty,))
+            conn.execute("""
+                DELETE FROM saved_game_moves WHERE game_id IN (SELECT id FROM temp.pruned_saved_games)
+            """)
+            cursor = conn.execute("""
+                DELETE FROM saved_games WHERE id IN (SELECT id FROM temp.pruned_saved_games)
+            """)
+            return cursor.rowcount
+
+    def append_moves(self, game_id: int, moves: List[Tuple[int, int]]) -> None:
+        """Дописує ходи (номер, упакований хід) до журналу гри"""
+        with self.db_manager.transaction() as conn:
+            conn.executemany("""
+                INSERT OR REPLACE INTO saved_game_moves (game_id, seq, move) VALUES (?, ?, ?)
+            """, [(game_id, seq, move) for seq, move in moves])
+
+    def get_moves(self, game_id: int, after_seq: int = 0) -> List[Tuple[int, int]]:
+        """Отримує ходи журналу з номером більшим за after_seq у порядку їх виконання"""
         conn = self.db_manager.get_connection()
         cursor = conn.execute("""
-            DELETE FROM saved_games WHERE id = ?
-        """, (game_id,))
-
-        conn.commit()
+            SELECT seq, move FROM saved_game_moves
+            WHERE game_id = ? AND seq > ?
+            ORDER BY seq
+        """, (game_id, after_seq))
+
+        return [(row['seq'], row['move']) for row in cursor.fetchall()]
+
+    def compact(self, game: SavedGame, profile_id: Optional[int] = None) -> bool:
+        """
+        Записує новий знімок гри і видаляє ходи журналу, які він уже містить;
+        з profile_id гра іншого профілю не змінюється
+        """
+        with self.db_manager.transaction() as conn:
+            updated = self.update(game, profile_id)
+            if updated:
+                conn.execute("""
+                    DELETE FROM saved_game_moves WHERE game_id = ? AND seq <= ?
+                """, (game.id, game.journal_seq))
+        return updated
+
+    def delete(self, game_id: int, profile_id: Optional[int] = None) -> bool:
+        """Видаляє збережену гру; з profile_id гра іншого профілю не видаляється"""
+        owned, owner = _owned_by(profile_id)
+        with self.db_manager.transaction() as conn:
+            cursor = conn.execute(f"""
+                DELETE FROM saved_games WHERE id = ?{owned}
+            """, (game_id, *owner))
+            if cursor.rowcount > 0:
+                conn.execute("""
+                    DELETE FROM saved_game_moves WHERE game_id = ?
+                """, (game_id,))
         return cursor.rowcount > 0
 
+    def save_many(self, games: List[SavedGame]) -> List[int]:
+        """Зберігає ігри однією транзакцією (нові створює, наявні оновлює) і повертає їхні ID"""
+        new_games = [game for game in games if game.id is None]
+        existing_games = [game for game in games if game.id is not None]
+        new_ids: List[int] = []
+
+        with self.db_manager.transaction() as conn:
+            if new_games:
+                conn.executemany("""
+                    INSERT INTO saved_games (profile_id, difficulty, state, elapsed_time, hints_used,
+                                             filled_cells, journal_seq, date_saved)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """, [(
+                    game.profile_id,
+                    game.difficulty.name,
+                    pack_board(game.current_state, game.solution),
+                    game.elapsed_time,
+                    game.hints_used,
+                    game.count_filled_cells(),
+                    game.journal_seq,
+                    game.date_saved.isoformat()
+                ) for game in new_games])
+                new_ids = _inserted_ids(conn, len(new_games))
+
+            if existing_games:
+                conn.executemany("""
+                    UPDATE saved_games
+                    SET state = ?, elapsed_time = ?, hints_used = ?, filled_cells = ?, journal_seq = ?,
+                        date_saved = ?, updated_at = CURRENT_TIMESTAMP
+                    WHERE id = ?
+                """, [(
+                    pack_board(game.current_state, game.solution),
+                    game.elapsed_time,
+                    game.hints_used,
+                    game.count_filled_cells(),
+                    game.journal_seq,
+                    game.date_saved.isoformat(),
+                    game.id
+                ) for game in existing_games])
+
+        new_ids_iter = iter(new_ids)
+        return [game.id if game.id is not None else next(new_ids_iter) for game in games]
+
+    def get_many(self, game_ids: List[int]) -> List[SavedGame]:
+        """Отримує збережені ігри за списком ID у тому ж порядку (відсутні пропускаються)"""
+        conn = self.db_manager.get_connection()
+        found = {}
+        for chunk in _chunks(list(game_ids)):
+            cursor = conn.execute(f"""
+                SELECT * FROM saved_games WHERE id IN ({_placeholders(len(chunk))})
+            """, chunk)
+            for row in cursor.fetchall():
+                found[row['id']] = SavedGame.from_dict(dict(row))
+
+        return [found[game_id] for game_id in game_ids if game_id in found]
+
+    def delete_many(self, game_ids: List[int], profile_id: Optional[int] = None) -> int:
+        """
+        Видаляє збережені ігри разом з журналами однією транзакцією і повертає кількість видалених;
+        з profile_id ігри інших профілів пропускаються
+        """
+        owned, owner = _owned_by(profile_id)
+        params = [(game_id, *owner) for game_id in game_ids]
+        with self.db_manager.transaction() as conn:
+            # Журнал видаляється лише для ігор, які справді будуть видалені
+            conn.executemany(f"""
+                DELETE FROM saved_game_moves
+                WHERE game_id IN (SELECT id FROM saved_games WHERE id = ?{owned})
+            """, params)
+            cursor = conn.executemany(f"""
+                DELETE FROM saved_games WHERE id = ?{owned}
+            """, params)
+        return max(cursor.rowcount, 0)
+
 
 class SQLiteUserSettingsRepository(IUserSettingsRepository):
     """SQLite реалізація репозиторію для налаштувань користувача"""
@@ -207,56 +564,287 @@ class SQLiteUserSettingsRepository(IUserSettingsRepository):
 
     def save(self, setting: UserSetting) -> int:
         """Зберігає налаштування"""
-        conn = self.db_manager.get_connection()
-        cursor = conn.execute("""
-            INSERT OR REPLACE INTO user_settings (setting_name, setting_value)
-            VALUES (?, ?)
-        """, (setting.setting_name, setting.setting_value))
-
-        conn.commit()
+        with self.db_manager.transaction() as conn:
+            cursor = conn.execute("""
+                INSERT OR REPLACE INTO user_settings (profile_id, setting_name, setting_value)
+                VALUES (?, ?, ?)
+            """, (setting.profile_id, setting.setting_name, setting.setting_value))
         return cursor.lastrowid
 
-    def get_by_name(self, name: str) -> Optional[UserSetting]:
-        """Отримує налаштування за назвою"""
+    def get_by_name(self, profile_id: int, name: str) -> Optional[UserSetting]:
+        """Отримує налаштування профілю за назвою"""
         conn = self.db_manager.get_connection()
         cursor = conn.execute("""
-            SELECT * FROM user_settings WHERE setting_name = ?
-        """, (name,))
+            SELECT * FROM user_settings WHERE profile_id = ? AND setting_name = ?
+        """, (profile_id, name))
 
         row = cursor.fetchone()
         if row:
             return UserSetting.from_dict(dict(row))
         return None
 
-    def get_all(self) -> List[UserSetting]:
-        """Отримує всі налаштування"""
+    def get_all(self, profile_id: int) -> List[UserSetting]:
+        """Отримує всі налаштування профілю"""
         conn = self.db_manager.get_connection()
         cursor = conn.execute("""
-            SELECT * FROM user_settings ORDER BY setting_name
-        """)
+            SELECT * FROM user_settings WHERE profile_id = ? ORDER BY setting_name
+        """, (profile_id,))
 
         return [UserSetting.from_dict(dict(row)) for row in cursor.fetchall()]
 
     def update(self, setting: UserSetting) -> bool:
         """Оновлює налаштування"""
-        conn = self.db_manager.get_connection()
-        cursor = conn.execute("""
-            UPDATE user_settings 
-            SET setting_value = ?, updated_at = CURRENT_TIMESTAMP
-            WHERE setting_name = ?
-        """, (setting.setting_value, setting.setting_name))
+        with self.db_manager.transaction() as conn:
+            cursor = conn.execute("""
+                UPDATE user_settings 
+                SET setting_value = ?, updated_at = CURRENT_TIMESTAMP
+                WHERE profile_id = ? AND setting_name = ?
+            """, (setting.setting_value, setting.profile_id, setting.setting_name))
+        return cursor.rowcount > 0
 
-        conn.commit()
+    def delete(self, profile_id: int, name: str) -> bool:
+        """Видаляє налаштування профілю"""
+        with self.db_manager.transaction() as conn:
+            cursor = conn.execute("""
+                DELETE FROM user_settings WHERE profile_id = ? AND setting_name = ?
+            """, (profile_id, name))
         return cursor.rowcount > 0
 
-    def delete(self, name: str) -> bool:
-        """Видаляє налаштування"""
+    def save_many(self, settings: List[UserSetting]) -> int:
+        """Створює або оновлює налаштування однією транзакцією і повертає їх кількість"""
+        with self.db_manager.transaction() as conn:
+            conn.executemany("""
+                INSERT INTO user_settings (profile_id, setting_name, setting_value)
+                VALUES (?, ?, ?)
+                ON CONFLICT (profile_id, setting_name) DO UPDATE SET
+                    setting_value = excluded.setting_value,
+                    updated_at = CURRENT_TIMESTAMP
+            """, [(setting.profile_id, setting.setting_name, setting.setting_value) for setting in settings])
+        return len(settings)
+
+    def get_many(self, profile_id: int, names: List[str]) -> List[UserSetting]:
+        """Отримує налаштування профілю за списком назв (відсутні пропускаються)"""
+        conn = self.db_manager.get_connection()
+        found = {}
+        for chunk in _chunks(list(names)):
+            cursor = conn.execute(f"""
+                SELECT * FROM user_settings
+                WHERE profile_id = ? AND setting_name IN ({_placeholders(len(chunk))})
+            """, [profile_id, *chunk])
+            for row in cursor.fetchall():
+                found[row['setting_name']] = UserSetting.from_dict(dict(row))
+
+        return [found[name] for name in names if name in found]
+
+    def delete_many(self, profile_id: int, names: List[str]) -> int:
+        """Видаляє налаштування профілю однією транзакцією і повертає кількість видалених"""
+        with self.db_manager.transaction() as conn:
+            cursor = conn.executemany("""
+                DELETE FROM user_settings WHERE profile_id = ? AND setting_name = ?
+            """, [(profile_id, name) for name in names])
+        return max(cursor.rowcount, 0)
+
+
+class SQLiteProfileRepository(IProfileRepository):
+    """SQLite реалізація репозиторію для профілів гравців"""
+
+    def __init__(self, db_manager: DatabaseManager):
+        self.db_manager = db_manager
+
+    def save(self, profile: Profile) -> int:
+        """Створює профіль і повертає ID"""
+        with self.db_manager.transaction() as conn:
+            cursor = conn.execute("""
+                INSERT INTO profiles (name, date_created, last_active) VALUES (?, ?, ?)
+            """, (
+                profile.name,
+                profile.date_created.isoformat(),
+                profile.last_active.isoformat() if profile.last_active else None
+            ))
+        return cursor.lastrowid
+
+    def get_by_id(self, profile_id: int) -> Optional[Profile]:
+        """Отримує профіль за ID"""
+        conn = self.db_manager.get_connection()
+        row = conn.execute("SELECT * FROM profiles WHERE id = ?", (profile_id,)).fetchone()
+        return Profile.from_dict(dict(row)) if row else None
+
+    def get_by_name(self, name: str) -> Optional[Profile]:
+        """Отримує профіль за ім'ям (без урахування регістру)"""
+        conn = self.db_manager.get_connection()
+        row = conn.execute("SELECT * FROM profiles WHERE name = ?", (name,)).fetchone()
+        return Profile.from_dict(dict(row)) if row else None
+
+    def get_all(self, limit: Optional[int] = None) -> List[Profile]:
+        """Отримує профілі, починаючи з тих, що грали нещодавно"""
         conn = self.db_manager.get_connection()
         cursor = conn.execute("""
-            DELETE FROM user_settings WHERE setting_name = ?
-        """, (name,))
+            SELECT * FROM profiles
+            ORDER BY last_active DESC NULLS LAST, id ASC
+            LIMIT ?
+        """, (-1 if limit is None else limit,))
+
+        return [Profile.from_dict(dict(row)) for row in cursor.fetchall()]
+
+    def rename(self, profile_id: int, name: str) -> bool:
+        """Змінює ім'я профілю"""
+        with self.db_manager.transaction() as conn:
+            cursor = conn.execute("UPDATE profiles SET name = ? WHERE id = ?", (name, profile_id))
+        return cursor.rowcount > 0
 
-        conn.commit()
+    def touch(self, profile_id: int, when: datetime) -> bool:
+        """Запам'ятовує час останньої активності профілю"""
+        with self.db_manager.transaction() as conn:
+            cursor = conn.execute("""
+                UPDATE profiles SET last_active = ? WHERE id = ?
+            """, (when.isoformat(), profile_id))
         return cursor.rowcount > 0
 
+    def delete(self, profile_id: int) -> bool:
+        """Видаляє профіль разом з усіма його рекордами, збереженнями та налаштуваннями"""
+        with self.db_manager.transaction() as conn:
+            conn.execute("""
+                DELETE FROM saved_game_moves
+                WHERE game_id IN (SELECT id FROM saved_games WHERE profile_id = ?)
+            """, (profile_id,))
+            for table in ('saved_games', 'user_settings', 'game_records_archive', 'puzzle_plays'):
+                conn.execute(f"DELETE FROM {table} WHERE profile_id = ?", (profile_id,))
+            # Статистику видаляємо першою, щоб тригери видалення рекордів не оновлювали її для
+            # кожного рядка; спільні лічильники часу зменшують самі тригери
+            conn.execute("DELETE FROM player_stats WHERE profile_id = ?", (profile_id,))
+            conn.execute("DELETE FROM game_records WHERE profile_id = ?", (profile_id,))
+            cursor = conn.execute("DELETE FROM profiles WHERE id = ?", (profile_id,))
+            return cursor.rowcount > 0
+
+
+class SQLitePuzzleRepository(IPuzzleRepository):
+    """SQLite реалізація репозиторію для архіву головоломок"""
+
+    # Головоломка з наявним відбитком пропускається
+    _INSERT_SQL = """
+        INSERT OR IGNORE INTO puzzles (difficulty, givens, solution, canonical_hash, rating, generator_version,
+                                       date_created)
+        VALUES (:difficulty, :givens, :solution, :canonical_hash, :rating, :generator_version, :date_created)
+    """
+
+    def __init__(self, db_manager: DatabaseManager):
+        self.db_manager = db_manager
+
+    def save(self, puzzle: ArchivedPuzzle) -> Optional[int]:
+        """Додає головоломку і повертає ID (None, якщо головоломка з таким відбитком вже є)"""
+        with self.db_manager.transaction() as conn:
+            cursor = conn.execute(self._INSERT_SQL, puzzle.to_dict())
+        return cursor.lastrowid if cursor.rowcount else None
+
+    def save_many(self, puzzles: List[ArchivedPuzzle]) -> int:
+        """Додає головоломки однією транзакцією, пропускаючи наявні, і повертає кількість доданих"""
+        if not puzzles:
+            return 0
+        with self.db_manager.transaction() as conn:
+            cursor = conn.executemany(self._INSERT_SQL, [puzzle.to_dict() for puzzle in puzzles])
+        return cursor.rowcount
+
+    def get_by_id(self, puzzle_id: int) -> Optional[ArchivedPuzzle]:
+        """Отримує головоломку за ID"""
+        conn = self.db_manager.get_connection()
+        row = conn.execute("SELECT * FROM puzzles WHERE id = ?", (puzzle_id,)).fetchone()
+        return ArchivedPuzzle.from_dict(dict(row)) if row else None
 
+    def get_by_hash(self, canonical_hash: str) -> Optional[ArchivedPuzzle]:
+        """Отримує головоломку за канонічним відбитком"""
+        conn = self.db_manager.get_connection()
+        row = conn.execute("SELECT * FROM puzzles WHERE canonical_hash = ?", (canonical_hash,)).fetchone()
+        return ArchivedPuzzle.from_dict(dict(row)) if row else None
+
+    def get_rating_range(self, difficulty: Difficulty) -> Optional[Tuple[int, int]]:
+        """Повертає найменший і найбільший рейтинг головоломок складності (None, якщо їх немає)"""
+        conn = self.db_manager.get_connection()
+        # Окремі підзапити, щоб кожен MIN/MAX був одним кроком по idx_puzzles_difficulty_rating
+        row = conn.execute("""
+            SELECT (SELECT MIN(rating) FROM puzzles WHERE difficulty = :difficulty),
+                   (SELECT MAX(rating) FROM puzzles WHERE difficulty = :difficulty)
+        """, {'difficulty': difficulty.name}).fetchone()
+        return (row[0], row[1]) if row[0] is not None else None
+
+    def pick_unplayed(self, profile_id: int, difficulty: Difficulty, pivot: int) -> Optional[ArchivedPuzzle]:
+        """
+        Повертає незіграну профілем головоломку складності з найменшим випадковим ключем, не меншим
+        за pivot (якщо таких немає - з найменшим ключем загалом); None, якщо незіграних немає
+        """
+        conn = self.db_manager.get_connection()
+        params = {'profile_id': profile_id, 'difficulty': difficulty.name, 'pivot': pivot}
+        # Пошук у idx_puzzles_difficulty_pick від pivot, перевірка зіграних - за первинним ключем
+        # puzzle_plays; друга спроба обходить ключі до pivot, коли після нього незіграних немає
+        for key_range in ("p.pick_key >= :pivot", "p.pick_key < :pivot"):
+            row = conn.execute(f"""
+                SELECT p.* FROM puzzles p
+                WHERE p.difficulty = :difficulty AND {key_range}
+                  AND NOT EXISTS (SELECT 1 FROM puzzle_plays pp
+                                  WHERE pp.profile_id = :profile_id AND pp.puzzle_id = p.id)
+                ORDER BY p.pick_key
+                LIMIT 1
+            """, params).fetchone()
+            if row:
+                return ArchivedPuzzle.from_dict(dict(row))
+        return None
+
+    def count(self, difficulty: Optional[Difficulty] = None) -> int:
+        """Кількість головоломок архіву (усіх або однієї складності)"""
+        conn = self.db_manager.get_connection()
+        if difficulty is None:
+            return conn.execute("SELECT COUNT(*) FROM puzzles").fetchone()[0]
+        return conn.execute("SELECT COUNT(*) FROM puzzles WHERE difficulty = ?", (difficulty.name,)).fetchone()[0]
+
+    def count_unplayed(self, profile_id: int, difficulty: Difficulty) -> int:
+        """Кількість головоломок складності, яких профіль ще не отримував"""
+        conn = self.db_manager.get_connection()
+        return conn.execute("""
+            SELECT (SELECT COUNT(*) FROM puzzles WHERE difficulty = :difficulty)
+                 - (SELECT COUNT(*) FROM puzzle_plays pp JOIN puzzles p ON p.id = pp.puzzle_id
+                    WHERE pp.profile_id = :profile_id AND p.difficulty = :difficulty)
+        """, {'profile_id': profile_id, 'difficulty': difficulty.name}).fetchone()[0]
+
+    def mark_played(self, profile_id: int, puzzle_id: int, when: datetime) -> None:
+        """Запам'ятовує, що профіль отримав головоломку, і дає їй новий випадковий ключ вибору"""
+        with self.db_manager.transaction() as conn:
+            cursor = conn.execute("""
+                INSERT OR IGNORE INTO puzzle_plays (profile_id, puzzle_id, date_played) VALUES (?, ?, ?)
+            """, (profile_id, puzzle_id, when.isoformat()))
+            if cursor.rowcount > 0:
+                # Головоломка після великого проміжку між ключами вибирається частіше; новий ключ
+                # переносить її в інше місце, тож ця перевага не закріплюється
+                conn.execute("""
+                    UPDATE puzzles SET pick_key = random() & 2147483647 WHERE id = ?
+                """, (puzzle_id,))
+
+    def record_result(self, profile_id: int, puzzle_id: int, completion_time: int, hints_used: int,
+                      when: datetime) -> bool:
+        """Записує результат профілю на головоломці, якщо він кращий за попередній"""
+        with self.db_manager.transaction() as conn:
+            cursor = conn.execute("""
+                INSERT INTO puzzle_plays (profile_id, puzzle_id, date_played, completion_time, hints_used,
+                                          date_completed)
+                VALUES (:profile_id, :puzzle_id, :when, :completion_time, :hints_used, :when)
+                ON CONFLICT (profile_id, puzzle_id) DO UPDATE SET
+                    completion_time = excluded.completion_time,
+                    hints_used = excluded.hints_used,
+                    date_completed = excluded.date_completed
+                WHERE puzzle_plays.completion_time IS NULL
+                   OR (excluded.completion_time, excluded.hints_used)
+                      < (puzzle_plays.completion_time, puzzle_plays.hints_used)
+            """, {'profile_id': profile_id, 'puzzle_id': puzzle_id, 'when': when.isoformat(),
+                  'completion_time': completion_time, 'hints_used': hints_used})
+        return cursor.rowcount > 0
+
+    def get_results(self, puzzle_id: int, limit: int = 10) -> List[PuzzleResult]:
+        """Найкращі результати різних профілів на головоломці (completion_time ASC, hints_used ASC)"""
+        conn = self.db_manager.get_connection()
+        cursor = conn.execute("""
+            SELECT pp.profile_id, pr.name AS profile_name, pp.completion_time, pp.hints_used, pp.date_completed
+            FROM puzzle_plays pp
+            JOIN profiles pr ON pr.id = pp.profile_id
+            WHERE pp.puzzle_id = ? AND pp.completion_time IS NOT NULL
+            ORDER BY pp.completion_time, pp.hints_used, pp.profile_id
+            LIMIT ?
+        """, (puzzle_id, limit))
+        return [PuzzleResult.from_dict(dict(row)) for row in cursor.fetchall()]
@@ -0,0 +1,94 @@
+"""
+Одиниця роботи: кілька записів різних репозиторіїв з одним комітом
+"""
+from typing import Any, Callable, Optional, Tuple
+
+from .database_manager import DatabaseManager
+from .leaderboard_cache import LeaderboardCache
+from .query_stats import QueryMetrics, instrument
+from .sqlite_repositories import (
+    SQLiteGameRecordRepository,
+    SQLiteProfileRepository,
+    SQLitePuzzleRepository,
+    SQLiteSavedGameRepository,
+    SQLiteUserSettingsRepository
+)
+
+
+# Методи, що змінюють рекорди, і отже таблицю лідерів та персональну статистику
+_RECORD_WRITES = ('save', 'save_many', 'delete', 'delete_many', 'archive_before')
+
+
+class _CacheInvalidatingRepository:
+    """Проксі репозиторію: після коміту одиниці роботи, що змінила дані, скидає кеш таблиці лідерів"""
+
+    def __init__(self, repository: Any, writes: Tuple[str, ...], uow: 'UnitOfWork'):
+        self._repository = repository
+        self._writes = writes
+        self._uow = uow
+
+    def __getattr__(self, attr: str) -> Any:
+        value = getattr(self._repository, attr)
+        if attr not in self._writes:
+            return value
+
+        def wrapper(*args, **kwargs):
+            result = value(*args, **kwargs)
+            self._uow.invalidate_leaderboard()
+            return result
+        return wrapper
+
+
+class UnitOfWork:
+    """
+    Групує записи репозиторіїв в одну транзакцію поверх DatabaseManager.transaction():
+
+        with UnitOfWork(db_manager, leaderboard_cache, query_metrics) as uow:
+            uow.saved_games.delete_many(game_ids)
+            uow.user_settings.save_many(settings)
+
+    Коміт виконується один раз при виході з блоку, виняток відкочує всі записи. Одиниця роботи
+    всередині іншої (або всередині transaction()) стає її частиною. Записи рекордів і видалення
+    профілів після коміту скидають переданий кеш таблиці лідерів, а виклики репозиторіїв
+    заміряються в query_metrics, як і виклики сервісів гри.
+    """
+
+    def __init__(self, db_manager: DatabaseManager, leaderboard_cache: Optional[LeaderboardCache] = None,
+                 query_metrics: Optional[QueryMetrics] = None):
+        self.db_manager = db_manager
+        self.leaderboard_cache = leaderboard_cache
+        self.game_records = self._track(instrument(SQLiteGameRecordRepository(db_manager), query_metrics),
+                                        _RECORD_WRITES)
+        self.saved_games = instrument(SQLiteSavedGameRepository(db_manager), query_metrics)
+        self.user_settings = instrument(SQLiteUserSettingsRepository(db_manager), query_metrics)
+        self.profiles = self._track(instrument(SQLiteProfileRepository(db_manager), query_metrics), ('delete',))
+        self.puzzles = instrument(SQLitePuzzleRepository(db_manager), query_metrics)
+        self._transaction = None
+        self._invalidate_scheduled = False
+
+    def _track(self, repository: Any, writes: Tuple[str, ...]) -> Any:
+        """Обгортає репозиторій скиданням кешу після записів (без кешу повертає його без змін)"""
+        if self.leaderboard_cache is None:
+            return repository
+        return _CacheInvalidatingRepository(repository, writes, self)
+
+    def invalidate_leaderboard(self):
+        """Скидає кеш таблиці лідерів після коміту (один раз на одиницю роботи)"""
+        if self.leaderboard_cache is None or self._invalidate_scheduled:
+            return
+        self._invalidate_scheduled = True
+        self.db_manager.call_after_commit(self.leaderboard_cache.clear)
+
+    def after_commit(self, callback: Callable[[], None]):
+        """Викликає callback після коміту одиниці роботи (після відкату - не викликає)"""
+        self.db_manager.call_after_commit(callback)
+
+    def __enter__(self) -> 'UnitOfWork':
+        self._transaction = self.db_manager.transaction()
+        self._transaction.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        transaction, self._transaction = self._transaction, None
+        self._invalidate_scheduled = False
+        return transaction.__exit__(exc_type, exc_val, exc_tb)
@@ -0,0 +1,193 @@
+"""
+Фонова черга запису в базу даних (write-behind)
+"""
+from concurrent.futures import Future
+from typing import Any, Callable, List, Optional, Tuple
+import logging
+import queue
+import threading
+import time
+
+from .database_manager import DatabaseManager
+from .leaderboard_cache import LeaderboardCache
+from .query_stats import QueryMetrics, instrument
+from .services import GameRecordService, PuzzleArchiveService, SavedGameService, UserSettingsService
+from .sqlite_repositories import (
+    SQLiteGameRecordRepository,
+    SQLitePuzzleRepository,
+    SQLiteSavedGameRepository,
+    SQLiteUserSettingsRepository
+)
+
+
+class WriterContext:
+    """Сервіси, що працюють через власне з'єднання потоку запису"""
+
+    def __init__(self, db_manager: DatabaseManager, leaderboard_cache: Optional[LeaderboardCache] = None,
+                 query_metrics: Optional[QueryMetrics] = None):
+        self.db_manager = db_manager
+        self.game_record_service = GameRecordService(
+            instrument(SQLiteGameRecordRepository(db_manager), query_metrics), leaderboard_cache
+        )
+        self.saved_game_service = SavedGameService(instrument(SQLiteSavedGameRepository(db_manager), query_metrics))
+        self.user_settings_service = UserSettingsService(
+            instrument(SQLiteUserSettingsRepository(db_manager), query_metrics)
+        )
+        self.puzzle_service = PuzzleArchiveService(instrument(SQLitePuzzleRepository(db_manager), query_metrics))
+
+    def set_profile(self, profile_id: int):
+        """Перемикає сервіси на профіль; операції виконуються по черзі, тож це діє на всі наступні"""
+        self.game_record_service.set_profile(profile_id)
+        self.saved_game_service.set_profile(profile_id)
+        self.user_settings_service.set_profile(profile_id)
+        self.puzzle_service.set_profile(profile_id)
+
+
+Operation = Callable[[WriterContext], Any]
+
+_STOP = object()
+
+
+class WriteBehindQueue:
+    """Клас для асинхронного запису: обмежена черга, один потік, пакетні транзакції"""
+
+    def __init__(self, db_manager: DatabaseManager, max_queue_size: int = 256, batch_size: int = 64,
+                 leaderboard_cache: Optional[LeaderboardCache] = None,
+                 query_metrics: Optional[QueryMetrics] = None):
+        # Потік запису отримує від менеджера власне з'єднання; читання інших потоків
+        # ідуть через їхні з'єднання паралельно з записом
+        self.db_manager = db_manager
+        # Кеш таблиці лідерів, спільний із сервісами головного потоку
+        self.leaderboard_cache = leaderboard_cache
+        # Заміри викликів репозиторіїв і тривалості пакетних транзакцій (None - без замірів)
+        self.query_metrics = query_metrics
+        self.batch_size = batch_size
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue_size)
+        self._closed = False
+        # Потік запису завершився (після close або через помилку) і більше не забирає операції
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name='db-writer', daemon=True)
+        self._thread.start()
+
+    def submit(self, operation: Operation, block: bool = True) -> Future:
+        """
+        Ставить операцію в чергу; Future містить її результат (наприклад, ID запису).
+        block=False кидає queue.Full замість очікування - для постановки з самого потоку запису.
+        """
+        if self._closed:
+            raise RuntimeError("Write-behind queue is closed")
+        self._check_alive()
+        future: Future = Future()
+        self._queue.put((future, operation), block)
+        if self._stopped:
+            # Потік зупинився, поки операція ставилась у чергу: її вже ніхто не виконає
+            self._fail_pending()
+        return future
+
+    def flush(self) -> None:
+        """Чекає, поки всі поставлені в чергу операції будуть записані"""
+        self._check_alive()
+        self._queue.join()
+
+    def _check_alive(self):
+        """Кидає RuntimeError, якщо потік запису вже не працює"""
+        if self._stopped or not self._thread.is_alive():
+            raise RuntimeError("Write-behind thread is not running")
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Записує все, що лишилось у черзі, і зупиняє потік"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def _run(self):
+        """Головний цикл потоку запису"""
+        items = []
+        try:
+            # З'єднання створюється в цьому потоці і належить лише йому
+            context = WriterContext(self.db_manager, self.leaderboard_cache, self.query_metrics)
+            stop = False
+            while not stop:
+                items = [self._queue.get()]
+                # Забираємо все, що накопичилось, щоб записати однією транзакцією
+                while len(items) < self.batch_size:
+                    try:
+                        items.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+
+                stop = any(item is _STOP for item in items)
+                batch = [item for item in items if item is not _STOP]
+                if batch:
+                    self._execute_batch(context, batch)
+                for _ in items:
+                    self._queue.task_done()
+                items = []
+        except Exception as e:
+            logging.error(f"Write-behind thread failed: {e}")
+        finally:
+            # Операції, які вже не буде виконано, завершуються помилкою, щоб flush() і Future не чекали вічно
+            self._stopped = True
+            self._fail_items(items)
+            self._fail_pending()
+            self.db_manager.disconnect()
+
+    def _fail_pending(self):
+        """Забирає з черги всі операції і завершує їхні Future помилкою"""
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            self._fail_items([item])
+
+    def _fail_items(self, items: List[Any]):
+        """Завершує помилкою Future взятих з черги операцій і позначає їх обробленими"""
+        for item in items:
+            if item is not _STOP:
+                future, _ = item
+                if not future.done():
+                    future.set_exception(RuntimeError("Write-behind thread stopped"))
+            self._queue.task_done()
+
+    def _execute_batch(self, context: WriterContext, batch: List[Tuple[Future, Operation]]):
+        """
+        Виконує пакет операцій в одній транзакції та заповнює Future. Кожна операція - окрема точка
+        збереження: зміни операції, що завершилась винятком, відкочуються, а решта пакета фіксується.
+        """
+        results = []
+        start = time.perf_counter()
+        try:
+            with context.db_manager.transaction():
+                for future, operation in batch:
+                    if not future.set_running_or_notify_cancel():
+                        continue
+                    try:
+                        with context.db_manager.savepoint():
+                            result = operation(context)
+                        results.append((future, result, None))
+                    except Exception as e:
+                        results.append((future, None, e))
+        except Exception as e:
+            self._record_batch(start, len(batch), failed=True)
+            logging.error(f"Write-behind batch failed: {e}")
+            for future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        self._record_batch(start, len(batch))
+        for future, result, error in results:
+            if error is not None:
+                logging.error(f"Write-behind operation failed: {error}")
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+    def _record_batch(self, start: float, operations: int, failed: bool = False):
+        """Записує тривалість пакета разом з комітом; рядками вважаються операції пакета"""
+        if self.query_metrics is not None:
+            self.query_metrics.record('WriteBehindQueue.batch', (time.perf_counter() - start) * 1000,
+                                      operations, failed)
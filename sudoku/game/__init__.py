@@ -1,12 +1,33 @@
 """
 Пакет для основних компонентів гри
 """
-from .game import Game
-from .states.game_over_state import GameOverState
-from .states.i_game_state import IGameState
-from .states.paused_state import PausedState
-from .states.playing_state import PlayingState
+from importlib import import_module
 
-from .timer import GameTimer
+# Атрибути пакета та модулі, з яких вони імпортуються при першому зверненні
+_LAZY_ATTRIBUTES = {
+    'Game': '.game',
+    'IGameState': '.states.i_game_state',
+    'PlayingState': '.states.playing_state',
+    'GameOverState': '.states.game_over_state',
+    'PausedState': '.states.paused_state',
+    'LoadingState': '.states.loading_state',
+    'GameTimer': '.timer',
+    'PuzzleLoader': '.puzzle_loader',
+    'AutosaveJournal': '.autosave',
+}
 
-__all__ = ['Game', 'IGameState', 'PlayingState', 'GameOverState', 'PausedState', 'GameTimer']
\ No newline at end of file
+__all__ = list(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name):
+    """Імпортує компоненти гри (і pygame) лише при першому зверненні"""
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,122 @@
+"""
+Модуль автозбереження гри через журнал ходів
+"""
+from concurrent.futures import Future
+from copy import deepcopy
+from typing import Optional, TYPE_CHECKING
+
+from ..config import AUTOSAVE_COMPACT_INTERVAL
+from ..database.save_format import pack_move
+from ..models import Difficulty, Move
+
+if TYPE_CHECKING:
+    from ..core import SudokuBoard
+    from .database_integration import GameDatabaseManager
+
+
+class _JournalSession:
+    """Журнал однієї гри"""
+    def __init__(self, game_id: Optional[int] = None, seq: int = 0):
+        # ID збереження стає відомим лише в потоці запису, після вставки першого знімка
+        self.game_id = game_id
+        self.seq = seq
+        self.snapshot_seq = seq
+
+
+class AutosaveJournal:
+    """Зберігає кожен хід окремим маленьким записом і періодично згортає журнал у знімок дошки"""
+
+    def __init__(self, db_manager: 'GameDatabaseManager', compact_interval: int = AUTOSAVE_COMPACT_INTERVAL):
+        self.db_manager = db_manager
+        self.compact_interval = compact_interval
+        self._session: Optional[_JournalSession] = None
+
+    @property
+    def active(self) -> bool:
+        """Чи ведеться журнал поточної гри"""
+        return self._session is not None
+
+    @property
+    def game_id(self) -> Optional[int]:
+        """ID збереження поточної гри (None, поки знімок не записано)"""
+        return self._session.game_id if self._session else None
+
+    @property
+    def needs_compaction(self) -> bool:
+        """Чи накопичилось достатньо ходів для нового знімка"""
+        session = self._session
+        return session is not None and session.seq - session.snapshot_seq >= self.compact_interval
+
+    def begin(self, difficulty: Difficulty, board: 'SudokuBoard', elapsed_time: int) -> Future:
+        """Починає журнал нової гри із запису початкового знімка"""
+        session = _JournalSession()
+        self._session = session
+        grid = deepcopy(board.grid)
+        solution = deepcopy(board.solution)
+        hints_used = board.hints_used
+
+        def create(services):
+            session.game_id = services.saved_game_service.save_game(
+                difficulty, grid, solution, elapsed_time, hints_used
+            )
+            return session.game_id
+
+        return self.db_manager.submit(create)
+
+    def resume(self, game_id: int, journal_seq: int) -> None:
+        """Продовжує журнал завантаженої гри"""
+        self._session = _JournalSession(game_id, journal_seq)
+
+    def record(self, move: Move, elapsed_time: int) -> Optional[Future]:
+        """Дописує хід до журналу"""
+        session = self._session
+        if session is None:
+            return None
+
+        session.seq += 1
+        entry = (session.seq, pack_move(move, elapsed_time))
+
+        def append(services):
+            if session.game_id is not None:
+                services.saved_game_service.append_moves(session.game_id, [entry])
+
+        return self.db_manager.submit(append)
+
+    def compact(self, difficulty: Difficulty, board: 'SudokuBoard', elapsed_time: int) -> Optional[Future]:
+        """Записує знімок дошки замість накопичених ходів"""
+        session = self._session
+        if session is None:
+            return None
+
+        journal_seq = session.seq
+        session.snapshot_seq = journal_seq
+        grid = deepcopy(board.grid)
+        solution = deepcopy(board.solution)
+        hints_used = board.hints_used
+
+        def compact(services):
+            if session.game_id is None:
+                return False
+            return services.saved_game_service.compact_game(
+                session.game_id, difficulty, grid, solution, elapsed_time, hints_used, journal_seq
+            )
+
+        return self.db_manager.submit(compact)
+
+    def discard(self) -> Optional[Future]:
+        """Видаляє автозбереження завершеної гри"""
+        session = self._session
+        self._session = None
+        if session is None:
+            return None
+
+        def delete(services):
+            if session.game_id is None:
+                return False
+            return services.saved_game_service.delete_save(session.game_id)
+
+        return self.db_manager.submit(delete)
+
+    def detach(self) -> None:
+        """Припиняє журнал, залишаючи збереження в базі"""
+        self._session = None
@@ -1,19 +1,46 @@
 """
 Модуль для інтеграції бази даних з грою
 """
-from typing import Optional, List, Dict, Any
+from concurrent.futures import Future
+from copy import deepcopy
+from pathlib import Path
+from typing import Callable, Optional, List, Dict, Any
 import logging
+import queue
 
 from ..database import (
     DatabaseManager,
+    LeaderboardCursor,
     GameRecordService,
+    ProfileService,
     SavedGameService,
     UserSettingsService,
+    PuzzleArchiveService,
     SQLiteGameRecordRepository,
+    SQLiteProfileRepository,
+    SQLitePuzzleRepository,
     SQLiteSavedGameRepository,
-    SQLiteUserSettingsRepository
+    SQLiteUserSettingsRepository,
+    DEFAULT_PROFILE_ID,
+    ArchivedPuzzle,
+    Profile,
+    PuzzleResult,
+    TimeRank,
+    UnitOfWork,
+    WriteBehindQueue,
+    BackupManager,
+    StorageMaintenance,
+    LeaderboardCache,
+    QueryMetrics,
+    instrument
+)
+from ..config import (
+    BACKUP_ENABLED, BACKUP_INTERVAL_MINUTES, BACKUP_KEEP, BACKUP_COMPRESS,
+    MAINTENANCE_ENABLED, SAVES_KEEP_PER_DIFFICULTY, RECORDS_ARCHIVE_AFTER_DAYS, MAINTENANCE_VACUUM_PAGES,
+    LEADERBOARD_CACHE_SIZE, QUERY_STATS_ENABLED, SLOW_QUERY_THRESHOLD_MS, QUERY_STATS_FILE
 )
 from ..models import Difficulty, Cell
+from ..utils.profiler import profiled
 
 
 class GameDatabaseManager:
@@ -26,15 +53,48 @@ class GameDatabaseManager:
         try:
             self.db_manager.initialize_database()
 
+            # Заміри викликів репозиторіїв і журнал повільних запитів
+            self.query_metrics: Optional[QueryMetrics] = None
+            if QUERY_STATS_ENABLED:
+                self.query_metrics = QueryMetrics(SLOW_QUERY_THRESHOLD_MS)
+                self.query_metrics.attach(self.db_manager)
+
             # Створюємо репозиторії
-            self.game_record_repo = SQLiteGameRecordRepository(self.db_manager)
-            self.saved_game_repo = SQLiteSavedGameRepository(self.db_manager)
-            self.user_settings_repo = SQLiteUserSettingsRepository(self.db_manager)
+            self.game_record_repo = instrument(SQLiteGameRecordRepository(self.db_manager), self.query_metrics)
+            self.saved_game_repo = instrument(SQLiteSavedGameRepository(self.db_manager), self.query_metrics)
+            self.user_settings_repo = instrument(SQLiteUserSettingsRepository(self.db_manager), self.query_metrics)
+            self.profile_repo = SQLiteProfileRepository(self.db_manager)
+            self.puzzle_repo = instrument(SQLitePuzzleRepository(self.db_manager), self.query_metrics)
 
             # Створюємо сервіси
-            self.game_record_service = GameRecordService(self.game_record_repo)
+            # Кеш таблиці лідерів спільний для головного потоку і потоку запису
+            self.leaderboard_cache = LeaderboardCache(LEADERBOARD_CACHE_SIZE)
+            self.game_record_service = GameRecordService(self.game_record_repo, self.leaderboard_cache)
             self.saved_game_service = SavedGameService(self.saved_game_repo)
             self.user_settings_service = UserSettingsService(self.user_settings_repo)
+            self.profile_service = ProfileService(self.profile_repo)
+            self.puzzle_service = PuzzleArchiveService(self.puzzle_repo)
+
+            # Фоновий потік запису; база в пам'яті спільна для з'єднань усіх потоків
+            self.writer: Optional[WriteBehindQueue] = WriteBehindQueue(
+                self.db_manager, leaderboard_cache=self.leaderboard_cache, query_metrics=self.query_metrics
+            )
+
+            # Продовжуємо з профілем, який грав останнім
+            self.active_profile_id = DEFAULT_PROFILE_ID
+            last_profile = self.profile_service.get_last_active_profile()
+            self._apply_profile(last_profile.id if last_profile else DEFAULT_PROFILE_ID)
+
+            # Періодичні резервні копії у фоновому потоці
+            self.backups: Optional[BackupManager] = None
+            if BACKUP_ENABLED and self.db_manager.db_path != ':memory:':
+                self.backups = BackupManager(self.db_manager.db_path, keep=BACKUP_KEEP, compress=BACKUP_COMPRESS)
+                self.backups.schedule(BACKUP_INTERVAL_MINUTES * 60)
+
+            # Політики зберігання і повернення вільних сторінок виконуються в потоці запису
+            self._closing = False
+            if MAINTENANCE_ENABLED:
+                self._start_maintenance()
 
             logging.info("Database successfully initialized")
 
@@ -42,6 +102,77 @@ class GameDatabaseManager:
             logging.error(f"Failed to initialize database: {e}")
             raise
 
+    def _apply_profile(self, profile_id: int):
+        """Перемикає сервіси головного потоку і потоку запису на профіль"""
+        self.active_profile_id = profile_id
+        self.game_record_service.set_profile(profile_id)
+        self.saved_game_service.set_profile(profile_id)
+        self.user_settings_service.set_profile(profile_id)
+        self.puzzle_service.set_profile(profile_id)
+        # Завантажуємо всі налаштування профілю одним запитом; далі читання йдуть з пам'яті
+        self.user_settings_service.refresh()
+        if self.writer is not None:
+            # Черга виконується по порядку: записи, поставлені раніше, підуть у попередній профіль
+            self.writer.submit(lambda services: services.set_profile(profile_id))
+
+    def get_active_profile(self) -> Optional[Profile]:
+        """Отримує активний профіль"""
+        try:
+            return self.profile_service.get_profile(self.active_profile_id)
+        except Exception as e:
+            logging.error(f"Failed to get active profile: {e}")
+            return None
+
+    def get_profiles(self, limit: Optional[int] = None) -> List[Profile]:
+        """Отримує профілі, починаючи з тих, що грали нещодавно"""
+        try:
+            return self.profile_service.get_profiles(limit)
+        except Exception as e:
+            logging.error(f"Failed to get profiles: {e}")
+            return []
+
+    def create_profile(self, name: str) -> Optional[Profile]:
+        """Створює профіль; повертає None, якщо ім'я некоректне або вже зайняте"""
+        try:
+            profile = self.profile_service.create_profile(name)
+            logging.info(f"Profile created with ID: {profile.id}")
+            return profile
+        except Exception as e:
+            logging.error(f"Failed to create profile: {e}")
+            return None
+
+    def switch_profile(self, profile_id: int) -> bool:
+        """Робить профіль активним"""
+        try:
+            if self.profile_service.get_profile(profile_id) is None:
+                logging.error(f"Profile {profile_id} does not exist")
+                return False
+            self.profile_service.touch_profile(profile_id)
+            self._apply_profile(profile_id)
+            logging.info(f"Switched to profile {profile_id}")
+            return True
+        except Exception as e:
+            logging.error(f"Failed to switch profile: {e}")
+            return False
+
+    def delete_profile(self, profile_id: int) -> bool:
+        """
+        Видаляє профіль з усіма даними; активний профіль спершу змінюється на профіль за замовчуванням.
+        Гра видаляє профіль через Game.delete_profile, що спершу зупиняє автозбереження.
+        """
+        try:
+            if profile_id == self.active_profile_id:
+                self._apply_profile(DEFAULT_PROFILE_ID)
+            # Відкладені записи профілю мають потрапити в базу до видалення, а не після нього
+            self.flush()
+            deleted = self.profile_service.delete_profile(profile_id)
+            self.leaderboard_cache.discard_profile(profile_id)
+            return deleted
+        except Exception as e:
+            logging.error(f"Failed to delete profile: {e}")
+            return False
+
+    @profiled("db.save_game_record")
     def save_game_record(self, difficulty: Difficulty, completion_time: int, hints_used: int) -> bool:
         """Зберігає результат завершеної гри"""
         try:
@@ -54,6 +185,140 @@ class GameDatabaseManager:
             logging.error(f"Failed to save game record: {e}")
             return False
 
+    def submit(self, operation: Callable[[Any], Any]) -> Future:
+        """Виконує операцію в потоці запису або, якщо його немає, одразу"""
+        if self.writer is not None:
+            return self.writer.submit(operation)
+
+        future: Future = Future()
+        try:
+            future.set_result(operation(self))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    @profiled("db.save_game_record_async")
+    def save_game_record_async(self, difficulty: Difficulty, completion_time: int, hints_used: int) -> Future:
+        """Ставить збереження результату в чергу; Future повертає ID запису"""
+        return self.submit(
+            lambda services: services.game_record_service.save_game_record(difficulty, completion_time, hints_used)
+        )
+
+    @profiled("db.save_current_game_async")
+    def save_current_game_async(self, difficulty: Difficulty, grid: List[List[Cell]],
+                                solution: List[List[int]], elapsed_time: int, hints_used: int) -> Future:
+        """Ставить збереження поточної гри в чергу; Future повертає ID збереження"""
+        # Знімок дошки, бо гравець продовжує змінювати клітинки, поки запис чекає в черзі
+        grid_snapshot = deepcopy(grid)
+        solution_snapshot = deepcopy(solution)
+        return self.submit(
+            lambda services: services.saved_game_service.save_game(
+                difficulty, grid_snapshot, solution_snapshot, elapsed_time, hints_used
+            )
+        )
+
+    # Архів головоломок. Вибір і поповнення викликаються з потоку генерації головоломок,
+    # запис зіграних головоломок і результатів - через чергу запису
+    def next_archived_puzzle(self, difficulty: Difficulty) -> Optional[ArchivedPuzzle]:
+        """Вибирає з архіву випадкову головоломку, яку активний профіль ще не отримував"""
+        try:
+            return self.puzzle_service.next_puzzle(difficulty)
+        except Exception as e:
+            logging.error(f"Failed to pick archived puzzle: {e}")
+            return None
+
+    def archive_puzzle(self, difficulty: Difficulty, puzzle: List[List[int]], solution: List[List[int]],
+                       generator_version: int) -> Optional[int]:
+        """Зберігає згенеровану головоломку в архів і повертає її ID"""
+        try:
+            return self.puzzle_service.add_puzzle(difficulty, puzzle, solution, generator_version)
+        except Exception as e:
+            logging.error(f"Failed to archive puzzle: {e}")
+            return None
+
+    def count_unplayed_puzzles(self, difficulty: Difficulty) -> int:
+        """Кількість головоломок архіву, яких активний профіль ще не отримував"""
+        try:
+            return self.puzzle_service.count_unplayed(difficulty)
+        except Exception as e:
+            logging.error(f"Failed to count archived puzzles: {e}")
+            return 0
+
+    def mark_puzzle_played_async(self, puzzle_id: int) -> Future:
+        """Ставить у чергу позначку, що профіль отримав головоломку архіву; Future повертає ID головоломки"""
+        def mark_played(services):
+            services.puzzle_service.mark_played(puzzle_id)
+            return puzzle_id
+
+        return self.submit(mark_played)
+
+    def record_puzzle_result_async(self, puzzle_id: int, completion_time: int, hints_used: int) -> Future:
+        """Ставить у чергу результат профілю на головоломці архіву; Future повертає ID головоломки"""
+        def record_result(services):
+            services.puzzle_service.record_result(puzzle_id, completion_time, hints_used)
+            return puzzle_id
+
+        return self.submit(record_result)
+
+    @profiled("db.get_puzzle_results")
+    def get_puzzle_results(self, puzzle_id: int, limit: int = 10) -> List[PuzzleResult]:
+        """Отримує найкращі результати гравців на головоломці архіву"""
+        try:
+            return self.puzzle_service.get_results(puzzle_id, limit)
+        except Exception as e:
+            logging.error(f"Failed to get puzzle results: {e}")
+            return []
+
+    def _start_maintenance(self):
+        """Ставить у чергу обслуговування сховища: спершу політики зберігання, далі кроки vacuum"""
+        def retention(services):
+            return StorageMaintenance(services.db_manager, services.game_record_service).apply_retention(
+                SAVES_KEEP_PER_DIFFICULTY, RECORDS_ARCHIVE_AFTER_DAYS
+            )
+
+        self.submit(retention)
+        self._submit_vacuum_step()
+
+    def _submit_vacuum_step(self):
+        """
+        Звільняє MAINTENANCE_VACUUM_PAGES сторінок за операцію, щоб не затримувати записи гри;
+        наступний крок ставиться в чергу, лише коли попередній завершився
+        """
+        def step(services):
+            return StorageMaintenance(services.db_manager).vacuum_step(MAINTENANCE_VACUUM_PAGES)
+
+        def on_done(future: Future):
+            if self._closing or future.exception() is not None or not future.result():
+                return
+            try:
+                self._submit_vacuum_step()
+            except (queue.Full, RuntimeError):
+                # Черга зайнята або закрита - решту сторінок звільнить наступний запуск
+                pass
+
+        if self.writer is not None:
+            # Викликається і з потоку запису, тому не чекаємо на місце в черзі
+            future = self.writer.submit(step, block=False)
+        else:
+            future = self.submit(step)
+        future.add_done_callback(on_done)
+
+    def backup_now(self, progress=None) -> Optional[Future]:
+        """Запускає резервну копію у фоні; Future повертає шлях до файлу копії"""
+        if self.backups is None:
+            return None
+        return self.backups.start_backup(progress)
+
+    def unit_of_work(self) -> UnitOfWork:
+        """Створює одиницю роботи зі спільним кешем таблиці лідерів і замірами запитів гри"""
+        return UnitOfWork(self.db_manager, self.leaderboard_cache, self.query_metrics)
+
+    def flush(self):
+        """Чекає завершення всіх відкладених записів"""
+        if self.writer is not None:
+            self.writer.flush()
+
+    @profiled("db.save_current_game")
     def save_current_game(self, difficulty: Difficulty, grid: List[List[Cell]],
                           solution: List[List[int]], elapsed_time: int, hints_used: int) -> bool:
         """Зберігає поточну гру"""
@@ -67,6 +332,7 @@ class GameDatabaseManager:
             logging.error(f"Failed to save game: {e}")
             return False
 
+    @profiled("db.load_latest_game")
     def load_latest_game(self):
         """Завантажує останню збережену гру"""
         try:
@@ -75,6 +341,7 @@ class GameDatabaseManager:
             logging.error(f"Failed to load latest game: {e}")
             return None
 
+    @profiled("db.get_all_saved_games")
     def get_all_saved_games(self):
         """Отримує всі збережені ігри"""
         try:
@@ -83,6 +350,25 @@ class GameDatabaseManager:
             logging.error(f"Failed to get saved games: {e}")
             return []
 
+    @profiled("db.get_saved_game_journal")
+    def get_saved_game_journal(self, game_id: int, after_seq: int = 0):
+        """Отримує ходи журналу автозбереження після знімка"""
+        try:
+            return self.saved_game_service.get_journal(game_id, after_seq)
+        except Exception as e:
+            logging.error(f"Failed to load move journal: {e}")
+            return []
+
+    @profiled("db.get_saved_game_summaries")
+    def get_saved_game_summaries(self, limit: Optional[int] = None):
+        """Отримує список збережень без завантаження стану дошки"""
+        try:
+            return self.saved_game_service.get_save_summaries(limit)
+        except Exception as e:
+            logging.error(f"Failed to get saved game summaries: {e}")
+            return []
+
+    @profiled("db.delete_saved_game")
     def delete_saved_game(self, game_id: int) -> bool:
         """Видаляє збережену гру"""
         try:
@@ -91,6 +377,7 @@ class GameDatabaseManager:
             logging.error(f"Failed to delete saved game: {e}")
             return False
 
+    @profiled("db.has_saved_games")
     def has_saved_games(self) -> bool:
         """Перевіряє, чи є збережені ігри"""
         try:
@@ -99,6 +386,7 @@ class GameDatabaseManager:
             logging.error(f"Failed to check for saved games: {e}")
             return False
 
+    @profiled("db.get_leaderboard")
     def get_leaderboard(self, difficulty: Optional[Difficulty] = None, limit: int = 10):
         """Отримує таблицю лідерів"""
         try:
@@ -107,6 +395,26 @@ class GameDatabaseManager:
             logging.error(f"Failed to get leaderboard: {e}")
             return []
 
+    @profiled("db.get_leaderboard_page")
+    def get_leaderboard_page(self, difficulty: Optional[Difficulty] = None,
+                             after: Optional[LeaderboardCursor] = None, limit: int = 15):
+        """Отримує сторінку таблиці лідерів після курсора"""
+        try:
+            return self.game_record_service.get_leaderboard_page(difficulty, limit, after)
+        except Exception as e:
+            logging.error(f"Failed to get leaderboard page: {e}")
+            return []
+
+    @profiled("db.get_time_rank")
+    def get_time_rank(self, difficulty: Difficulty, completion_time: int) -> Optional[TimeRank]:
+        """Отримує місце ще не збереженого часу серед рекордів усіх гравців на складності"""
+        try:
+            return self.game_record_service.get_time_rank(difficulty, completion_time)
+        except Exception as e:
+            logging.error(f"Failed to get time rank: {e}")
+            return None
+
+    @profiled("db.get_personal_stats")
     def get_personal_stats(self) -> Dict[str, Any]:
         """Отримує персональну статистику"""
         try:
@@ -116,6 +424,7 @@ class GameDatabaseManager:
             return {}
 
     # Методи для роботи з налаштуваннями
+    @profiled("db.get_user_setting")
     def get_user_setting(self, name: str, default_value: str = None) -> Optional[str]:
         """Отримує налаштування користувача"""
         try:
@@ -124,6 +433,7 @@ class GameDatabaseManager:
             logging.error(f"Failed to get user setting {name}: {e}")
             return default_value
 
+    @profiled("db.set_user_setting")
     def set_user_setting(self, name: str, value: str) -> bool:
         """Встановлює налаштування користувача"""
         try:
@@ -156,6 +466,7 @@ class GameDatabaseManager:
             logging.error(f"Failed to set sound setting: {e}")
             return False
 
+    @profiled("db.get_max_hints")
     def get_max_hints(self) -> int:
         """Отримує максимальну кількість підказок"""
         return self.user_settings_service.get_max_hints()
@@ -168,10 +479,29 @@ class GameDatabaseManager:
             logging.error(f"Failed to set max hints: {e}")
             return False
 
+    def export_query_stats(self) -> Optional[str]:
+        """Записує агрегати замірів поруч з базою для команди звіту; повертає шлях до файлу"""
+        if self.query_metrics is None or self.db_manager.db_path == ':memory:':
+            return None
+        path = str(Path(self.db_manager.db_path).parent / QUERY_STATS_FILE)
+        try:
+            self.query_metrics.export_json(path)
+            logging.info(f"Query statistics written to {path}")
+            return path
+        except OSError as e:
+            logging.error(f"Failed to write query statistics: {e}")
+            return None
+
     def close(self):
-        """Закриває з'єднання з базою даних"""
+        """Дописує чергу відкладених записів і закриває з'єднання з базою даних"""
         try:
-            self.db_manager.disconnect()
+            self._closing = True
+            if self.backups is not None:
+                self.backups.stop()
+            if self.writer is not None:
+                self.writer.close()
+            self.export_query_stats()
+            self.db_manager.disconnect_all()
         except Exception as e:
             logging.error(f"Failed to close database connection: {e}")
 
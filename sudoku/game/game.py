@@ -2,31 +2,45 @@
 Основний модуль гри з інтеграцією бази даних
 """
 import os
+from pathlib import Path
 
 import pygame
-from typing import Optional, Tuple
+from typing import Optional, Tuple, TYPE_CHECKING
 import logging
 
-from sudoku.game.states.main_menu_state import MainMenuState
-from ..config import WINDOW_SIZE, GRID_SIZE
-from ..models import Difficulty
+from ..config import (
+    WINDOW_SIZE, GRID_SIZE, FPS, EVENT_DRIVEN_LOOP, IDLE_WAIT_TIMEOUT_MS, PROFILER_EXPORT_FILE, AUTOSAVE_ENABLED,
+    PUZZLE_ARCHIVE_ENABLED
+)
+from ..models import Difficulty, Move
 from ..core import SudokuGenerator, SudokuBoard
-from ..ui import SudokuRenderer, ButtonManager
-from .states.game_over_state import GameOverState
+from ..ui import SudokuRenderer, ButtonManager, PerformanceOverlay
+from ..utils.profiler import get_profiler
 from .states.i_game_state import IGameState
-from .states.paused_state import PausedState
-from .states.playing_state import PlayingState
 from .timer import GameTimer
 from .database_integration import GameDatabaseManager
+from .puzzle_loader import PuzzleLoader
+from .autosave import AutosaveJournal
+
+if TYPE_CHECKING:
+    from .replay import EventRecorder, EventReplayer
 
 
 class Game:
     """Основний клас гри з підтримкою бази даних"""
-    def __init__(self, db_path: Optional[str] = None):
+    def __init__(self, db_path: Optional[str] = None, headless: bool = False):
+        self.headless = headless
+        if headless:
+            # Фіктивний відеодрайвер SDL дозволяє працювати без дисплея (CI, бенчмарки)
+            os.environ['SDL_VIDEODRIVER'] = 'dummy'
+
         pygame.init()
         self.window_size = WINDOW_SIZE
-        self.surface = pygame.display.set_mode(self.window_size)
-        pygame.display.set_caption('Sudoku')
+        if headless:
+            self.surface = pygame.Surface(self.window_size)
+        else:
+            self.surface = pygame.display.set_mode(self.window_size)
+            pygame.display.set_caption('Sudoku')
 
         # Ініціалізація бази даних
         try:
@@ -50,6 +64,27 @@ class Game:
         self.renderer = SudokuRenderer(self.font, self.small_font)
         self.button_manager = ButtonManager(self.small_font)
         self.timer = GameTimer()
+        # Нові ігри беруться з архіву головоломок у базі, генерація лише поповнює його у фоні
+        self.puzzle_loader = PuzzleLoader(
+            archive=self.db_manager if self.db_manager and PUZZLE_ARCHIVE_ENABLED else None
+        )
+        # Місце часу останньої завершеної гри серед рекордів усіх гравців (для екрана перемоги)
+        self.last_rank = None
+        # ID головоломки поточної гри в архіві (None для згенерованих поза архівом і відновлених збережень)
+        self.puzzle_id: Optional[int] = None
+
+        # Автозбереження: кожен хід дошки дописується до журналу
+        self.autosave: Optional[AutosaveJournal] = None
+        if self.db_manager and AUTOSAVE_ENABLED:
+            self.autosave = AutosaveJournal(self.db_manager)
+            self.board.add_move_listener(self._on_board_move)
+
+        # Профайлер кадру та оверлей продуктивності (F3 - показати, F4 - експорт)
+        self.profiler = get_profiler()
+        self.perf_overlay = PerformanceOverlay()
+        self.show_perf_overlay = False
+        data_dir = os.path.dirname(self.db_manager.db_manager.db_path) if self.db_manager else ''
+        self.profile_export_path = str(Path(data_dir or Path.home()) / PROFILER_EXPORT_FILE)
 
         # Завантаження налаштувань з бази даних
         self._load_user_settings()
@@ -58,19 +93,24 @@ class Game:
         self.selected_cell: Optional[Tuple[int, int]] = None
         self.difficulty = self._get_preferred_difficulty()
 
-        # Починаємо з головного меню
+        # Починаємо з головного меню; модулі станів імпортуються лише при першому переході
+        from .states.main_menu_state import MainMenuState
         self.state: IGameState = MainMenuState()
 
         # Прапорець для перевірки, чи була ініціалізована гра
         self.game_initialized = False
 
+        # Стан перемальовування для циклу, керованого подіями
+        self.needs_redraw = True
+        self._next_wakeup: Optional[int] = None
+        self._rendered_second = -1
+
     def _load_user_settings(self):
         """Завантажує налаштування користувача з бази даних"""
         if self.db_manager:
             try:
-                # Завантажуємо максимальну кількість підказок
-                max_hints = self.db_manager.get_max_hints()
-                # Тут можна встановити це значення в board, коли він буде ініціалізований
+                # Завантажуємо максимальну кількість підказок (з кешу налаштувань)
+                self.board.max_hints = self.db_manager.get_max_hints()
 
                 # Завантажуємо інші налаштування за потреби
                 logging.info("User settings loaded successfully")
@@ -105,8 +145,48 @@ class Game:
         """Створює нову гру"""
         self._initialize_game_ui()
         self.board.initialize(self.difficulty)
+        self.puzzle_id = None
         self.selected_cell = None
         self.timer.reset()
+        self._begin_autosave()
+
+    def request_new_game(self, difficulty: Difficulty):
+        """Запускає фонову генерацію нової гри і показує екран завантаження"""
+        self.difficulty = difficulty
+        self.puzzle_loader.request(difficulty)
+        from .states.loading_state import LoadingState
+        self.set_state(LoadingState())
+
+    def start_loaded_game(self, puzzle, solution, puzzle_id: Optional[int] = None):
+        """Починає гру з головоломкою, отриманою у фоні (з архіву або щойно згенерованою)"""
+        self._initialize_game_ui()
+        self.board.load_puzzle(puzzle, solution)
+        self.puzzle_id = puzzle_id
+        if puzzle_id is not None and self.db_manager:
+            # Отримана головоломка більше не випадає цьому профілю
+            future = self.db_manager.mark_puzzle_played_async(puzzle_id)
+            future.add_done_callback(self._log_persist_result("Archived puzzle marked as played"))
+        self.selected_cell = None
+        self.timer.reset()
+        self._begin_autosave()
+        from .states.playing_state import PlayingState
+        self.set_state(PlayingState())
+
+    def _begin_autosave(self):
+        """Починає журнал автозбереження для щойно розпочатої гри"""
+        if self.autosave:
+            future = self.autosave.begin(self.difficulty, self.board, 0)
+            future.add_done_callback(self._log_persist_result("Autosave started"))
+
+    def _on_board_move(self, move: Move):
+        """Дописує хід до журналу автозбереження і час від часу згортає журнал у знімок"""
+        if not self.autosave or not self.autosave.active:
+            return
+
+        elapsed_time_seconds = self.timer.get_time() // 1000
+        self.autosave.record(move, elapsed_time_seconds)
+        if self.autosave.needs_compaction:
+            self.autosave.compact(self.difficulty, self.board, elapsed_time_seconds)
 
     def save_current_game(self) -> bool:
         """Зберігає поточну гру в базу даних"""
@@ -116,13 +196,21 @@ class Game:
 
         try:
             elapsed_time_seconds = self.timer.get_time() // 1000
-            return self.db_manager.save_current_game(
+            if self.autosave and self.autosave.active:
+                # Гра вже збережена журналом - достатньо згорнути його у свіжий знімок
+                self.autosave.compact(self.difficulty, self.board, elapsed_time_seconds)
+                return True
+
+            # Запис виконується у фоновому потоці, щоб не затримувати кадр
+            future = self.db_manager.save_current_game_async(
                 self.difficulty,
                 self.board.grid,
                 self.board.solution,
                 elapsed_time_seconds,
                 self.board.hints_used
             )
+            future.add_done_callback(self._log_persist_result("Game saved"))
+            return True
         except Exception as e:
             logging.error(f"Failed to save current game: {e}")
             return False
@@ -134,6 +222,8 @@ class Game:
             return False
 
         try:
+            # Відкладені записи журналу мають потрапити в базу до читання
+            self.db_manager.flush()
             if game_id:
                 saved_game = self.db_manager.saved_game_service.load_game(game_id)
             else:
@@ -141,27 +231,32 @@ class Game:
 
             if saved_game:
                 self.difficulty = saved_game.difficulty
+                self.puzzle_id = None
 
                 # Відновлюємо стан дошки
                 self.board.difficulty = saved_game.difficulty
                 self.board.solution = saved_game.solution
                 self.board.hints_used = saved_game.hints_used
 
-                # Конвертуємо збережений стан назад у клітинки
-                from ..models import Cell
-                self.board.grid = []
-                for row_data in saved_game.current_state:
-                    row = []
-                    for cell_data in row_data:
-                        cell = Cell.from_dict(cell_data)
-                        row.append(cell)
-                    self.board.grid.append(row)
+                self.board.grid = saved_game.current_state
+
+                # Доповнюємо знімок ходами з журналу
+                elapsed_time = saved_game.elapsed_time
+                journal_seq = saved_game.journal_seq
+                for seq, move, move_time in self.db_manager.get_saved_game_journal(saved_game.id, journal_seq):
+                    self.board.apply_move(move)
+                    elapsed_time = max(elapsed_time, move_time)
+                    journal_seq = seq
 
                 # Відновлюємо таймер
-                self.timer.elapsed_time = saved_game.elapsed_time * 1000  # Конвертуємо в мс
+                self.timer.elapsed_time = elapsed_time * 1000  # Конвертуємо в мс
                 self.timer.start()
 
+                if self.autosave:
+                    self.autosave.resume(saved_game.id, journal_seq)
+
                 # Переходимо до стану гри
+                from .states.playing_state import PlayingState
                 self.set_state(PlayingState())
 
                 logging.info(f"Game loaded successfully: {saved_game.id}")
@@ -176,26 +271,76 @@ class Game:
 
     def complete_game(self):
         """Викликається при завершенні гри для збереження результату"""
+        self.last_rank = None
         if not self.db_manager:
             logging.warning("Database not available for saving game record")
             return
 
         try:
             completion_time_seconds = self.timer.get_time() // 1000
-            success = self.db_manager.save_game_record(
+            # Місце рахується до запису: запис іде через чергу, а екран перемоги потрібен одразу
+            self.last_rank = self.db_manager.get_time_rank(self.difficulty, completion_time_seconds)
+            future = self.db_manager.save_game_record_async(
                 self.difficulty,
                 completion_time_seconds,
                 self.board.hints_used
             )
+            future.add_done_callback(self._log_persist_result("Game record saved"))
 
-            if success:
-                logging.info("Game record saved successfully")
-            else:
-                logging.warning("Failed to save game record")
+            if self.puzzle_id is not None:
+                # Результат на головоломці архіву порівнюється з іншими гравцями
+                future = self.db_manager.record_puzzle_result_async(
+                    self.puzzle_id, completion_time_seconds, self.board.hints_used
+                )
+                future.add_done_callback(self._log_persist_result("Archived puzzle result recorded"))
+
+            # Завершену гру більше не потрібно відновлювати
+            if self.autosave:
+                self.autosave.discard()
 
         except Exception as e:
             logging.error(f"Error saving game record: {e}")
 
+    @staticmethod
+    def _log_persist_result(message: str):
+        """Створює колбек, що логує результат фонового запису"""
+        def callback(future):
+            error = future.exception()
+            if error is not None:
+                logging.error(f"{message} failed: {error}")
+            else:
+                logging.info(f"{message} with ID: {future.result()}")
+        return callback
+
+    def switch_profile(self, profile_id: int) -> bool:
+        """Перемикає гравця; автозбереження поточної гри лишається в попередньому профілі"""
+        if not self.db_manager:
+            return False
+
+        if self.autosave:
+            self.autosave.detach()
+        if not self.db_manager.switch_profile(profile_id):
+            return False
+        self._load_user_settings()
+        return True
+
+    def delete_profile(self, profile_id: int) -> bool:
+        """
+        Видаляє профіль з усіма даними. Видалення активного профілю перемикає гру на профіль
+        за замовчуванням і зупиняє автозбереження, бо збереження поточної гри видаляється разом з ним.
+        """
+        if not self.db_manager:
+            return False
+
+        deleting_active = profile_id == self.db_manager.active_profile_id
+        if deleting_active and self.autosave:
+            self.autosave.detach()
+        if not self.db_manager.delete_profile(profile_id):
+            return False
+        if deleting_active:
+            self._load_user_settings()
+        return True
+
     def get_leaderboard(self, difficulty: Optional[Difficulty] = None, limit: int = 10):
         """Отримує таблицю лідерів"""
         if not self.db_manager:
@@ -203,6 +348,13 @@ class Game:
 
         return self.db_manager.get_leaderboard(difficulty, limit)
 
+    def get_leaderboard_page(self, difficulty: Optional[Difficulty] = None, after=None, limit: int = 15):
+        """Отримує сторінку таблиці лідерів після курсора"""
+        if not self.db_manager:
+            return []
+
+        return self.db_manager.get_leaderboard_page(difficulty, after, limit)
+
     def get_personal_stats(self):
         """Отримує персональну статистику"""
         if not self.db_manager:
@@ -219,18 +371,23 @@ class Game:
 
     def pause_game(self):
         """Ставить гру на паузу"""
+        from .states.paused_state import PausedState
+        from .states.playing_state import PlayingState
         if isinstance(self.state, PlayingState):
             self.timer.pause()
             self.state = PausedState()
             self.button_manager.update_pause_button("Continue")
-
+            self.mark_dirty()
 
     def resume_game(self):
         """Відновлює гру після паузи"""
+        from .states.paused_state import PausedState
+        from .states.playing_state import PlayingState
         if isinstance(self.state, PausedState):
             self.timer.resume()
             self.state = PlayingState()
             self.button_manager.update_pause_button("Pause")
+            self.mark_dirty()
 
     def select_cell(self, row: int, col: int):
         """Обирає клітинку"""
@@ -242,42 +399,166 @@ class Game:
         hint = self.board.get_hint()
         if hint:
             row, col, value = hint
-            self.board.set_value(row, col, value)
+            self.board.apply_hint(row, col, value)
             self.selected_cell = (row, col)
 
             # Перевірка на завершення гри після використання підказки
             if self.board.is_complete():
                 self.timer.pause()
                 self.complete_game()  # Зберігаємо результат
+                from .states.game_over_state import GameOverState
                 self.state = GameOverState()
+                self.mark_dirty()
 
     def set_state(self, new_state: IGameState):
         """Встановлює новий стан гри"""
+        from .states.game_over_state import GameOverState
         if isinstance(new_state, GameOverState):
             self.timer.pause()
             self.complete_game()  # Зберігаємо результат при завершенні гри
         self.state = new_state
+        self.mark_dirty()
+
+    def mark_dirty(self):
+        """Позначає, що кадр потрібно перемалювати"""
+        self.needs_redraw = True
+
+    def schedule_wakeup(self, delay_ms: int):
+        """Планує пробудження циклу для анімацій через delay_ms мілісекунд"""
+        deadline = pygame.time.get_ticks() + max(0, delay_ms)
+        if self._next_wakeup is None or deadline < self._next_wakeup:
+            self._next_wakeup = deadline
 
-    def run(self):
-        """Головний цикл гри"""
+    def _get_wait_timeout(self) -> int:
+        """Обчислює, скільки можна чекати на подію без пропуску оновлень"""
+        timeout = IDLE_WAIT_TIMEOUT_MS
+
+        # Прокидаємося на зміну секунди, щоб оновити таймер на екрані
+        if self.timer.is_running:
+            timeout = min(timeout, 1000 - self.timer.get_time() % 1000)
+
+        if self._next_wakeup is not None:
+            timeout = min(timeout, self._next_wakeup - pygame.time.get_ticks())
+
+        return max(1, timeout)
+
+    def _wait_for_events(self) -> list:
+        """Блокується до першої події або до тайм-ауту і повертає всі події з черги"""
+        event = pygame.event.wait(self._get_wait_timeout())
+        if event.type == pygame.NOEVENT:
+            return []
+        return [event] + pygame.event.get()
+
+    def _check_scheduled_redraws(self):
+        """Позначає кадр брудним при зміні секунди таймера або настанні запланованого пробудження"""
+        if self.timer.get_time() // 1000 != self._rendered_second:
+            self.mark_dirty()
+
+        if self._next_wakeup is not None and pygame.time.get_ticks() >= self._next_wakeup:
+            self._next_wakeup = None
+            self.mark_dirty()
+
+    def toggle_perf_overlay(self):
+        """Вмикає або вимикає оверлей продуктивності разом зі збором замірів"""
+        self.show_perf_overlay = not self.show_perf_overlay
+        self.profiler.enabled = self.show_perf_overlay
+        if not self.show_perf_overlay:
+            self.profiler.reset()
+        self.mark_dirty()
+
+    def export_profile(self) -> bool:
+        """Експортує заміри профайлера у JSONL файл"""
+        try:
+            lines = self.profiler.export_jsonl(self.profile_export_path)
+            logging.info(f"Exported {lines} profiler samples to {self.profile_export_path}")
+            return True
+        except OSError as e:
+            logging.error(f"Failed to export profiler samples: {e}")
+            return False
+
+    def _handle_global_key(self, event: pygame.event.Event) -> bool:
+        """Обробляє службові клавіші, спільні для всіх станів"""
+        if event.type != pygame.KEYDOWN:
+            return False
+        if event.key == pygame.K_F3:
+            self.toggle_perf_overlay()
+            return True
+        if event.key == pygame.K_F4:
+            self.export_profile()
+            return True
+        return False
+
+    def _render_frame(self):
+        """Відображає поточний стан і, за потреби, оверлей продуктивності"""
+        with self.profiler.section("state.render"):
+            self.state.render(self.surface, self)
+
+        if self.show_perf_overlay:
+            self.perf_overlay.draw(self.surface, self.profiler.get_summary())
+            # Оновлюємо статистику на екрані навіть без введення
+            self.schedule_wakeup(500)
+
+        if not self.headless:
+            pygame.display.flip()
+
+    def _next_events(self, event_driven: bool, replay: Optional['EventReplayer']) -> list:
+        """Повертає події для наступного кадру з черги pygame або зі сценарію"""
+        if replay is not None:
+            # Поки головоломка генерується, сценарій чекає, як чекав би гравець
+            scripted = [] if self.puzzle_loader.pending else replay.poll()
+            return scripted + pygame.event.get()
+        if event_driven:
+            return self._wait_for_events()
+        return pygame.event.get()
+
+    def run(self, event_driven: bool = EVENT_DRIVEN_LOOP, replay: Optional['EventReplayer'] = None,
+            recorder: Optional['EventRecorder'] = None):
+        """Головний цикл гри; replay підставляє записані події замість введення користувача"""
         running = True
         clock = pygame.time.Clock()
 
+        if replay is not None:
+            replay.start()
+        if recorder is not None:
+            recorder.start()
+
         try:
             while running:
-                for event in pygame.event.get():
-                    if event.type == pygame.QUIT:
-                        running = False
-                    else:
-                        self.state.handle_event(event, self)
-
-                self.state.update(self)
-                self.state.render(self.surface, self)
-
-                pygame.display.flip()
-                clock.tick(30)
+                events = self._next_events(event_driven, replay)
+                if recorder is not None:
+                    recorder.record(events)
+
+                with self.profiler.section("frame"):
+                    for event in events:
+                        if event.type == pygame.QUIT:
+                            running = False
+                        elif not self._handle_global_key(event):
+                            with self.profiler.section("state.handle_event"):
+                                self.state.handle_event(event, self)
+                            # Рух миші не змінює зображення, тож не викликає перемальовування
+                            if event.type != pygame.MOUSEMOTION:
+                                self.mark_dirty()
+
+                    with self.profiler.section("state.update"):
+                        self.state.update(self)
+                    self._check_scheduled_redraws()
+
+                    if self.needs_redraw or not event_driven:
+                        self._render_frame()
+                        self.needs_redraw = False
+                        self._rendered_second = self.timer.get_time() // 1000
+
+                self.profiler.next_frame()
+
+                if replay is not None:
+                    running = running and not replay.finished
+                    if replay.realtime:
+                        clock.tick(FPS)
+                elif not event_driven:
+                    clock.tick(FPS)
         finally:
-            # Закриваємо базу даних при виході
+            self.puzzle_loader.shutdown()
+            # Дописуємо відкладені записи та закриваємо базу даних при виході
             if self.db_manager:
                 self.db_manager.close()
             pygame.quit()
@@ -0,0 +1,126 @@
+"""
+Модуль для фонової генерації головоломок
+"""
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Callable, List, NamedTuple, Optional
+import logging
+import threading
+
+import pygame
+
+from ..config import PUZZLE_ARCHIVE_MIN_UNPLAYED
+from ..core import ISudokuGenerator, SudokuGenerator
+from ..models import Difficulty
+
+if TYPE_CHECKING:
+    from .database_integration import GameDatabaseManager
+
+# Подія, якою робочий потік будить головний цикл після завершення генерації
+PUZZLE_READY_EVENT = pygame.event.custom_type()
+
+
+class Puzzle(NamedTuple):
+    """Готова головоломка; puzzle_id - ID в архіві (None, якщо архів не використовується)"""
+    grid: List[List[int]]
+    solution: List[List[int]]
+    puzzle_id: Optional[int] = None
+
+
+class PuzzleLoader:
+    """
+    Клас для отримання головоломок у робочому потоці без блокування вікна. З архівом нова гра
+    береться з бази, а генерація лише поповнює архів, коли в ньому закінчуються незіграні головоломки.
+    """
+
+    def __init__(self, generator_factory: Callable[[], ISudokuGenerator] = SudokuGenerator,
+                 archive: Optional['GameDatabaseManager'] = None):
+        self.generator_factory = generator_factory
+        self.archive = archive
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='puzzle-generator')
+        self._future: Optional[Future] = None
+        # Фонові генерації для поповнення архіву; ще не розпочаті скасовуються новим запитом.
+        # Список поповнює робочий потік (колбек завершення запиту), а очищає головний
+        self._refills: List[Future] = []
+        self._refills_lock = threading.Lock()
+
+    @property
+    def pending(self) -> bool:
+        """Чи очікується результат генерації"""
+        return self._future is not None
+
+    def request(self, difficulty: Difficulty) -> None:
+        """
+        Запускає генерацію, скасовуючи попередній запит. Робочий потік один, тож уже розпочата
+        генерація не переривається: новий запит чекає на неї, а її результат poll() не поверне.
+        """
+        self.cancel()
+        with self._refills_lock:
+            for refill in self._refills:
+                refill.cancel()
+            self._refills.clear()
+        self._future = self._executor.submit(self._load, difficulty)
+        # Колбеки викликаються вже після завершення Future, тож розбуджений головний цикл
+        # одразу отримає результат з poll(); подія - першою, до повільнішого планування поповнень
+        self._future.add_done_callback(self._notify_ready)
+        self._future.add_done_callback(lambda _: self._schedule_refill(difficulty))
+
+    @staticmethod
+    def _notify_ready(future: Future) -> None:
+        """Будить головний цикл подією PUZZLE_READY_EVENT, коли результат запиту готовий"""
+        if not future.cancelled() and pygame.get_init():
+            pygame.event.post(pygame.event.Event(PUZZLE_READY_EVENT))
+
+    def _generate(self, difficulty: Difficulty) -> Puzzle:
+        """Генерує головоломку і, якщо є архів, зберігає її в нього"""
+        # Окремий генератор на кожен запит, бо SudokuGenerator зберігає проміжну сітку
+        generator = self.generator_factory()
+        grid, solution = generator.generate(difficulty)
+        puzzle_id = None
+        if self.archive is not None:
+            puzzle_id = self.archive.archive_puzzle(difficulty, grid, solution, getattr(generator, 'version', 0))
+        return Puzzle(grid, solution, puzzle_id)
+
+    def _load(self, difficulty: Difficulty) -> Puzzle:
+        """Бере незіграну головоломку з архіву або генерує нову в робочому потоці"""
+        archived = self.archive.next_archived_puzzle(difficulty) if self.archive is not None else None
+        if archived is not None:
+            return Puzzle(archived.givens, archived.solution, archived.id)
+        return self._generate(difficulty)
+
+    def _schedule_refill(self, difficulty: Difficulty) -> None:
+        """Ставить у чергу генерацію головоломок, яких бракує до запасу архіву (по одній на задачу)"""
+        if self.archive is None:
+            return
+        missing = PUZZLE_ARCHIVE_MIN_UNPLAYED - self.archive.count_unplayed_puzzles(difficulty)
+        try:
+            with self._refills_lock:
+                # Завершені поповнення більше не потрібні для скасування
+                self._refills = [refill for refill in self._refills if not refill.done()]
+                self._refills.extend(self._executor.submit(self._generate, difficulty) for _ in range(missing))
+        except RuntimeError:
+            # Завантажувач уже зупинено
+            pass
+
+    def cancel(self) -> None:
+        """Скасовує поточний запит; результат вже запущеної генерації буде проігноровано"""
+        if self._future is not None:
+            self._future.cancel()
+            self._future = None
+
+    def poll(self) -> Optional[Puzzle]:
+        """Повертає готову головоломку або None, якщо генерація ще триває"""
+        if self._future is None or not self._future.done():
+            return None
+
+        future, self._future = self._future, None
+        try:
+            return future.result()
+        except Exception as e:
+            logging.error(f"Puzzle generation failed: {e}")
+            return None
+
+    def shutdown(self) -> None:
+        """Зупиняє робочий потік"""
+        self.cancel()
+        # З архівом чекаємо поточну генерацію, щоб вона не писала в уже закриту базу
+        self._executor.shutdown(wait=self.archive is not None, cancel_futures=True)
@@ -0,0 +1,210 @@
+"""
+Модуль для запису та відтворення потоку подій (headless-бенчмарки та регресійні тести)
+"""
+import argparse
+import json
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, TYPE_CHECKING
+
+import pygame
+
+from ..config import FPS
+from ..utils.profiler import get_profiler
+
+if TYPE_CHECKING:
+    from .game import Game
+
+# Типи подій, які впливають на гру і тому записуються
+RECORDED_EVENT_TYPES = {
+    pygame.MOUSEBUTTONDOWN: ('pos', 'button'),
+    pygame.MOUSEBUTTONUP: ('pos', 'button'),
+    pygame.MOUSEWHEEL: ('x', 'y'),
+    pygame.KEYDOWN: ('key', 'mod', 'unicode'),
+    pygame.KEYUP: ('key', 'mod'),
+}
+
+
+@dataclass
+class ScriptedEvent:
+    """Подія сценарію з часом відносно початку запису"""
+    time_ms: int
+    type: str
+    attrs: Dict[str, Any] = field(default_factory=dict)
+
+    def to_pygame(self) -> pygame.event.Event:
+        """Створює подію pygame"""
+        attrs = dict(self.attrs)
+        if 'pos' in attrs:
+            attrs['pos'] = tuple(attrs['pos'])
+        return pygame.event.Event(getattr(pygame, self.type), attrs)
+
+    @classmethod
+    def from_pygame(cls, event: pygame.event.Event, time_ms: int) -> Optional['ScriptedEvent']:
+        """Створює подію сценарію з події pygame або повертає None для незаписуваних типів"""
+        attr_names = RECORDED_EVENT_TYPES.get(event.type)
+        if attr_names is None:
+            return None
+        attrs = {name: getattr(event, name) for name in attr_names if hasattr(event, name)}
+        if 'pos' in attrs:
+            attrs['pos'] = list(attrs['pos'])
+        return cls(time_ms, pygame.event.event_name(event.type).upper(), attrs)
+
+
+@dataclass
+class EventScript:
+    """Записаний сценарій: зерно генератора випадкових чисел та список подій"""
+    seed: int
+    events: List[ScriptedEvent] = field(default_factory=list)
+
+    def save(self, path: str) -> None:
+        """Зберігає сценарій у JSONL: перший рядок - заголовок, далі по події на рядок"""
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(json.dumps({'seed': self.seed}) + '\n')
+            for event in self.events:
+                file.write(json.dumps({'t': event.time_ms, 'type': event.type, 'attrs': event.attrs}) + '\n')
+
+    @classmethod
+    def load(cls, path: str) -> 'EventScript':
+        """Завантажує сценарій з JSONL файлу"""
+        with open(path, encoding='utf-8') as file:
+            header = json.loads(file.readline())
+            events = [
+                ScriptedEvent(data['t'], data['type'], data.get('attrs', {}))
+                for data in (json.loads(line) for line in file if line.strip())
+            ]
+        return cls(header.get('seed', 0), events)
+
+
+class EventRecorder:
+    """Клас для запису подій під час звичайної гри"""
+
+    def __init__(self, seed: Optional[int] = None):
+        self.script = EventScript(seed if seed is not None else random.randrange(2 ** 32))
+        self.start_ticks = 0
+
+    def start(self) -> None:
+        """Починає запис і фіксує зерно, щоб генерація головоломок повторювалась"""
+        random.seed(self.script.seed)
+        self.start_ticks = pygame.time.get_ticks()
+
+    def record(self, events: List[pygame.event.Event]) -> None:
+        """Записує події, що впливають на гру"""
+        time_ms = pygame.time.get_ticks() - self.start_ticks
+        for event in events:
+            scripted = ScriptedEvent.from_pygame(event, time_ms)
+            if scripted:
+                self.script.events.append(scripted)
+
+
+class EventReplayer:
+    """Клас для відтворення сценарію в реальному часі або якнайшвидше"""
+
+    def __init__(self, script: EventScript, realtime: bool = False):
+        self.script = script
+        self.realtime = realtime
+        self.position = 0
+        self.start_ticks = 0
+        self.frame_ms = 1000 // FPS
+
+    @property
+    def finished(self) -> bool:
+        """Чи відтворено всі події"""
+        return self.position >= len(self.script.events)
+
+    def start(self) -> None:
+        """Починає відтворення з тим самим зерном, що й під час запису"""
+        random.seed(self.script.seed)
+        self.position = 0
+        self.start_ticks = pygame.time.get_ticks()
+
+    def poll(self) -> List[pygame.event.Event]:
+        """Повертає події, що мають бути оброблені в поточному кадрі"""
+        if self.finished:
+            return []
+
+        if self.realtime:
+            deadline = pygame.time.get_ticks() - self.start_ticks
+        else:
+            # Пропускаємо паузи між подіями: беремо всі події з вікна одного кадру
+            deadline = self.script.events[self.position].time_ms + self.frame_ms - 1
+
+        events = []
+        while not self.finished and self.script.events[self.position].time_ms <= deadline:
+            events.append(self.script.events[self.position].to_pygame())
+            self.position += 1
+        return events
+
+
+def run_benchmark(script: EventScript, realtime: bool = False, db_path: str = ':memory:') -> Dict[str, Any]:
+    """Відтворює сценарій у headless-режимі та повертає загальний і покадровий час"""
+    # Імпортуємо тут, щоб уникнути циркулярного імпорту
+    from .game import Game
+
+    game = Game(db_path=db_path, headless=True)
+    replayer = EventReplayer(script, realtime)
+
+    profiler = get_profiler()
+    profiler.history_size = max(profiler.history_size, len(script.events) * 4 + 100)
+    profiler.reset()
+    profiler.enabled = True
+
+    start = time.perf_counter()
+    try:
+        game.run(replay=replayer)
+    finally:
+        profiler.enabled = False
+    total_ms = (time.perf_counter() - start) * 1000
+
+    sections = profiler.get_summary()
+    return {
+        'events': len(script.events),
+        'frames': profiler.frame_index,
+        'total_ms': total_ms,
+        'frame': sections.get('frame', {}),
+        'sections': sections
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Командний рядок: запис сценарію у вікні або headless-відтворення з заміром часу"""
+    parser = argparse.ArgumentParser(description="Record or replay Sudoku input scripts")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    record_parser = subparsers.add_parser('record', help="play normally and record input to a script")
+    record_parser.add_argument('script')
+    record_parser.add_argument('--seed', type=int, default=None)
+    record_parser.add_argument('--db', default=None)
+
+    bench_parser = subparsers.add_parser('bench', help="replay a script headless and report frame timings")
+    bench_parser.add_argument('script')
+    bench_parser.add_argument('--realtime', action='store_true')
+    bench_parser.add_argument('--db', default=':memory:')
+    bench_parser.add_argument('--json', action='store_true', help="print the full report as JSON")
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'record':
+        from .game import Game
+        recorder = EventRecorder(args.seed)
+        Game(db_path=args.db).run(recorder=recorder)
+        recorder.script.save(args.script)
+        print(f"Recorded {len(recorder.script.events)} events to {args.script}")
+        return
+
+    report = run_benchmark(EventScript.load(args.script), args.realtime, args.db)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    frame = report['frame']
+    print(f"events: {report['events']}  frames: {report['frames']}  total: {report['total_ms']:.1f} ms")
+    print(f"frame p50/p95/p99: {frame.get('p50', 0):.3f} / {frame.get('p95', 0):.3f} / {frame.get('p99', 0):.3f} ms")
+    for name, stats in sorted(report['sections'].items()):
+        print(f"  {name:<28} n={stats['count']:<6} p50={stats['p50']:.3f} p95={stats['p95']:.3f} "
+              f"p99={stats['p99']:.3f} alloc={stats['allocations']:.1f}")
+
+
+if __name__ == "__main__":
+    main()
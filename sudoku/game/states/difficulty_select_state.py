@@ -98,7 +98,7 @@ class DifficultySelectState(IGameState):
 
     def handle_event(self, event: pygame.event.Event, game: 'Game') -> None:
         if event.type == pygame.MOUSEBUTTONDOWN:
-            x, y = pygame.mouse.get_pos()
+            x, y = event.pos
 
             # Ініціалізуємо кнопки, якщо вони ще не створені
             if not self.difficulty_buttons:
@@ -107,11 +107,8 @@ class DifficultySelectState(IGameState):
             # Перевірка натискання на кнопки складності
             for difficulty, (rect, _) in self.difficulty_buttons.items():
                 if rect.collidepoint(x, y):
-                    game.difficulty = difficulty
-                    game.new_game()
-                    # Імпортуємо тут, щоб уникнути циркулярного імпорту
-                    from .playing_state import PlayingState
-                    game.set_state(PlayingState())
+                    # Генерація йде у фоні, вікно лишається чутливим
+                    game.request_new_game(difficulty)
                     return
 
             # Перевірка натискання на кнопку "Назад"
@@ -1,6 +1,6 @@
 import pygame
 import sys
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 
 from .i_game_state import IGameState
 from ...config import WHITE
@@ -77,6 +77,14 @@ class GameOverState(IGameState):
         except Exception as e:
             print(f"Помилка в handle_event: {e}")
 
+    @staticmethod
+    def _rank_text(game: 'Game') -> Optional[str]:
+        """Текст місця часу серед рекордів усіх гравців на цій складності"""
+        rank = game.last_rank
+        if rank is None:
+            return None
+        return f"Your time ranks #{rank.rank:,} of {rank.total:,} (top {rank.top_percent:.3g}%)"
+
     def update(self, game: 'Game') -> None:
         """Оновлення стану"""
         try:
@@ -133,7 +141,7 @@ class GameOverState(IGameState):
 
             # Потім відображаємо повідомлення про завершення
             try:
-                game.renderer.draw_game_over(surface)
+                game.renderer.draw_game_over(surface, self._rank_text(game))
             except Exception as e:
                 print(f"Помилка відображення game over: {e}")
                 # Fallback відображення
@@ -0,0 +1,48 @@
+import pygame
+from typing import TYPE_CHECKING
+
+from .i_game_state import IGameState
+from ...config import WINDOW_SIZE, BLACK, GRAY
+
+if TYPE_CHECKING:
+    from ..game import Game
+
+
+class LoadingState(IGameState):
+    """Стан очікування, поки головоломка генерується у фоні"""
+
+    def __init__(self):
+        self.background_color = (245, 248, 255)  # Світло-блакитний
+        self.animation_step_ms = 250
+
+    def handle_event(self, event: pygame.event.Event, game: 'Game') -> None:
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+            game.puzzle_loader.cancel()
+            from .difficulty_select_state import DifficultySelectState
+            game.set_state(DifficultySelectState())
+
+    def update(self, game: 'Game') -> None:
+        """Передає готову головоломку у гру або планує наступний кадр анімації"""
+        result = game.puzzle_loader.poll()
+        if result:
+            game.start_loaded_game(result.grid, result.solution, result.puzzle_id)
+        elif not game.puzzle_loader.pending:
+            # Генерація завершилась помилкою - повертаємося до вибору складності
+            from .difficulty_select_state import DifficultySelectState
+            game.set_state(DifficultySelectState())
+        else:
+            game.schedule_wakeup(self.animation_step_ms)
+
+    def render(self, surface: pygame.Surface, game: 'Game') -> None:
+        """Відображення екрана завантаження"""
+        # Суцільна заливка замість градієнта, щоб кадр був якомога дешевшим
+        surface.fill(self.background_color)
+
+        dots = "." * (pygame.time.get_ticks() // self.animation_step_ms % 4)
+        title_text = game.font.render(f"Generating puzzle{dots}", True, BLACK)
+        title_rect = title_text.get_rect(midleft=(WINDOW_SIZE[0] // 2 - 150, WINDOW_SIZE[1] // 2))
+        surface.blit(title_text, title_rect)
+
+        hint_text = game.small_font.render("Press ESC to cancel", True, GRAY)
+        hint_rect = hint_text.get_rect(center=(WINDOW_SIZE[0] // 2, WINDOW_SIZE[1] // 2 + 50))
+        surface.blit(hint_text, hint_rect)
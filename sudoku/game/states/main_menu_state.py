@@ -1,5 +1,4 @@
 import pygame
-import sys
 from typing import TYPE_CHECKING
 
 from .i_game_state import IGameState
@@ -83,7 +82,7 @@ class MainMenuState(IGameState):
 
     def handle_event(self, event: pygame.event.Event, game: 'Game') -> None:
         if event.type == pygame.MOUSEBUTTONDOWN:
-            x, y = pygame.mouse.get_pos()
+            x, y = event.pos
 
             # Ініціалізуємо кнопки, якщо вони ще не створені
             if not self.menu_buttons:
@@ -96,8 +95,8 @@ class MainMenuState(IGameState):
 
         elif event.type == pygame.KEYDOWN:
             if event.key == pygame.K_ESCAPE:
-                pygame.quit()
-                sys.exit()
+                # Завершуємо через головний цикл, щоб коректно закрити базу даних
+                pygame.event.post(pygame.event.Event(pygame.QUIT))
 
     def _handle_menu_click(self, button_name: str, game: 'Game') -> None:
         """Обробка натiskання кнопок меню"""
@@ -120,8 +119,7 @@ class MainMenuState(IGameState):
             from .records_state import RecordsState
             game.set_state(RecordsState())
         elif button_name == "exit":
-            pygame.quit()
-            sys.exit()
+            pygame.event.post(pygame.event.Event(pygame.QUIT))
 
     def update(self, game: 'Game') -> None:
         """Оновлення стану меню"""
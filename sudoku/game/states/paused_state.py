@@ -82,7 +82,7 @@ class PausedState(IGameState):
 
     def handle_event(self, event: pygame.event.Event, game: 'Game') -> None:
         if event.type == pygame.MOUSEBUTTONDOWN:
-            x, y = pygame.mouse.get_pos()
+            x, y = event.pos
 
             # Ініціалізуємо кнопки, якщо вони ще не створені
             if not self.pause_buttons:
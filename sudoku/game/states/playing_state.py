@@ -35,7 +35,7 @@ class PlayingState(IGameState):
 
     def handle_event(self, event: pygame.event.Event, game: 'Game') -> None:
         if event.type == pygame.MOUSEBUTTONDOWN:
-            x, y = pygame.mouse.get_pos()
+            x, y = event.pos
 
             # Перевірка натискання на кнопки
             clicked_button = game.button_manager.get_clicked_button(x, y)
@@ -54,7 +54,7 @@ class PlayingState(IGameState):
                 from .main_menu_state import MainMenuState
                 game.set_state(MainMenuState())
             else:
-                self._handle_key_press(event.key, game)
+                self._handle_key_press(event.key, game, event.mod)
 
     def _handle_button_click(self, button_name: str, game: 'Game') -> None:
         """Обробка натискання кнопок"""
@@ -71,7 +71,7 @@ class PlayingState(IGameState):
             from .main_menu_state import MainMenuState
             game.set_state(MainMenuState())
 
-    def _handle_key_press(self, key: int, game: 'Game') -> None:
+    def _handle_key_press(self, key: int, game: 'Game', mods: int = 0) -> None:
         """Обробка натискання клавіш"""
         if game.selected_cell:
             row, col = game.selected_cell
@@ -82,7 +82,6 @@ class PlayingState(IGameState):
                 number = key - pygame.K_0
 
                 # Якщо натиснуто Shift, додаємо/видаляємо замітку
-                mods = pygame.key.get_mods()
                 if mods & pygame.KMOD_SHIFT:
                     game.board.toggle_note(row, col, number)
                 else:
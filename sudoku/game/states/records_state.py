@@ -17,6 +17,7 @@ class RecordsState(IGameState):
     def __init__(self):
         self.selected_difficulty: Optional[Difficulty] = None
         self.records = []
+        self.has_more_records = False
         self.personal_stats = {}
         self.scroll_offset = 0
         self.max_scroll = 0
@@ -110,27 +111,39 @@ class RecordsState(IGameState):
         )
 
     def _load_records(self, game: 'Game'):
-        """Завантажує рекорди з бази даних"""
+        """Завантажує першу сторінку рекордів (і наступну наперед) та статистику з бази даних"""
+        self.records = []
+        self.has_more_records = False
+
         if not game.db_manager:
-            self.records = []
             self.personal_stats = {}
             return
 
         try:
-            # Завантажуємо рекорди
-            self.records = game.get_leaderboard(self.selected_difficulty, limit=50)
+            # Завантажуємо одразу дві сторінки, щоб прокрутка не чекала на запит
+            self._fetch_next_page(game, self.records_per_page * 2)
 
             # Завантажуємо персональну статистику
             self.personal_stats = game.get_personal_stats()
 
-            # Розраховуємо максимальний скрол
-            visible_records = min(len(self.records), self.records_per_page)
-            self.max_scroll = max(0, len(self.records) - visible_records)
-
         except Exception as e:
             print(f"Error loading records: {e}")
             self.records = []
             self.personal_stats = {}
+            self.max_scroll = 0
+
+    def _fetch_next_page(self, game: 'Game', limit: int):
+        """Дочитує наступну сторінку рекордів після останнього завантаженого запису"""
+        from ...database import LeaderboardCursor
+        after = LeaderboardCursor.after(self.records[-1]) if self.records else None
+
+        page = game.get_leaderboard_page(self.selected_difficulty, after, limit)
+        self.records.extend(page)
+        self.has_more_records = len(page) == limit
+
+        # Розраховуємо максимальний скрол у межах уже завантажених записів
+        visible_records = min(len(self.records), self.records_per_page)
+        self.max_scroll = max(0, len(self.records) - visible_records)
 
     def _format_time(self, seconds: int) -> str:
         """Форматує час у читабельний вигляд"""
@@ -187,7 +200,7 @@ class RecordsState(IGameState):
 
     def handle_event(self, event: pygame.event.Event, game: 'Game') -> None:
         if event.type == pygame.MOUSEBUTTONDOWN:
-            x, y = pygame.mouse.get_pos()
+            x, y = event.pos
 
             # Ініціалізуємо кнопки, якщо потрібно
             if not self.difficulty_buttons:
@@ -225,6 +238,9 @@ class RecordsState(IGameState):
         if not self.records_loaded:
             self._load_records(game)
             self.records_loaded = True
+        elif self.has_more_records and self.scroll_offset + 2 * self.records_per_page > len(self.records):
+            # Користувач дійшов до останньої завантаженої сторінки - підвантажуємо наступну
+            self._fetch_next_page(game, self.records_per_page)
 
     def render(self, surface: pygame.Surface, game: 'Game') -> None:
         """Відображення таблиці рекордів"""
@@ -335,8 +351,9 @@ class RecordsState(IGameState):
 
         # Індикатор прокрутки, якщо потрібно
         if len(self.records) > self.records_per_page:
+            loaded = f"{len(self.records)}+" if self.has_more_records else str(len(self.records))
             scroll_info = game.small_font.render(
-                f"Entries {self.scroll_offset + 1}-{min(self.scroll_offset + self.records_per_page, len(self.records))} з {len(self.records)}",
+                f"Entries {self.scroll_offset + 1}-{min(self.scroll_offset + self.records_per_page, len(self.records))} з {loaded}",
                 True, GRAY
             )
             surface.blit(scroll_info, (WINDOW_SIZE[0] - 250, WINDOW_SIZE[1] - 30))
\ No newline at end of file
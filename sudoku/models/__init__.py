@@ -3,5 +3,6 @@
 """
 from .cell import Cell
 from .difficulty import Difficulty
+from .move import Move, MoveKind
 
-__all__ = ['Cell', 'Difficulty']
\ No newline at end of file
+__all__ = ['Cell', 'Difficulty', 'Move', 'MoveKind']
\ No newline at end of file
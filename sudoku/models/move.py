@@ -0,0 +1,22 @@
+"""
+Модуль для ходів гравця
+"""
+from dataclasses import dataclass
+from enum import Enum
+
+
+class MoveKind(Enum):
+    """Типи ходів, що змінюють стан дошки"""
+    SET_VALUE = 0  # Встановлення або очищення значення (value = 0)
+    TOGGLE_NOTE = 1
+    HINT = 2
+    AUTO_NOTES = 3
+
+
+@dataclass(frozen=True)
+class Move:
+    """Один хід гравця на дошці"""
+    kind: MoveKind
+    row: int = 0
+    col: int = 0
+    value: int = 0
@@ -3,5 +3,6 @@
 """
 from .renderer import SudokuRenderer
 from .buttons import ButtonManager
+from .perf_overlay import PerformanceOverlay
 
-__all__ = ['SudokuRenderer', 'ButtonManager']
\ No newline at end of file
+__all__ = ['SudokuRenderer', 'ButtonManager', 'PerformanceOverlay']
\ No newline at end of file
@@ -2,6 +2,7 @@ import pygame
 from typing import Dict, Tuple
 
 from ..config import GRID_SIZE, CELL_SIZE, WHITE, BLACK
+from ..utils.profiler import profiled
 
 
 class ButtonManager:
@@ -137,6 +138,7 @@ class ButtonManager:
                 return button_name
         return ""
 
+    @profiled("buttons.draw")
     def draw_rounded_buttons(self, surface: pygame.Surface):
         """Малює всі кнопки з заокругленими краями"""
         for button_name, button_data in self.buttons.items():
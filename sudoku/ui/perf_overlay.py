@@ -0,0 +1,41 @@
+"""
+Модуль для відображення оверлею продуктивності (F3)
+"""
+import pygame
+from typing import Dict
+
+from ..config import WHITE
+
+
+class PerformanceOverlay:
+    """Клас для відображення статистики часу кадру поверх гри"""
+
+    def __init__(self, font_size: int = 18):
+        self.font = pygame.font.Font(None, font_size)
+        self.line_height = font_size
+        self.padding = 6
+        self.background = (0, 0, 0, 170)
+
+    def draw(self, surface: pygame.Surface, summary: Dict[str, Dict[str, float]]) -> None:
+        """Малює таблицю p50/p95/p99 та алокацій для кожної секції"""
+        lines = ["section                    p50    p95    p99   alloc"]
+        for name in sorted(summary):
+            stats = summary[name]
+            lines.append(
+                f"{name[:24]:<24} {stats['p50']:6.2f} {stats['p95']:6.2f} "
+                f"{stats['p99']:6.2f} {stats['allocations']:7.1f}"
+            )
+        if len(lines) == 1:
+            lines.append("collecting...")
+
+        text_surfaces = [self.font.render(line, True, WHITE) for line in lines]
+        width = max(text.get_width() for text in text_surfaces) + 2 * self.padding
+        height = len(text_surfaces) * self.line_height + 2 * self.padding
+
+        # Напівпрозорий фон під таблицею
+        background = pygame.Surface((width, height), pygame.SRCALPHA)
+        background.fill(self.background)
+        surface.blit(background, (0, 0))
+
+        for i, text in enumerate(text_surfaces):
+            surface.blit(text, (self.padding, self.padding + i * self.line_height))
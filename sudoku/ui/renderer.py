@@ -9,6 +9,7 @@ from ..config import (
     BLACK, WHITE, GRAY, BLUE, GREEN, LIGHT_BLUE, LIGHT_BLUE_ALT, LIGHT_GRAY
 )
 from ..models import Cell
+from ..utils.profiler import profiled
 
 
 class SudokuRenderer:
@@ -27,6 +28,7 @@ class SudokuRenderer:
         # Зсув по вертикалі з урахуванням місця для UI елементів
         self.grid_offset_y = 20  # Відступ зверху
 
+    @profiled("renderer.draw_grid")
     def draw_grid(self, surface: pygame.Surface, grid: List[List[Cell]], selected_cell: Optional[Tuple[int, int]]):
         """Малює сітку судоку"""
         # Малювання клітинок
@@ -217,8 +219,8 @@ class SudokuRenderer:
         instruction_rect = instruction_text.get_rect(center=(grid_center_x, grid_center_y + 15))
         surface.blit(instruction_text, instruction_rect)
 
-    def draw_game_over(self, surface: pygame.Surface):
-        """Малює повідомлення про завершення гри"""
+    def draw_game_over(self, surface: pygame.Surface, rank_text: Optional[str] = None):
+        """Малює повідомлення про завершення гри і, якщо передано, місце результату"""
         # Напівпрозорий overlay тільки для ігрової області
         overlay = pygame.Surface((GRID_SIZE * self.cell_size, GRID_SIZE * self.cell_size))
         overlay.set_alpha(180)
@@ -233,8 +235,14 @@ class SudokuRenderer:
         text_rect = text.get_rect(center=(grid_center_x, grid_center_y))
         surface.blit(text, text_rect)
 
+        subtext_y = grid_center_y + 40
+        if rank_text:
+            rank = self.small_font.render(rank_text, True, WHITE)
+            surface.blit(rank, rank.get_rect(center=(grid_center_x, grid_center_y + 40)))
+            subtext_y += 35
+
         subtext = self.small_font.render("Press 'N', to restart game", True, WHITE)
-        subtext_rect = subtext.get_rect(center=(grid_center_x, grid_center_y + 40))
+        subtext_rect = subtext.get_rect(center=(grid_center_x, subtext_y))
         surface.blit(subtext, subtext_rect)
 
     def get_cell_from_pos(self, pos: Tuple[int, int]) -> Optional[Tuple[int, int]]:
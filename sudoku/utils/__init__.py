@@ -9,6 +9,7 @@ from .helpers import (
     format_time,
     calculate_difficulty_score
 )
+from .profiler import FrameProfiler, get_profiler, profiled
 
 __all__ = [
     'get_block_coordinates',
@@ -16,5 +17,8 @@ __all__ = [
     'get_col_coordinates',
     'is_valid_coordinate',
     'format_time',
-    'calculate_difficulty_score'
+    'calculate_difficulty_score',
+    'FrameProfiler',
+    'get_profiler',
+    'profiled'
 ]
\ No newline at end of file
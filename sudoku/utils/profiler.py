@@ -0,0 +1,125 @@
+"""
+Профайлер часу кадру для пошуку регресій продуктивності
+"""
+import json
+import sys
+import time
+from collections import deque
+from functools import wraps
+from typing import Callable, Deque, Dict, Any, Tuple
+
+from ..config import PROFILER_HISTORY_SIZE
+
+
+def _percentile(sorted_values: list, percent: float) -> float:
+    """Повертає перцентиль відсортованого списку методом найближчого рангу"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, int(round(percent / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+class _Section:
+    """Контекстний менеджер для заміру однієї секції"""
+    __slots__ = ('profiler', 'name', 'start', 'blocks')
+
+    def __init__(self, profiler: 'FrameProfiler', name: str):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+        self.blocks = 0
+
+    def __enter__(self):
+        if self.profiler.enabled:
+            self.blocks = sys.getallocatedblocks()
+            self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if self.profiler.enabled and self.start:
+            duration_ms = (time.perf_counter() - self.start) * 1000
+            self.profiler.record(self.name, duration_ms, sys.getallocatedblocks() - self.blocks)
+        return False
+
+
+class FrameProfiler:
+    """Збирає час виконання секцій кадру у кільцевих буферах"""
+
+    def __init__(self, history_size: int = PROFILER_HISTORY_SIZE):
+        self.enabled = False
+        self.history_size = history_size
+        self.frame_index = 0
+        # Для кожної секції: (номер кадру, тривалість у мс, приріст виділених блоків пам'яті)
+        self.samples: Dict[str, Deque[Tuple[int, float, int]]] = {}
+
+    def section(self, name: str) -> _Section:
+        """Повертає контекстний менеджер для заміру секції"""
+        return _Section(self, name)
+
+    def record(self, name: str, duration_ms: float, allocations: int = 0) -> None:
+        """Додає замір секції до кільцевого буфера"""
+        buffer = self.samples.get(name)
+        if buffer is None:
+            buffer = self.samples[name] = deque(maxlen=self.history_size)
+        buffer.append((self.frame_index, duration_ms, allocations))
+
+    def next_frame(self) -> None:
+        """Переходить до наступного кадру"""
+        self.frame_index += 1
+
+    def reset(self) -> None:
+        """Очищає всі заміри"""
+        self.samples.clear()
+        self.frame_index = 0
+
+    def get_summary(self) -> Dict[str, Dict[str, float]]:
+        """Повертає p50/p95/p99, максимум і середню кількість алокацій для кожної секції"""
+        summary = {}
+        for name, buffer in self.samples.items():
+            durations = sorted(sample[1] for sample in buffer)
+            allocations = [sample[2] for sample in buffer]
+            summary[name] = {
+                'count': len(durations),
+                'p50': _percentile(durations, 50),
+                'p95': _percentile(durations, 95),
+                'p99': _percentile(durations, 99),
+                'max': durations[-1] if durations else 0.0,
+                'allocations': sum(allocations) / len(allocations) if allocations else 0.0
+            }
+        return summary
+
+    def export_jsonl(self, path: str) -> int:
+        """Дописує всі заміри у JSONL файл і повертає кількість записаних рядків"""
+        lines = 0
+        with open(path, 'a', encoding='utf-8') as file:
+            for name, buffer in self.samples.items():
+                for frame, duration_ms, allocations in buffer:
+                    file.write(json.dumps({
+                        'section': name,
+                        'frame': frame,
+                        'duration_ms': round(duration_ms, 4),
+                        'allocations': allocations
+                    }) + '\n')
+                    lines += 1
+        return lines
+
+
+_profiler = FrameProfiler()
+
+
+def get_profiler() -> FrameProfiler:
+    """Повертає спільний екземпляр профайлера"""
+    return _profiler
+
+
+def profiled(name: str) -> Callable:
+    """Декоратор, що заміряє виклики функції, коли профайлер увімкнений"""
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args, **kwargs) -> Any:
+            if not _profiler.enabled:
+                return func(*args, **kwargs)
+            with _profiler.section(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator